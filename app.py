@@ -1,107 +1,332 @@
 #!/usr/bin/env python3
 # app.py - Main application class
 import tkinter as tk
-from ctypes import windll
+from datetime import datetime
 
 from ui.taskbar import TaskbarUI
 from system.monitor import SystemMonitor
-# from handlers.keyboard_handler import KeyboardHandler
+from system.backend import get_backend
+from system.displays import get_monitor_provider, TkMonitorProvider, monitor_width
+from system.activity import ActivityGovernor, get_activity_signals, ACTIVE, PAUSED
+from system.window_probe import get_window_probe
+from system.calendar_index import CalendarStore
+from system.memory_health import MemoryHealth
+from system.stall_watchdog import StallWatchdog
+from handlers.keyboard_handler import KeyboardHandler
 from handlers.fullscreen_handler import FullscreenHandler
+from handlers.ipc_server import IpcServer
 from utils.workspace_manager import WorkspaceManager
 from utils.color_adapter import ColorAdapter
+from utils.config import ConfigLoader
+from utils.logger import setup_logging, shutdown_logging, get_logger
+
+logger = get_logger(__name__)
+
+# Milliseconds between stall-watchdog heartbeats while the user is active
+STALL_HEARTBEAT_INTERVAL = 100
+
+class TaskbarBar:
+    def __init__(self, window, monitor, ui, workspace_manager):
+        """One bar window pinned to the top of a monitor
+        
+        Args:
+            window: Tkinter root or Toplevel hosting the bar
+            monitor: MonitorInfo the bar sits on
+            ui: TaskbarUI built inside the window
+            workspace_manager: WorkspaceManager reserving the bar's space
+        """
+        self.window = window
+        self.monitor = monitor
+        self.ui = ui
+        self.workspace_manager = workspace_manager
 
 class TaskbarApp:
-    def __init__(self):
+    def __init__(self, monitor_provider=None, activity_signals=None):
+        setup_logging()
+        # ~/.concise_taskbar/config.json, polled and applied while running
+        self.config_loader = ConfigLoader()
+        self.config, _ = self.config_loader.load()
         self.root = tk.Tk()
+        # Every OS call goes through the platform backend, imported on first use
+        self.backend = get_backend()
+        ScaleFactor = 1
         try:
-            windll.shcore.SetProcessDpiAwareness(1)
-            ScaleFactor = int(windll.shcore.GetScaleFactorForDevice(0) / 100)
+            ScaleFactor = self.backend.get_scale_factor(self.root)
             self.root.tk.call("tk", "scaling", ScaleFactor)
         except Exception as e:
-            print(f"Failed to set DPI awareness: {e}")
+            logger.warning("Failed to set DPI awareness: %s", e)
 
-        self.root.title("Taskbar")
-        self.root.overrideredirect(True)  # Remove window border
-        self.root.configure(bg="#F8F8F8")  # Initial background color
-        
-        # Configure window size and position
-        screen_width = self.root.winfo_screenwidth()  * ScaleFactor
         self.height = 22 * ScaleFactor
-        self.root.geometry(f"{screen_width}x{self.height}+{0}+{0}")
         
-        # Initialize components
-        self.workspace_manager = WorkspaceManager(self.height)
-        self.workspace_manager.set_root(self.root)
+        # Samples the Tk thread's stack whenever the event loop blocks
+        self.stall_watchdog = StallWatchdog(self.root, STALL_HEARTBEAT_INTERVAL)
         
-        self.system_monitor = SystemMonitor()
-        self.ui = TaskbarUI(self.root, self.system_monitor)
-        # self.keyboard_handler = KeyboardHandler(self)
-        self.fullscreen_handler = FullscreenHandler(self.root, self.workspace_manager)
+        # One bar per monitor, the primary one lives in the root window
+        self.monitor_provider = monitor_provider or get_monitor_provider(self.root)
+        monitors = self.monitor_provider.get_monitors()
+        if not monitors:
+            monitors = TkMonitorProvider(self.root).get_monitors()
         
-        # Initialize color adapter
-        self.color_adapter = ColorAdapter(self.root, self.height)
+        # Shared by every bar, so N monitors do not mean N times the polling
+        self.system_monitor = SystemMonitor(clash_settings=self.config.clash)
+        self.calendar_store = CalendarStore()
         
-        # Set up event bindings
-        self.root.bind("<<ExitApplication>>", lambda e: self.exit_program())
+        self.bars = []
+        for index, monitor in enumerate(monitors):
+            window = self.root if index == 0 else tk.Toplevel(self.root)
+            self.bars.append(self.create_bar(window, monitor))
+        
+        # The primary bar keeps the single-bar attribute names
+        self.ui = self.bars[0].ui
+        self.workspace_manager = self.bars[0].workspace_manager
+        
+        # Chords come from ~/.concise_taskbar/hotkeys.json, actions run on the Tk thread
+        self.keyboard_handler = KeyboardHandler({
+            "exit": self.exit_program,
+            "refresh": self.refresh_now
+        })
+        self.fullscreen_handler = FullscreenHandler(
+            self.root, [bar.workspace_manager for bar in self.bars]
+        )
+        
+        # Initialize color adapter, one capture pass serves every bar
+        self.color_adapter = ColorAdapter(
+            self.root, self.height, monitor=self.bars[0].monitor, window_probe=get_window_probe()
+        )
+        for bar in self.bars[1:]:
+            self.color_adapter.add_bar(bar.window, bar.monitor)
+        
+        # Status items pushed by external tools over a local socket
+        self.ipc_server = IpcServer()
+        try:
+            self.ipc_server.start()
+        except OSError as e:
+            logger.error("Failed to start IPC server: %s", e)
+            self.ipc_server = None
+        
+        # Bounded memory history for spotting leaks over weeks of uptime,
+        # with tracemalloc's top allocators when "memory_trace" is on
+        self.memory_health = MemoryHealth(self.root, trace=self.config.memory_trace)
+        
+        # Owns every periodic job, pauses them while hidden, idle or locked
+        self.activity_governor = ActivityGovernor(
+            self.root, activity_signals or get_activity_signals()
+        )
         
         # Set up periodic updates
         self.start_update_routines()
+    
+    def create_bar(self, window, monitor):
+        """Configure a window as a bar along the top of a monitor
+        
+        Args:
+            window: Tkinter root or Toplevel to turn into a bar
+            monitor: MonitorInfo to place the bar on
+            
+        Returns:
+            TaskbarBar
+        """
+        window.title("Taskbar")
+        window.configure(bg=self.config.background)  # Initial background color
+        
+        # Configure window size and position
+        window.geometry(f"{monitor_width(monitor)}x{self.height}+{monitor.left}+{monitor.top}")
+        
+        workspace_manager = WorkspaceManager(self.height, monitor)
+        workspace_manager.set_root(window)
+        
+        ui = TaskbarUI(window, self.system_monitor, self.calendar_store, self.config, self.stall_watchdog)
+        
+        # Set up event bindings
+        window.bind("<<ExitApplication>>", lambda e: self.exit_program())
+        
+        return TaskbarBar(window, monitor, ui, workspace_manager)
 
     def start_update_routines(self):
         """Start all periodic update routines"""
         # Register UI elements with color adapter
-        self.register_ui_elements()
+        for index, bar in enumerate(self.bars):
+            self.register_ui_elements(bar.ui, index)
         
-        # Start color adaptation
+        intervals = self.config.intervals
+        # Color adaptation and status sampling stop while nobody can see the bar
+        self.activity_governor.add_job("colors", self.color_adapter.update_colors, intervals["colors"])
+        self.activity_governor.add_job("status", self.update_status, intervals["status"])
+        self.activity_governor.add_job("foreground", self.color_adapter.check_foreground, intervals["foreground"])
+        # Only stats the .ics files, parsing happens on a worker thread when one changed
+        self.activity_governor.add_job("calendar", self.calendar_store.refresh_async, intervals["calendar"])
+        # Re-claims the work area when Explorer resets it, only where the platform can reset it
+        if any(bar.workspace_manager.needs_checks() for bar in self.bars):
+            self.activity_governor.add_job("workarea", self.check_work_areas, intervals["workarea"])
+        # External items are drained at frame rate, at most one write per item per frame
+        if self.ipc_server:
+            self.activity_governor.add_job("ipc", self.apply_ipc_updates, intervals["ipc"])
+        self.activity_governor.add_job("memory", self.memory_health.sample, intervals["memory"])
+        # Only stats the config file, it is parsed again when mtime or size changed
+        self.activity_governor.add_job("config", self.check_config, intervals["config"])
+        # Fullscreen checks keep running, they decide when to show the bar again
+        self.activity_governor.add_job("fullscreen", self.check_fullscreen, intervals["fullscreen"], pausable=False)
+        
+        # The stall heartbeat is not a governor job, a throttled job would read as late;
+        # it follows the governor's state through this listener instead
+        self.activity_governor.add_listener(self.on_activity_change)
+        self.activity_governor.start()
+        self.stall_watchdog.start()
+        # The listener thread is started only once the bar is up
+        self.root.after_idle(self.start_hotkeys)
+    
+    def start_hotkeys(self):
+        """Start the keyboard listener, and drain its actions only while it runs"""
+        if self.keyboard_handler.start_listening():
+            # Hotkeys keep working under fullscreen windows, not while locked
+            self.activity_governor.add_job(
+                "hotkeys", self.dispatch_hotkeys, self.config.intervals["hotkeys"], pausable=False
+            )
+    
+    def dispatch_hotkeys(self):
+        """Run queued hotkey actions, one tick of the governor's "hotkeys" job"""
+        self.keyboard_handler.dispatch_pending()
+        if not self.keyboard_handler.is_listening():
+            # The listener died and could not be restarted
+            self.activity_governor.remove_job("hotkeys")
+    
+    def stop_hotkeys(self):
+        """Stop the keyboard listener and its drain job"""
+        self.activity_governor.remove_job("hotkeys")
+        self.keyboard_handler.stop()
+    
+    def on_activity_change(self, old_state, new_state):
+        """Slow down or pause the stall heartbeat along with the governor's jobs"""
+        if old_state == PAUSED:
+            # Releases behind a lock screen never reach the listener
+            self.keyboard_handler.request_reset()
+        if new_state == PAUSED:
+            self.stall_watchdog.pause()
+            return
+        interval = STALL_HEARTBEAT_INTERVAL
+        if new_state != ACTIVE:
+            interval *= self.activity_governor.idle_factor
+        self.stall_watchdog.set_interval(interval)
+        self.stall_watchdog.resume()
+    
+    def check_work_areas(self):
+        """Re-claim every bar's work area if something reset it"""
+        for bar in self.bars:
+            bar.workspace_manager.check_work_area()
+    
+    def update_status(self):
+        """Sample system status once and show it on every bar"""
+        status = self.system_monitor.get_status()
+        status["countdown"] = self.get_meeting_countdown()
+        for bar in self.bars:
+            bar.ui.apply_status(status)
+    
+    def refresh_now(self):
+        """Sample colors and status immediately instead of waiting for the next tick"""
         self.color_adapter.update_colors()
+        self.update_status()
+    
+    def get_meeting_countdown(self):
+        """Countdown text for the next timed event, None if none is close
         
-        # Start other regular updates
-        self.ui.update_status()
-        # No need for continuous work area adjustment anymore
-        # self.workspace_manager.adjust_work_area()
-        self.fullscreen_handler.start_monitoring()
-    
-    def register_ui_elements(self):
-        """Register all UI elements that should adapt their colors"""
-        # Add all labels and buttons from UI except special ones
-        ui_elements = [
-            self.ui.label_time,
-            self.ui.label_date,
-            self.ui.label_power,
-            self.ui.label_volume,
-            self.ui.label_input,
-            # self.ui.label_clash,  # Handled separately as special element
-            self.ui.button_tic,
-            self.ui.button_files,
-            self.ui.button_apps,
-            self.ui.button_terminal,
-            self.ui.button_music,
-            self.ui.button_draft,
-            self.ui.button_plan,
-            self.ui.button_edge,
-            self.ui.button_vscode
-        ]
-        self.color_adapter.add_ui_elements(ui_elements)
-        
-        # Register special elements with custom color handling
-        self.color_adapter.register_special_element(
-            self.ui.label_clash,
-            lambda element, bg_color, is_dark: self._handle_clash_colors(element, bg_color, is_dark)
+        Returns:
+            str or None: e.g. "周会 12分"
+        """
+        countdown_minutes = self.config.countdown_minutes
+        if not countdown_minutes:
+            return None
+        for event in self.calendar_store.next_events(3):
+            if event.all_day:
+                continue
+            minutes = int((event.start - datetime.now()).total_seconds() // 60) + 1
+            if minutes <= countdown_minutes:
+                return f"{event.summary[:8]} {minutes}分"
+            break
+        return None
+    
+    def apply_ipc_updates(self):
+        """Apply coalesced external status item updates to every bar"""
+        for item_id, text in self.ipc_server.take_updates().items():
+            for index, bar in enumerate(self.bars):
+                if text is None:
+                    label = bar.ui.remove_custom_item(item_id)
+                    if label is not None:
+                        self.color_adapter.remove_ui_element(label, index)
+                else:
+                    label, created = bar.ui.set_custom_item(item_id, text)
+                    if created:
+                        self.color_adapter.add_ui_element(label, index)
+    
+    def check_config(self):
+        """Apply the config file if it changed since the last check"""
+        config, changed = self.config_loader.load()
+        if changed:
+            self.apply_config(config)
+    
+    def apply_config(self, config):
+        """Patch every bar and job interval to a new config
+        
+        Only changed items are rebuilt, see TaskbarUI.apply_config. Clash
+        settings are read at start-up only.
+        """
+        old_config, self.config = self.config, config
+        for index, bar in enumerate(self.bars):
+            added, removed = bar.ui.apply_config(config)
+            for widget in removed:
+                self.color_adapter.remove_ui_element(widget, index)
+            for widget in added:
+                self.register_ui_element(bar.ui, widget, index)
+        for name, interval in config.intervals.items():
+            if old_config.intervals.get(name) != interval:
+                self.activity_governor.set_interval(name, interval)
+        # New widgets get their colors and texts right away
+        self.refresh_now()
+        logger.info("Config reloaded")
+    
+    def check_fullscreen(self):
+        """Hide or show bars for fullscreen windows and report it to the governor"""
+        self.fullscreen_handler.monitor_fullscreen()
+        self.activity_governor.set_hidden(
+            not any(bar.workspace_manager.is_visible for bar in self.bars)
         )
     
-    def _handle_clash_colors(self, element, bg_color, is_dark):
+    def register_ui_elements(self, ui, bar=0):
+        """Register all UI elements that should adapt their colors
+        
+        Args:
+            ui: TaskbarUI whose elements are registered
+            bar: Index of the bar in the color adapter
+        """
+        for widget in ui.items.values():
+            self.register_ui_element(ui, widget, bar)
+    
+    def register_ui_element(self, ui, widget, bar=0):
+        """Register one config item widget with the color adapter"""
+        if ui.is_clash_label(widget):
+            # Special element with custom color handling
+            self.color_adapter.register_special_element(
+                widget,
+                lambda element, bg_color, is_dark: self._handle_clash_colors(element, bg_color, is_dark, ui),
+                bar
+            )
+        else:
+            self.color_adapter.add_ui_element(widget, bar)
+    
+    def _handle_clash_colors(self, element, bg_color, is_dark, ui=None):
         """Custom color handler for Clash status label
         
         Args:
             element: The Clash label element
             bg_color: Current background color (hex)
             is_dark: Boolean indicating if background is dark
+            ui: TaskbarUI owning the label, defaults to the primary bar
         """
+        ui = ui or self.ui
         # Always update background color to match
         element.configure(bg=bg_color)
         
         # If Clash is on, use orange color, otherwise use standard contrast color
-        if self.ui.is_clash_on:
+        if ui.is_clash_on:
             element.configure(fg="orange")
         else:
             # Use appropriate contrast color based on background
@@ -115,12 +340,29 @@ class TaskbarApp:
     def exit_program(self):
         """Clean exit of the application"""
         try:
-            # self.keyboard_handler.stop()
-            self.workspace_manager.restore_work_area()  # Unregister AppBar
+            self.stop_hotkeys()
+            self.activity_governor.stop()
+            self.stall_watchdog.stop()
+            self.color_adapter.fader.stop()
+            self.system_monitor.volume_controller.stop()
+            self.system_monitor.clash_client.stop()
+            logger.info(
+                "Color memory hit rate %.0f%%, wallpaper cache %d hits / %d misses",
+                self.color_adapter.app_memory.get_hit_rate() * 100,
+                self.color_adapter.wallpaper_cache.hits,
+                self.color_adapter.wallpaper_cache.misses
+            )
+            logger.info("Memory health at exit:\n%s", "\n".join(self.memory_health.get_report()))
+            if self.ipc_server:
+                self.ipc_server.stop()
+            for bar in self.bars:
+                bar.workspace_manager.restore_work_area()  # Unregister AppBar
+            self.backend.stop()
             self.root.destroy()
-            print("Program exited successfully.")
+            logger.info("Program exited successfully.")
+            shutdown_logging()
         except Exception as e:
-            print(f"Error during exit: {e}")
+            logger.error("Error during exit: %s", e)
     
     def run(self):
         """Start the main application loop"""
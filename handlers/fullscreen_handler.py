@@ -1,77 +1,75 @@
 #!/usr/bin/env python3
 # handlers/fullscreen_handler.py - Fullscreen detection and handling
-from ctypes import windll, wintypes, byref, create_unicode_buffer
+from system.backend import get_backend
+from system.displays import monitor_index_for_rect, covers_monitor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class FullscreenHandler:
-    def __init__(self, root, workspace_manager=None):
+    def __init__(self, root, workspace_managers=None, backend=None):
         """Initialize fullscreen detection
-        
+
         Args:
             root: Reference to the tkinter root window
-            workspace_manager: Reference to the WorkspaceManager
+            workspace_managers: WorkspaceManager of every bar, each tracks its own monitor
+            backend: Platform Backend reporting the foreground window
         """
         self.root = root
-        self.workspace_manager = workspace_manager
-        self.last_state = False  # Track last fullscreen state to avoid unnecessary actions
-    
-    def is_fullscreen(self):
-        """Detect if there is a fullscreen window active"""
+        self.backend = backend or get_backend()
+        self.workspace_managers = list(workspace_managers or [])
+        # Track last fullscreen state per bar to avoid unnecessary actions
+        self.last_states = [False] * len(self.workspace_managers)
+
+    def get_fullscreen_states(self):
+        """Detect which bars sit under a fullscreen window
+
+        Only the monitor holding the foreground window is re-evaluated, so a
+        fullscreen video on one monitor stays hidden while another is in use.
+
+        Returns:
+            dict: Bar index -> fullscreen flag, for the bars that were checked
+        """
         try:
-            # Get foreground window handle
-            hwnd_foreground = windll.user32.GetForegroundWindow()
-            if not hwnd_foreground:
-                return False
-                
-            # Get our own window handle to ignore it
-            own_hwnd = int(self.root.winfo_id())
-            if hwnd_foreground == own_hwnd:
-                return False
-            
-            # Get window rect
-            rect = wintypes.RECT()
-            windll.user32.GetWindowRect(hwnd_foreground, byref(rect))
-            
-            # Get window class name
-            class_name = create_unicode_buffer(256)
-            windll.user32.GetClassNameW(hwnd_foreground, class_name, 256)
-            
-            # Check if it's the desktop window
-            if class_name.value in ["Progman", "WorkerW", "Shell_TrayWnd", "Shell_SecondaryTrayWnd"]:
-                return False
-            
-            # Get screen dimensions
-            screen_width = windll.user32.GetSystemMetrics(0)
-            screen_height = windll.user32.GetSystemMetrics(1)
-            
-            # Check if window covers the entire screen
-            return (
-                rect.left <= 0 and rect.top <= 0 and
-                rect.right >= screen_width and rect.bottom >= screen_height
-            )
+            foreground = self.backend.get_foreground_window()
+            if foreground is None:
+                return {}
+
+            # Get our own window handles to ignore them
+            own_handles = {self.backend.get_window_handle(m.root) for m in self.workspace_managers if m.root}
+            if foreground.handle in own_handles:
+                return {}
+
+            # The desktop spans every monitor, show all bars
+            if foreground.class_name in self.backend.desktop_classes:
+                return {index: False for index in range(len(self.workspace_managers))}
+
+            monitors = [m.get_monitor() for m in self.workspace_managers]
+            index = monitor_index_for_rect(foreground.rect, monitors)
+            if index is None:
+                return {}
+
+            # Trust the platform's fullscreen flag, else check if the window covers the monitor
+            if foreground.fullscreen is not None:
+                return {index: foreground.fullscreen}
+            return {index: covers_monitor(foreground.rect, monitors[index])}
         except Exception as e:
-            print(f"Error detecting fullscreen state: {e}")
-            return False
-    
+            logger.error("Error detecting fullscreen state: %s", e)
+            return {}
+
+    def is_fullscreen(self):
+        """Detect if there is a fullscreen window active on any monitor"""
+        return any(self.get_fullscreen_states().values())
+
     def monitor_fullscreen(self):
-        """Hide or show the taskbar based on fullscreen state"""
-        is_full = self.is_fullscreen()
-        
-        # Only take action if the state has changed
-        if is_full != self.last_state:
-            self.last_state = is_full
-            
+        """Hide or show each bar based on fullscreen state of its monitor"""
+        for index, is_full in self.get_fullscreen_states().items():
+            # Only take action if the state has changed
+            if is_full == self.last_states[index]:
+                continue
+            self.last_states[index] = is_full
+
             if is_full:
-                if self.workspace_manager:
-                    self.workspace_manager.hide()
-                else:
-                    self.root.withdraw()  # Fallback to direct hiding
+                self.workspace_managers[index].hide()
             else:
-                if self.workspace_manager:
-                    self.workspace_manager.show()
-                else:
-                    self.root.deiconify()  # Fallback to direct showing
-    
-    def start_monitoring(self):
-        """Start periodic monitoring of fullscreen state"""
-        self.monitor_fullscreen()
-        self.root.after(1000, self.start_monitoring)  # Check every half second
\ No newline at end of file
+                self.workspace_managers[index].show()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# handlers/ipc_client.py - Client and load test for the IPC status item endpoint
+#
+# Usage:
+#   python -m handlers.ipc_client set build "CI ✓"
+#   python -m handlers.ipc_client del build
+#   python -m handlers.ipc_client load-test [--count N] [--items N]
+import sys
+import time
+import socket
+import argparse
+
+from handlers.ipc_server import IpcServer, get_default_address
+
+
+class IpcClient:
+    def __init__(self, address=None):
+        """Connect to the taskbar IPC endpoint
+
+        Args:
+            address: Socket path or (host, port), defaults to get_default_address()
+        """
+        address = address or get_default_address()
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(address)
+
+    def send_lines(self, lines):
+        """Send several protocol lines in one write"""
+        self.sock.sendall(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def set_item(self, item_id, text):
+        self.send_lines([f"SET {item_id} {text}"])
+
+    def remove_item(self, item_id):
+        self.send_lines([f"DEL {item_id}"])
+
+    def ping(self):
+        """Round-trip a PING, also waits until everything sent before is handled"""
+        self.send_lines(["PING"])
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = self.sock.recv(64)
+            if not chunk:
+                break
+            reply += chunk
+        return reply.strip() == b"PONG"
+
+    def close(self):
+        self.sock.close()
+
+
+def run_load_test(count=200000, items=10, batch=1000, frame_ms=16):
+    """Flood an in-process server and measure throughput and coalescing
+
+    A UI thread is simulated by draining take_updates() every `frame_ms`.
+
+    Returns:
+        dict: Messages sent, elapsed seconds, messages/s, frames and UI writes
+    """
+    server = IpcServer(address=("127.0.0.1", 0), max_items=items)
+    server.start()
+    client = IpcClient(server.address)
+
+    frames = 0
+    ui_writes = 0
+    last_frame = time.perf_counter()
+    start = last_frame
+    try:
+        for offset in range(0, count, batch):
+            client.send_lines([
+                f"SET load{i % items} {i}" for i in range(offset, min(offset + batch, count))
+            ])
+            now = time.perf_counter()
+            if (now - last_frame) * 1000 >= frame_ms:
+                ui_writes += len(server.take_updates())
+                frames += 1
+                last_frame = now
+        client.ping()
+        elapsed = time.perf_counter() - start
+        ui_writes += len(server.take_updates())
+        frames += 1
+    finally:
+        client.close()
+        server.stop()
+
+    return {
+        "messages": count,
+        "seconds": elapsed,
+        "messages_per_second": count / elapsed,
+        "frames": frames,
+        "ui_writes": ui_writes,
+        "max_ui_writes": frames * items
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Taskbar IPC client")
+    sub = parser.add_subparsers(dest="command", required=True)
+    set_parser = sub.add_parser("set")
+    set_parser.add_argument("item_id")
+    set_parser.add_argument("text")
+    del_parser = sub.add_parser("del")
+    del_parser.add_argument("item_id")
+    load_parser = sub.add_parser("load-test")
+    load_parser.add_argument("--count", type=int, default=200000)
+    load_parser.add_argument("--items", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "load-test":
+        result = run_load_test(args.count, args.items)
+        print(f"{result['messages']} messages in {result['seconds']:.3f}s "
+              f"({result['messages_per_second']:,.0f} msg/s)")
+        print(f"{result['ui_writes']} UI writes over {result['frames']} frames "
+              f"(bound {result['max_ui_writes']})")
+        return 0
+
+    client = IpcClient()
+    try:
+        if args.command == "set":
+            client.set_item(args.item_id, args.text)
+        else:
+            client.remove_item(args.item_id)
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
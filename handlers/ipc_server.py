@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# handlers/ipc_server.py - Local IPC endpoint for external status items
+#
+# Protocol: UTF-8, one command per line, no replies except to PING
+#   SET <id> <text>   create or update the label <id>, text is the rest of the line
+#   DEL <id>          remove the label <id>
+#   CLEAR             remove every label created over IPC
+#   PING              server answers "PONG"
+# Ids are 1-32 characters of [A-Za-z0-9_.-].
+import os
+import re
+import socket
+import selectors
+import threading
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47810
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".concise_taskbar", "ipc.sock")
+
+ITEM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.\-]{1,32}$")
+
+
+def get_default_address():
+    """Unix socket where available, localhost TCP otherwise (Windows)
+
+    Returns:
+        str or tuple: Socket path, or (host, port)
+    """
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return DEFAULT_SOCKET_PATH
+    return (DEFAULT_HOST, DEFAULT_PORT)
+
+
+class IpcServer:
+    def __init__(self, address=None, max_items=32, max_text=64, max_line=4096):
+        """Accept status item updates from local tools on a background thread
+
+        Updates are coalesced per item: only the latest text for each id is
+        kept until the UI thread collects it with take_updates(), so a client
+        flooding the socket costs at most one widget write per item per frame.
+
+        Args:
+            address: Socket path or (host, port), defaults to get_default_address()
+            max_items: Maximum number of IPC labels alive at once
+            max_text: Label text is truncated to this many characters
+            max_line: Lines longer than this are discarded, up to their newline
+        """
+        self.address = address or get_default_address()
+        self.max_items = max_items
+        self.max_text = max_text
+        self.max_line = max_line
+        self.items = set()  # Ids currently shown, as seen by the protocol
+        self.pending = {}  # id -> text, None means remove
+        self.lock = threading.Lock()
+        self.selector = None
+        self.listener = None
+        self.thread = None
+        self.running = False
+        self.buffers = {}  # connection -> unparsed bytes
+        self.discarding = set()  # Connections inside an overlong line, dropped until its newline
+        self.lines_handled = 0
+
+    def start(self):
+        """Bind the socket and start serving on a daemon thread
+
+        Raises:
+            OSError: If the address cannot be bound
+        """
+        if isinstance(self.address, str):
+            os.makedirs(os.path.dirname(self.address), exist_ok=True)
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # Left over from an unclean exit
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self.listener.bind(self.address)
+            self.listener.listen(8)
+            self.listener.setblocking(False)
+        except OSError:
+            self.listener.close()
+            self.listener = None
+            raise
+
+        if not isinstance(self.address, str):
+            # Port 0 picks a free port, keep the real one
+            self.address = self.listener.getsockname()
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, name="ipc-server", daemon=True)
+        self.thread.start()
+        logger.info("IPC server listening on %s", self.address)
+
+    def stop(self):
+        """Stop serving and close every connection"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    def take_updates(self):
+        """Collect the coalesced updates since the last call, UI thread side
+
+        Returns:
+            dict: Item id -> text, None for removed items
+        """
+        with self.lock:
+            updates = self.pending
+            self.pending = {}
+        return updates
+
+    def handle_line(self, line):
+        """Apply one protocol line
+
+        Args:
+            line: Decoded line without the trailing newline
+
+        Returns:
+            str or None: Reply to send back
+        """
+        command, _, rest = line.strip().partition(" ")
+        command = command.upper()
+
+        if command == "SET":
+            item_id, _, text = rest.partition(" ")
+            if not ITEM_ID_PATTERN.match(item_id):
+                logger.warning("IPC: invalid item id")
+                return None
+            with self.lock:
+                if item_id not in self.items and len(self.items) >= self.max_items:
+                    logger.warning("IPC: item limit of %d reached", self.max_items)
+                    return None
+                self.items.add(item_id)
+                self.pending[item_id] = text[:self.max_text]
+        elif command == "DEL":
+            item_id = rest.strip()
+            with self.lock:
+                if item_id in self.items:
+                    self.items.discard(item_id)
+                    self.pending[item_id] = None
+        elif command == "CLEAR":
+            with self.lock:
+                for item_id in self.items:
+                    self.pending[item_id] = None
+                self.items.clear()
+        elif command == "PING":
+            return "PONG"
+        elif command:
+            logger.warning("IPC: unknown command %s", command[:16])
+        return None
+
+    def _serve(self):
+        try:
+            while self.running:
+                for key, _ in self.selector.select(timeout=0.5):
+                    if key.fileobj is self.listener:
+                        self._accept()
+                    else:
+                        self._read(key.fileobj)
+        except Exception as e:
+            logger.error("IPC server stopped: %s", e)
+        finally:
+            for conn in list(self.buffers):
+                self._close(conn)
+            self.selector.close()
+            self.listener.close()
+
+    def _accept(self):
+        try:
+            conn, _ = self.listener.accept()
+        except OSError:
+            return
+        conn.setblocking(False)
+        self.buffers[conn] = b""
+        self.selector.register(conn, selectors.EVENT_READ)
+
+    def _read(self, conn):
+        try:
+            data = conn.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(conn)
+            return
+
+        buffer = self.buffers[conn] + data
+        if conn in self.discarding:
+            # The rest of an overlong line is never parsed as a command of its own
+            end = buffer.find(b"\n")
+            if end < 0:
+                return
+            self.discarding.discard(conn)
+            buffer = buffer[end + 1:]
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > self.max_line:
+            logger.warning("IPC: discarding overlong line")
+            buffer = b""
+            self.discarding.add(conn)
+        self.buffers[conn] = buffer
+
+        replies = []
+        for raw in lines:
+            if len(raw) > self.max_line:
+                continue
+            reply = self.handle_line(raw.decode("utf-8", errors="replace"))
+            if reply is not None:
+                replies.append(reply)
+        self.lines_handled += len(lines)
+
+        if replies:
+            try:
+                conn.sendall(("\n".join(replies) + "\n").encode("utf-8"))
+            except OSError:
+                self._close(conn)
+
+    def _close(self, conn):
+        self.buffers.pop(conn, None)
+        self.discarding.discard(conn)
+        try:
+            self.selector.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
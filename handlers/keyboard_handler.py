@@ -1,52 +1,307 @@
 #!/usr/bin/env python3
-# handlers/keyboard_handler.py - Keyboard event handling
-from pynput import keyboard
-
-# class KeyboardHandler:
-    # def __init__(self, app):
-    #     """Initialize keyboard listener
-        
-    #     Args:
-    #         app: Reference to the main application
-    #     """
-    #     self.app = app
-    #     self.listener = None
-    #     self.pressed_keys = set()  # Track pressed keys for combinations
-    #     self.start_listening()
-    
-    # def start_listening(self):
-    #     """Start the keyboard listener"""
-    #     try:
-    #         self.listener = keyboard.Listener(
-    #             on_press=self._on_press,
-    #             on_release=self._on_release
-    #         )
-    #         self.listener.start()
-    #     except Exception as e:
-    #         print(f"Error starting keyboard listener: {e}")
-    
-    # def _on_press(self, key):
-    #     """Handle key press events"""
-    #     self.pressed_keys.add(key)
-        
-    #     # Alt + C combination for Clash toggle
-    #     if (keyboard.Key.alt_l in self.pressed_keys and 
-    #             keyboard.KeyCode(char='c') in self.pressed_keys and 
-    #             len(self.pressed_keys) == 2):
-    #         self.app.toggle_clash_status()
-        
-    #     # Alt + Q combination for exit
-    #     if (keyboard.Key.alt_l in self.pressed_keys and 
-    #             keyboard.KeyCode(char='q') in self.pressed_keys and 
-    #             len(self.pressed_keys) == 2):
-    #         self.app.exit_program()
-    
-    # def _on_release(self, key):
-    #     """Handle key release events"""
-    #     if key in self.pressed_keys:
-    #         self.pressed_keys.remove(key)
-    
-    # def stop(self):
-    #     """Stop the keyboard listener"""
-    #     if self.listener:
-    #         self.listener.stop()
\ No newline at end of file
+# handlers/keyboard_handler.py - Global hotkeys dispatched to the Tk thread
+#
+# Benchmark: python -m handlers.keyboard_handler [event_count]
+import os
+import sys
+import json
+import time
+import random
+import threading
+from collections import deque
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HOTKEYS_PATH = os.path.join(os.path.expanduser("~"), ".concise_taskbar", "hotkeys.json")
+
+# Chord -> action name, used when no hotkeys.json exists. Empty: pynput does not
+# suppress the keys, so any default would also trigger in every other application
+DEFAULT_HOTKEYS = {}
+
+# Left/right variants collapse to one modifier name
+KEY_ALIASES = {
+    "alt_l": "alt", "alt_r": "alt", "alt_gr": "alt",
+    "ctrl_l": "ctrl", "ctrl_r": "ctrl",
+    "shift_l": "shift", "shift_r": "shift",
+    "cmd": "win", "cmd_l": "win", "cmd_r": "win",
+    "control": "ctrl", "option": "alt"
+}
+
+
+def normalize_key_name(name):
+    name = name.strip().lower()
+    return KEY_ALIASES.get(name, name)
+
+
+def parse_chord(chord):
+    """Parse "Alt+Shift+Q" into a frozenset of normalized key names"""
+    keys = frozenset(normalize_key_name(part) for part in chord.split("+") if part.strip())
+    if not keys:
+        raise ValueError(f"empty chord {chord!r}")
+    return keys
+
+
+def load_hotkeys(path=DEFAULT_HOTKEYS_PATH):
+    """Read the chord -> action table, falling back to DEFAULT_HOTKEYS
+
+    The file is a JSON object such as {"ctrl+alt+shift+q": "exit"}.
+    """
+    if not os.path.exists(path):
+        return dict(DEFAULT_HOTKEYS)
+    try:
+        with open(path, encoding="utf-8") as f:
+            hotkeys = json.load(f)
+        if not isinstance(hotkeys, dict):
+            raise ValueError("expected a JSON object")
+        return {str(chord): str(action) for chord, action in hotkeys.items()}
+    except (OSError, ValueError) as e:
+        logger.error("Error loading hotkeys from %s: %s", path, e)
+        return dict(DEFAULT_HOTKEYS)
+
+
+class ChordMatcher:
+    def __init__(self, hotkeys, max_hold=60.0, max_keys=8, clock=time.monotonic):
+        """Precompiled chord lookup, O(1) work per key event
+
+        Every key that appears in some chord gets one bit. The held keys are
+        kept as a bitmask, so matching is a single dict lookup on an int.
+        Keys outside every chord are only counted: holding one blocks matches,
+        so Alt+Q does not fire while Alt+Q+X is held.
+
+        A release the listener never saw, e.g. behind a lock screen or a UAC
+        prompt, would leave its key held for good. Keys not pressed again for
+        `max_hold` seconds are dropped as stale, and everything is dropped
+        once more than `max_keys` keys would be held at once.
+
+        Args:
+            hotkeys: Dict of chord string -> action name
+            max_hold: Seconds after its last press (or auto-repeat) a key counts as released
+            max_keys: Most keys that can physically be held together
+            clock: Monotonic time source, replaceable for testing
+        """
+        self.bits = {}
+        self.table = {}
+        for chord, action in hotkeys.items():
+            try:
+                keys = parse_chord(chord)
+            except ValueError as e:
+                logger.error("Invalid hotkey: %s", e)
+                continue
+            mask = 0
+            for key in keys:
+                if key not in self.bits:
+                    self.bits[key] = 1 << len(self.bits)
+                mask |= self.bits[key]
+            self.table[mask] = action
+        self.max_hold = max_hold
+        self.max_keys = max_keys
+        self.clock = clock
+        self.pressed = 0
+        self.other_keys = set()
+        self.fired = 0  # Mask that already fired, cleared once it is released
+        self.held = {}  # key name -> time of its last press
+
+    def press(self, name):
+        """Feed a key press
+
+        Args:
+            name: Normalized key name
+
+        Returns:
+            str or None: Action to run
+        """
+        now = self.clock()
+        if self.held:
+            for held_name in [k for k, t in self.held.items() if now - t > self.max_hold]:
+                self.release(held_name)
+            if name not in self.held and len(self.held) >= self.max_keys:
+                self.reset()
+        self.held[name] = now
+
+        bit = self.bits.get(name)
+        if bit is None:
+            self.other_keys.add(name)
+            return None
+        self.pressed |= bit
+        if self.other_keys or self.pressed == self.fired:
+            return None  # Foreign key held, or auto-repeat of a chord that fired
+        action = self.table.get(self.pressed)
+        if action is not None:
+            self.fired = self.pressed
+        return action
+
+    def release(self, name):
+        """Feed a key release"""
+        self.held.pop(name, None)
+        bit = self.bits.get(name)
+        if bit is None:
+            self.other_keys.discard(name)
+            return
+        self.pressed &= ~bit
+        if self.fired & bit:
+            self.fired = 0
+
+    def reset(self):
+        """Forget every held key"""
+        self.pressed = 0
+        self.other_keys.clear()
+        self.fired = 0
+        self.held.clear()
+
+
+class KeyboardHandler:
+    def __init__(self, actions, hotkeys=None):
+        """Global hotkeys, matched on the listener thread and run on the Tk thread
+
+        Args:
+            actions: Dict of action name -> callable run on the Tk thread
+            hotkeys: Dict of chord -> action name, defaults to load_hotkeys()
+        """
+        self.actions = actions
+        hotkeys = load_hotkeys() if hotkeys is None else hotkeys
+        unknown = [action for action in hotkeys.values() if action not in actions]
+        if unknown:
+            logger.warning("Ignoring hotkeys for unknown actions: %s", ", ".join(sorted(set(unknown))))
+        self.matcher = ChordMatcher({c: a for c, a in hotkeys.items() if a in actions})
+        self.listener = None
+        self.reset_requested = False  # Set from the Tk thread, applied on the listener thread
+        # Coalescing queue: an action already waiting is not queued twice
+        self.queue = deque()
+        self.queued = set()
+        self.lock = threading.Lock()
+
+    def start_listening(self):
+        """Start the keyboard listener, importing pynput only now
+
+        Nothing is started without hotkeys, the default.
+
+        Returns:
+            bool: Whether the listener is running
+        """
+        if self.listener is not None:
+            return True
+        if not self.matcher.table:
+            return False
+        try:
+            from pynput import keyboard
+        except ImportError as e:
+            logger.error("Global hotkeys disabled, pynput unavailable: %s", e)
+            return False
+        self.keyboard = keyboard
+        # Key states from before a restart cannot be trusted
+        self.matcher.reset()
+        self.reset_requested = False
+        try:
+            self.listener = keyboard.Listener(
+                on_press=self._on_press,
+                on_release=self._on_release
+            )
+            self.listener.start()
+        except Exception as e:
+            logger.error("Error starting keyboard listener: %s", e)
+            self.listener = None
+        return self.listener is not None
+
+    def is_listening(self):
+        return self.listener is not None
+
+    def key_name(self, key):
+        """Normalized name of a pynput key"""
+        if isinstance(key, self.keyboard.Key):
+            return normalize_key_name(key.name)
+        # With Ctrl held, char is a control character, the virtual-key code is not
+        vk = getattr(key, "vk", None)
+        if vk is not None and (0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A):
+            return chr(vk).lower()
+        char = getattr(key, "char", None)
+        return char.lower() if char else f"vk{vk}"
+
+    def request_reset(self):
+        """Forget held keys before the next key event, e.g. after the session was locked"""
+        self.reset_requested = True
+
+    def _on_press(self, key):
+        if self.reset_requested:
+            self.reset_requested = False
+            self.matcher.reset()
+        action = self.matcher.press(self.key_name(key))
+        if action is not None:
+            self.post(action)
+
+    def _on_release(self, key):
+        if self.reset_requested:
+            self.reset_requested = False
+            self.matcher.reset()
+        self.matcher.release(self.key_name(key))
+
+    def post(self, action):
+        """Queue an action for the Tk thread, safe from any thread"""
+        with self.lock:
+            if action in self.queued:
+                return
+            self.queued.add(action)
+            self.queue.append(action)
+
+    def dispatch_pending(self):
+        """Run queued actions, called periodically on the Tk thread while is_listening()"""
+        if self.listener is not None and not self.listener.is_alive():
+            # The OS can drop the hook, e.g. when a callback was too slow
+            logger.warning("Keyboard listener stopped, restarting it")
+            self.listener = None
+            self.start_listening()
+        if not self.queue:
+            return
+        with self.lock:
+            actions = list(self.queue)
+            self.queue.clear()
+            self.queued.clear()
+        for action in actions:
+            try:
+                self.actions[action]()
+            except Exception as e:
+                logger.error("Error running hotkey action %s: %s", action, e)
+
+    def stop(self):
+        """Stop the keyboard listener"""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
+
+def run_benchmark(event_count=1000000):
+    """Time chord matching on a synthetic key stream"""
+    hotkeys = {f"ctrl+alt+{c}": f"action_{c}" for c in "abcdefghijklmnopqrstuvwxyz"}
+    hotkeys.update(DEFAULT_HOTKEYS)
+    matcher = ChordMatcher(hotkeys)
+
+    rng = random.Random(0)
+    keys = list("abcdefghijklmnopqrstuvwxyz0123456789") + ["ctrl", "alt", "shift", "space", "enter"]
+    stream = []
+    held = []
+    while len(stream) < event_count:
+        if held and (len(held) > 3 or rng.random() < 0.5):
+            stream.append((False, held.pop(rng.randrange(len(held)))))
+        else:
+            key = rng.choice(keys)
+            if key not in held:
+                held.append(key)
+                stream.append((True, key))
+
+    fired = 0
+    start = time.perf_counter()
+    for is_press, key in stream:
+        if is_press:
+            if matcher.press(key) is not None:
+                fired += 1
+        else:
+            matcher.release(key)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(stream)} key events, {len(matcher.table)} chords, {fired} matches")
+    print(f"{elapsed * 1e9 / len(stream):.0f} ns/event")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
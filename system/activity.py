@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# system/activity.py - Pause or throttle periodic work while nobody is looking
+from system.backend import get_backend
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Governor states
+ACTIVE = "active"    # Jobs run at their normal interval
+IDLE = "idle"        # No user input for a while, jobs are throttled
+PAUSED = "paused"    # Bar hidden or session locked, pausable jobs stop, all jobs while locked
+
+
+class ActivitySignals:
+    """Source of idle and lock information, always reports an active user"""
+
+    def get_idle_seconds(self):
+        """Seconds since the last keyboard or mouse input"""
+        return 0.0
+
+    def is_locked(self):
+        """Whether the session is locked"""
+        return False
+
+
+class FakeActivitySignals(ActivitySignals):
+    def __init__(self, idle_seconds=0.0, locked=False):
+        """Settable signals for tests
+
+        Args:
+            idle_seconds: Value returned by get_idle_seconds
+            locked: Value returned by is_locked
+        """
+        self.idle_seconds = idle_seconds
+        self.locked = locked
+
+    def get_idle_seconds(self):
+        return self.idle_seconds
+
+    def is_locked(self):
+        return self.locked
+
+
+def get_activity_signals():
+    """Pick the activity signals for the current platform"""
+    try:
+        return get_backend().create_activity_signals()
+    except Exception as e:
+        logger.error("Error loading activity signals: %s", e)
+    return ActivitySignals()
+
+
+class PeriodicJob:
+    def __init__(self, name, callback, interval, pausable=True):
+        """A callback run every `interval` milliseconds by the governor
+
+        Args:
+            name: Job name, unique per governor
+            callback: Function called without arguments on each tick
+            interval: Milliseconds between runs while active
+            pausable: False keeps the job running while the bar is hidden, e.g.
+                the fullscreen check that has to notice when to show the bar
+                again; every job stops while the session is locked
+        """
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.pausable = pausable
+        self.after_id = None
+
+
+class ActivityGovernor:
+    def __init__(self, root, signals=None, idle_threshold=300, idle_factor=5, check_interval=1000):
+        """Own every periodic job and run them according to user activity
+
+        Args:
+            root: Tkinter root window, or anything with after/after_cancel
+            signals: ActivitySignals providing idle time and lock state
+            idle_threshold: Seconds without input before jobs are throttled
+            idle_factor: Interval multiplier while idle
+            check_interval: Milliseconds between activity checks
+        """
+        self.root = root
+        self.signals = signals or ActivitySignals()
+        self.idle_threshold = idle_threshold
+        self.idle_factor = idle_factor
+        self.check_interval = check_interval
+        self.state = ACTIVE
+        self.hidden = False
+        self.locked = False
+        self.jobs = {}
+        self.listeners = []
+        self.check_after_id = None
+        self.running = False
+
+    @staticmethod
+    def compute_state(hidden, locked, idle_seconds, idle_threshold):
+        """Map raw signals to a governor state
+
+        Returns:
+            str: ACTIVE, IDLE or PAUSED
+        """
+        if hidden or locked:
+            return PAUSED
+        if idle_seconds >= idle_threshold:
+            return IDLE
+        return ACTIVE
+
+    def add_job(self, name, callback, interval, pausable=True):
+        """Register a periodic job, started by start() or immediately if running
+
+        Args:
+            name: Job name, unique per governor
+            callback: Function called without arguments on each tick
+            interval: Milliseconds between runs while active
+            pausable: Whether the job stops while the bar is hidden, too
+        """
+        self.remove_job(name)
+        job = PeriodicJob(name, callback, interval, pausable)
+        self.jobs[name] = job
+        if self.running:
+            self._run_job(job)
+
+    def remove_job(self, name):
+        """Stop and forget a job"""
+        job = self.jobs.pop(name, None)
+        if job:
+            self._cancel_job(job)
+
+    def set_interval(self, name, interval):
+        """Change a job's interval, a pending tick is rescheduled at the new rate"""
+        job = self.jobs.get(name)
+        if job is None or job.interval == interval:
+            return
+        job.interval = interval
+        if job.after_id is not None:
+            self._cancel_job(job)
+            self._schedule_job(job)
+
+    def add_listener(self, listener):
+        """Call listener(old_state, new_state) on every state transition"""
+        self.listeners.append(listener)
+
+    def start(self):
+        """Run every job once and start the activity checks"""
+        if self.running:
+            return
+        self.running = True
+        self.check()
+        for job in list(self.jobs.values()):
+            if job.after_id is None:
+                self._run_job(job)
+
+    def stop(self):
+        """Cancel all pending jobs and checks"""
+        self.running = False
+        if self.check_after_id is not None:
+            self.root.after_cancel(self.check_after_id)
+            self.check_after_id = None
+        for job in self.jobs.values():
+            self._cancel_job(job)
+
+    def set_hidden(self, hidden):
+        """Report whether the bar is hidden, re-evaluating the state at once"""
+        if hidden != self.hidden:
+            self.hidden = hidden
+            self.update_state()
+
+    def update_state(self):
+        """Read the signals and transition if the state or the lock changed"""
+        try:
+            locked = bool(self.signals.is_locked())
+            new_state = self.compute_state(
+                self.hidden,
+                locked,
+                self.signals.get_idle_seconds(),
+                self.idle_threshold
+            )
+        except Exception as e:
+            logger.error("Error reading activity signals: %s", e)
+            locked, new_state = False, ACTIVE
+        if new_state != self.state or locked != self.locked:
+            self._transition(new_state, locked)
+
+    def check(self):
+        """Periodic activity check"""
+        self.update_state()
+        if self.running:
+            self.check_after_id = self.root.after(self.check_interval, self.check)
+
+    def get_interval(self, job, state=None, locked=None):
+        """Interval of a job in `state`, the current one by default, None when it should not run"""
+        state = state or self.state
+        locked = self.locked if locked is None else locked
+        if state == PAUSED:
+            return None if job.pausable or locked else job.interval
+        if state == IDLE:
+            return job.interval * self.idle_factor
+        return job.interval
+
+    def _transition(self, new_state, locked):
+        old_state, old_locked = self.state, self.locked
+        self.state, self.locked = new_state, locked
+        if new_state == old_state:
+            # Locked while already hidden, or the other way round
+            logger.info("Activity state %s, %s", new_state, "locked" if locked else "unlocked")
+        else:
+            logger.info("Activity state %s -> %s", old_state, new_state)
+
+        if self.running:
+            for job in self.jobs.values():
+                old_interval = self.get_interval(job, old_state, old_locked)
+                interval = self.get_interval(job)
+                if interval is None:
+                    self._cancel_job(job)
+                elif old_interval is None or (job.pausable and new_state == ACTIVE and old_state != ACTIVE):
+                    # Resume with one immediate refresh instead of waiting a tick
+                    self._cancel_job(job)
+                    self._run_job(job)
+                elif job.after_id is not None and old_interval != interval:
+                    # The pending tick was scheduled at the old rate
+                    self._cancel_job(job)
+                    self._schedule_job(job)
+
+        if new_state == old_state:
+            return
+        for listener in self.listeners:
+            try:
+                listener(old_state, new_state)
+            except Exception as e:
+                logger.error("Error in activity listener: %s", e)
+
+    def _run_job(self, job):
+        job.after_id = None
+        if self.get_interval(job) is None:
+            return
+        try:
+            job.callback()
+        except Exception as e:
+            logger.error("Error in periodic job %s: %s", job.name, e)
+        # The callback may have removed its own job
+        if self.running and self.jobs.get(job.name) is job:
+            self._schedule_job(job)
+
+    def _schedule_job(self, job):
+        interval = self.get_interval(job)
+        if interval is not None and job.after_id is None:
+            job.after_id = self.root.after(interval, lambda: self._run_job(job))
+
+    def _cancel_job(self, job):
+        if job.after_id is not None:
+            self.root.after_cancel(job.after_id)
+            job.after_id = None
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# system/audio.py - Audio endpoint access and rate-limited volume writes
+import time
+import threading
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioDevice:
+    """Interface for the default playback endpoint, volume is 0.0-1.0"""
+
+    def initialize_thread(self):
+        """Prepare the calling thread before its first call, e.g. COM init"""
+
+    def get_volume(self):
+        raise NotImplementedError
+
+    def set_volume(self, volume):
+        raise NotImplementedError
+
+    def get_mute(self):
+        raise NotImplementedError
+
+    def set_mute(self, mute):
+        raise NotImplementedError
+
+
+class PycawAudioDevice(AudioDevice):
+    def __init__(self):
+        """Default speakers through pycaw, one instance per thread
+
+        COM interfaces belong to the apartment that created them, so the
+        endpoint is activated lazily on the thread that first uses it.
+        """
+        self.endpoint = None
+
+    def initialize_thread(self):
+        import comtypes
+        comtypes.CoInitialize()
+
+    def get_endpoint(self):
+        if self.endpoint is None:
+            from ctypes import cast, POINTER
+            from comtypes import CLSCTX_ALL
+            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+
+            devices = AudioUtilities.GetSpeakers()
+            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+            self.endpoint = cast(interface, POINTER(IAudioEndpointVolume))
+        return self.endpoint
+
+    def call(self, method, *args):
+        try:
+            return getattr(self.get_endpoint(), method)(*args)
+        except Exception:
+            # The default device may have changed, activate it again next time
+            self.endpoint = None
+            raise
+
+    def get_volume(self):
+        return self.call("GetMasterVolumeLevelScalar")
+
+    def set_volume(self, volume):
+        self.call("SetMasterVolumeLevelScalar", volume, None)
+
+    def get_mute(self):
+        return bool(self.call("GetMute"))
+
+    def set_mute(self, mute):
+        self.call("SetMute", int(mute), None)
+
+
+class FakeAudioDevice(AudioDevice):
+    def __init__(self, volume=0.5, mute=False):
+        """In-memory device for tests, counts endpoint writes"""
+        self.volume = volume
+        self.mute = mute
+        self.volume_writes = 0
+        self.mute_writes = 0
+
+    def get_volume(self):
+        return self.volume
+
+    def set_volume(self, volume):
+        self.volume = volume
+        self.volume_writes += 1
+
+    def get_mute(self):
+        return self.mute
+
+    def set_mute(self, mute):
+        self.mute = mute
+        self.mute_writes += 1
+
+
+class VolumeController:
+    def __init__(self, device_factory, step=0.02, max_rate=20, settle_time=0.5):
+        """Accumulate wheel input and apply it from one background writer
+
+        The UI thread only updates the target under a lock. The writer thread
+        sends the latest target to the device at most `max_rate` times per
+        second, so a fast wheel spin collapses into a few endpoint calls.
+
+        Args:
+            device_factory: Returns the AudioDevice used by the writer thread
+            step: Volume change per wheel notch
+            max_rate: Maximum endpoint writes per second
+            settle_time: Seconds after the last write before device readings
+                replace the optimistic value
+        """
+        self.device_factory = device_factory
+        self.step = step
+        self.min_interval = 1.0 / max_rate
+        self.settle_time = settle_time
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.volume = None  # Best known volume, optimistic while writes are pending
+        self.mute = False
+        self.pending_volume = None
+        self.pending_mute = None
+        self.writing = False  # A write taken off pending has not reached the device yet
+        self.last_write = 0.0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._write_loop, name="volume-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def scroll(self, notches):
+        """Change the volume by a number of wheel notches, UI thread side
+
+        Returns:
+            float or None: Optimistic new volume, None if the volume is unknown
+        """
+        with self.lock:
+            if self.volume is None:
+                return None
+            self.volume = min(1.0, max(0.0, self.volume + notches * self.step))
+            self.pending_volume = self.volume
+        self.wakeup.set()
+        return self.volume
+
+    def toggle_mute(self):
+        """Flip mute, UI thread side
+
+        Returns:
+            bool: Optimistic new mute state
+        """
+        with self.lock:
+            self.mute = not self.mute
+            self.pending_mute = self.mute
+        self.wakeup.set()
+        return self.mute
+
+    def reconcile(self, volume, mute):
+        """Take the device's reported state unless local changes are in flight
+
+        Args:
+            volume: Volume read from the device
+            mute: Mute state read from the device
+        """
+        with self.lock:
+            busy = (
+                self.pending_volume is not None or self.pending_mute is not None or self.writing or
+                time.monotonic() - self.last_write < self.settle_time
+            )
+            if not busy:
+                self.volume = volume
+                self.mute = mute
+
+    def get_state(self):
+        """Best known (volume, mute), volume None until the first reading"""
+        with self.lock:
+            return self.volume, self.mute
+
+    def _write_loop(self):
+        device = None
+        while self.running:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            if not self.running:
+                break
+
+            # Bound the write rate, more wheel input is merged meanwhile
+            delay = self.last_write + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.lock:
+                volume, self.pending_volume = self.pending_volume, None
+                mute, self.pending_mute = self.pending_mute, None
+                if volume is None and mute is None:
+                    continue
+                # Until the write lands, readings still show the old state
+                self.writing = True
+
+            try:
+                if device is None:
+                    device = self.device_factory()
+                    device.initialize_thread()
+                if mute is not None:
+                    device.set_mute(mute)
+                if volume is not None:
+                    device.set_volume(volume)
+            except Exception as e:
+                logger.error("Error setting volume: %s", e)
+            with self.lock:
+                self.writing = False
+                self.last_write = time.monotonic()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# system/backend.py - Platform backend interface and lazy loader, see backend_windows/backend_x11
+import os
+import sys
+import subprocess
+from collections import namedtuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The active top-level window as seen by a backend
+#   handle: Platform window id
+#   class_name: Window class (Windows) or WM_CLASS class (X11)
+#   rect: (left, top, right, bottom) in virtual-desktop pixels
+#   fullscreen: True/False when the platform reports it, None to judge by rect
+#   pid: Owning process id, None if unknown
+ForegroundWindow = namedtuple("ForegroundWindow", ["handle", "class_name", "rect", "fullscreen", "pid"])
+
+
+class SpaceReserver:
+    """Keeps a bar's strip of the screen free of other windows, no-op by default"""
+
+    # Whether something else may reset the reservation, so check() has to run periodically
+    needs_checks = False
+
+    def reserve(self):
+        """Claim the space, called when the bar appears"""
+
+    def check(self):
+        """Re-claim the space if something reset it"""
+
+    def suspend(self):
+        """Give the space back while the bar is hidden"""
+
+    def release(self):
+        """Give the space back for good, called on exit"""
+
+
+class Backend:
+    """Portable fallbacks, used as-is on platforms without a dedicated backend"""
+
+    name = "generic"
+    # Window classes that only show the desktop, never a fullscreen application
+    desktop_classes = ()
+    # Callable returning an AudioDevice, None when volume control is unsupported
+    audio_device_factory = None
+
+    def get_scale_factor(self, root):
+        """Enable DPI awareness and return the integer UI scale"""
+        return 1
+
+    def setup_bar_window(self, window):
+        """Make a window a borderless, always-on-top bar"""
+        window.overrideredirect(True)
+        window.attributes("-topmost", True)
+
+    def raise_bar_window(self, window):
+        """Put the bar back on top after it was shown again"""
+        window.lift()
+
+    def get_window_handle(self, window):
+        """Platform id of a Tk window, as reported by get_foreground_window"""
+        return int(window.winfo_id())
+
+    def create_space_reserver(self, window, monitor, height, manages_work_area):
+        """Reserve `height` pixels at the top of a monitor for a bar
+
+        Args:
+            window: Tk window of the bar
+            monitor: MonitorInfo the bar sits on
+            height: Bar height in pixels
+            manages_work_area: Whether this bar may change the global work area
+
+        Returns:
+            SpaceReserver
+        """
+        return SpaceReserver()
+
+    def get_foreground_window(self):
+        """ForegroundWindow, or None if unknown"""
+        return None
+
+    def capture_rect(self, left, top, right, bottom):
+        """Grab a screen rectangle in virtual-desktop pixels
+
+        Returns:
+            numpy.ndarray: (height, width, 3) uint8 RGB pixels
+        """
+        import numpy as np
+        from PIL import ImageGrab
+        image = ImageGrab.grab(bbox=(left, top, right, bottom), all_screens=True)
+        return np.asarray(image.convert("RGB"))
+
+    def get_input_method(self):
+        """"中" or "英" for the focused window's input mode, None if unknown"""
+        return None
+
+    def get_system_proxy(self):
+        """System proxy setting
+
+        Returns:
+            tuple: (enabled, server)
+        """
+        server = os.environ.get("https_proxy") or os.environ.get("http_proxy") or ""
+        return bool(server), server
+
+    def open_path(self, path):
+        """Open a file, folder or program without blocking the Tk thread"""
+        if not os.path.exists(path):
+            logger.warning("路径不存在: %s", path)
+            return
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        subprocess.Popen([opener, path])
+
+    def create_monitor_provider(self, root):
+        from system.displays import TkMonitorProvider
+        return TkMonitorProvider(root)
+
+    def create_activity_signals(self):
+        from system.activity import ActivitySignals
+        return ActivitySignals()
+
+    def create_window_probe(self):
+        from system.window_probe import WindowProbe
+        return WindowProbe()
+
+    def stop(self):
+        """Stop background threads and close connections the backend holds, on exit"""
+
+
+_backend = None
+
+
+def load_backend(platform=sys.platform):
+    """Import and create the backend for a platform
+
+    Each backend module is imported only here, so one platform never
+    loads the other's modules.
+    """
+    try:
+        if platform == "win32":
+            from system.backend_windows import WindowsBackend
+            return WindowsBackend()
+        if platform.startswith("linux") and os.environ.get("DISPLAY"):
+            from system.backend_x11 import X11Backend
+            return X11Backend()
+    except Exception as e:
+        logger.error("Error loading the %s backend, using generic fallbacks: %s", platform, e)
+    return Backend()
+
+
+def get_backend():
+    """The backend for this process, loaded on first use"""
+    global _backend
+    if _backend is None:
+        _backend = load_backend()
+        logger.info("Using %s platform backend", _backend.name)
+    return _backend
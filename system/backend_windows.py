@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+# system/backend_windows.py - Win32 backend: AppBar, monitors, activity, window probe, IME and registry
+#
+# Imported only on Windows, by system.backend.load_backend
+import os
+import subprocess
+import winreg
+from ctypes import (
+    windll, wintypes, byref, c_int, c_long, Structure, sizeof, WinDLL, WINFUNCTYPE, POINTER, create_unicode_buffer
+)
+
+from system.activity import ActivitySignals
+from system.audio import PycawAudioDevice
+from system.backend import Backend, SpaceReserver, ForegroundWindow
+from system.displays import MonitorProvider, MonitorInfo, sort_monitors
+from system.window_probe import WindowProbe, STYLE_FILL, STYLE_STRETCH, STYLE_CENTER, STYLE_OTHER
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Windows API constants
+GWL_EXSTYLE = -20
+WS_EX_TOPMOST = 0x0008
+WS_EX_TOOLWINDOW = 0x0080
+WS_EX_NOACTIVATE = 0x08000000
+HWND_TOPMOST = -1
+SWP_NOMOVE = 0x0002
+SWP_NOSIZE = 0x0001
+SWP_NOACTIVATE = 0x0010
+SWP_SHOWWINDOW = 0x0040
+SPI_GETWORKAREA = 0x0030
+SPI_SETWORKAREA = 0x002F
+SPIF_SENDCHANGE = 0x01
+
+SPI_GETDESKWALLPAPER = 0x0073
+GA_ROOT = 2
+MAX_PATH = 260
+MONITORINFOF_PRIMARY = 0x00000001
+DESKTOP_SWITCHDESKTOP = 0x0100
+
+# Top-level windows that only ever show the wallpaper
+WALLPAPER_CLASSES = ["Progman", "WorkerW"]
+
+# IME constants
+WM_IME_CONTROL = 0x0283
+IMC_GETCONVERSIONMODE = 0x0001
+IME_CMODE_NATIVE = 0x0001  # Chinese mode
+
+
+class APPBARDATA(Structure):
+    _fields_ = [
+        ("cbSize", c_int),
+        ("hWnd", wintypes.HWND),
+        ("uCallbackMessage", c_int),
+        ("uEdge", c_int),
+        ("rc", wintypes.RECT),
+        ("lParam", wintypes.LPARAM)
+    ]
+
+# AppBar messages
+ABM_NEW = 0x00000000
+ABM_REMOVE = 0x00000001
+ABM_QUERYPOS = 0x00000002
+ABM_SETPOS = 0x00000003
+ABM_WINDOWPOSCHANGED = 0x00000009
+
+# AppBar edges
+ABE_TOP = 1
+
+
+def set_topmost(hwnd):
+    windll.user32.SetWindowPos(
+        hwnd,
+        HWND_TOPMOST,
+        0, 0, 0, 0,
+        SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_SHOWWINDOW
+    )
+
+
+class AppBarReserver(SpaceReserver):
+    def __init__(self, window, monitor, height, manages_work_area):
+        """Reserve the bar's strip as a Windows AppBar, like the taskbar
+
+        SPI_SETWORKAREA is also applied as a fallback, but it only changes
+        the primary monitor, so other monitors rely on the AppBar alone.
+
+        Args:
+            window: Tk window of the bar
+            monitor: MonitorInfo the bar sits on
+            height: Bar height in pixels
+            manages_work_area: Whether SPI_SETWORKAREA may be used
+        """
+        self.window = window
+        self.monitor = monitor
+        self.height = height
+        self.manages_work_area = manages_work_area
+        # Explorer resets SPI_SETWORKAREA, e.g. on display changes
+        self.needs_checks = manages_work_area
+        self.appbar_data = None
+        self.registered = False
+        self.original_work_area = None
+
+    def reserve(self):
+        self.register_app_bar()
+        self.adjust_work_area()
+
+    def register_app_bar(self):
+        if self.registered:
+            return
+
+        # Initialize APPBARDATA structure
+        self.appbar_data = APPBARDATA()
+        self.appbar_data.cbSize = sizeof(APPBARDATA)
+        self.appbar_data.hWnd = int(self.window.winfo_id())
+        self.appbar_data.uEdge = ABE_TOP
+
+        # Register as new AppBar
+        if not windll.shell32.SHAppBarMessage(ABM_NEW, byref(self.appbar_data)):
+            logger.warning("Failed to register AppBar, falling back to manual work area adjustment")
+            return
+        self.registered = True
+
+        # Define the AppBar area - top of this bar's monitor
+        self.appbar_data.rc.left = self.monitor.left
+        self.appbar_data.rc.top = self.monitor.top
+        self.appbar_data.rc.right = self.monitor.right
+        self.appbar_data.rc.bottom = self.monitor.top + self.height
+
+        # Query Windows for the position (might adjust our requested position)
+        windll.shell32.SHAppBarMessage(ABM_QUERYPOS, byref(self.appbar_data))
+
+        # Set the position
+        windll.shell32.SHAppBarMessage(ABM_SETPOS, byref(self.appbar_data))
+
+        # Notify the system when the position changes
+        windll.shell32.SHAppBarMessage(ABM_WINDOWPOSCHANGED, byref(self.appbar_data))
+
+        logger.info("AppBar registered successfully")
+
+    def adjust_work_area(self):
+        """Directly adjust the Windows work area as fallback
+
+        Returns:
+            bool: True if the work area had to be changed
+        """
+        if not self.manages_work_area:
+            return False
+        try:
+            # Get current work area
+            work_area = wintypes.RECT()
+            windll.user32.SystemParametersInfoW(SPI_GETWORKAREA, 0, byref(work_area), 0)
+
+            # Store original work area if we haven't yet
+            if self.original_work_area is None:
+                self.original_work_area = wintypes.RECT(
+                    work_area.left, work_area.top, work_area.right, work_area.bottom
+                )
+
+            # Check if work area needs adjustment
+            if work_area.top >= self.height:
+                return False
+            work_area.top = self.height
+
+            # Apply the new work area with broadcast to all windows
+            windll.user32.SystemParametersInfoW(SPI_SETWORKAREA, 0, byref(work_area), SPIF_SENDCHANGE)
+            logger.info("Work area manually adjusted: top=%d", work_area.top)
+            return True
+        except Exception as e:
+            logger.error("Error adjusting work area: %s", e)
+            return False
+
+    def check(self):
+        if not self.manages_work_area:
+            return
+        work_area = wintypes.RECT()
+        windll.user32.SystemParametersInfoW(SPI_GETWORKAREA, 0, byref(work_area), 0)
+
+        # If work area has been reset, adjust it again
+        if work_area.top < self.height:
+            logger.info("Work area was reset, readjusting...")
+            self.adjust_work_area()
+
+    def restore_work_area(self):
+        if self.original_work_area is not None:
+            windll.user32.SystemParametersInfoW(
+                SPI_SETWORKAREA, 0, byref(self.original_work_area), SPIF_SENDCHANGE
+            )
+            return True
+        return False
+
+    def suspend(self):
+        self.restore_work_area()
+
+    def release(self):
+        # Unregister AppBar if registered
+        if self.registered:
+            windll.shell32.SHAppBarMessage(ABM_REMOVE, byref(self.appbar_data))
+            self.registered = False
+            logger.info("AppBar unregistered")
+
+        if self.restore_work_area():
+            logger.info("Original work area restored")
+
+
+class WindowsMonitorProvider(MonitorProvider):
+    """Enumerate monitors with EnumDisplayMonitors/GetMonitorInfoW"""
+
+    def get_monitors(self):
+        class MONITORINFOEXW(Structure):
+            _fields_ = [
+                ("cbSize", wintypes.DWORD),
+                ("rcMonitor", wintypes.RECT),
+                ("rcWork", wintypes.RECT),
+                ("dwFlags", wintypes.DWORD),
+                ("szDevice", wintypes.WCHAR * 32)
+            ]
+
+        MonitorEnumProc = WINFUNCTYPE(
+            wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC, POINTER(wintypes.RECT), wintypes.LPARAM
+        )
+
+        monitors = []
+
+        def callback(hmonitor, hdc, rect, lparam):
+            info = MONITORINFOEXW()
+            info.cbSize = sizeof(MONITORINFOEXW)
+            if windll.user32.GetMonitorInfoW(hmonitor, byref(info)):
+                rc = info.rcMonitor
+                monitors.append(MonitorInfo(
+                    info.szDevice, rc.left, rc.top, rc.right, rc.bottom,
+                    bool(info.dwFlags & MONITORINFOF_PRIMARY)
+                ))
+            return True
+
+        try:
+            windll.user32.EnumDisplayMonitors(None, None, MonitorEnumProc(callback), 0)
+        except Exception as e:
+            logger.error("Error enumerating monitors: %s", e)
+        return sort_monitors(monitors)
+
+
+class WindowsActivitySignals(ActivitySignals):
+    """Idle time from GetLastInputInfo, lock state from the input desktop"""
+
+    def __init__(self):
+        class LASTINPUTINFO(Structure):
+            _fields_ = [
+                ("cbSize", wintypes.UINT),
+                ("dwTime", wintypes.DWORD)
+            ]
+
+        self.user32 = windll.user32
+        self.kernel32 = windll.kernel32
+        self.last_input = LASTINPUTINFO()
+        self.last_input.cbSize = sizeof(LASTINPUTINFO)
+
+    def get_idle_seconds(self):
+        try:
+            if not self.user32.GetLastInputInfo(byref(self.last_input)):
+                return 0.0
+            # Both are 32-bit millisecond tick counts that wrap after ~49 days
+            elapsed = (self.kernel32.GetTickCount() - self.last_input.dwTime) & 0xFFFFFFFF
+            return elapsed / 1000.0
+        except Exception as e:
+            logger.error("Error reading last input time: %s", e)
+            return 0.0
+
+    def is_locked(self):
+        try:
+            # The secure desktop cannot be opened or switched to while locked
+            hdesk = self.user32.OpenInputDesktop(0, False, DESKTOP_SWITCHDESKTOP)
+            if not hdesk:
+                return True
+            locked = not self.user32.SwitchDesktop(hdesk)
+            self.user32.CloseDesktop(hdesk)
+            return locked
+        except Exception as e:
+            logger.error("Error reading session lock state: %s", e)
+            return False
+
+
+class WindowsWindowProbe(WindowProbe):
+    def __init__(self):
+        super().__init__()
+        self.user32 = windll.user32
+        self.wintypes = wintypes
+        # POINT is passed by value
+        self.user32.WindowFromPoint.argtypes = [wintypes.POINT]
+        self.user32.WindowFromPoint.restype = wintypes.HWND
+        self.user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+        self.user32.GetAncestor.restype = wintypes.HWND
+
+    def get_class_name(self, hwnd):
+        class_name = create_unicode_buffer(256)
+        self.user32.GetClassNameW(hwnd, class_name, 256)
+        return class_name.value
+
+    def get_foreground(self):
+        try:
+            hwnd = self.user32.GetForegroundWindow()
+            if not hwnd:
+                return None
+            pid = self.wintypes.DWORD(0)
+            self.user32.GetWindowThreadProcessId(hwnd, byref(pid))
+            return (self.get_class_name(hwnd), self.get_process_name(pid.value))
+        except Exception as e:
+            logger.error("Error reading foreground window: %s", e)
+            return None
+
+    def is_desktop_at(self, points):
+        try:
+            for x, y in points:
+                hwnd = self.user32.WindowFromPoint(self.wintypes.POINT(int(x), int(y)))
+                if not hwnd:
+                    return False
+                # Desktop icons are children of Progman/WorkerW
+                root_hwnd = self.user32.GetAncestor(hwnd, GA_ROOT) or hwnd
+                if self.get_class_name(root_hwnd) not in WALLPAPER_CLASSES:
+                    return False
+            return True
+        except Exception as e:
+            logger.error("Error probing window under the bar: %s", e)
+            return False
+
+    def get_wallpaper_path(self):
+        try:
+            buffer = create_unicode_buffer(MAX_PATH)
+            self.user32.SystemParametersInfoW(SPI_GETDESKWALLPAPER, MAX_PATH, buffer, 0)
+            return buffer.value or None
+        except Exception as e:
+            logger.error("Error reading wallpaper path: %s", e)
+            return None
+
+    def get_wallpaper_style(self):
+        try:
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\Desktop")
+            style, _ = winreg.QueryValueEx(key, "WallpaperStyle")
+            tile, _ = winreg.QueryValueEx(key, "TileWallpaper")
+            winreg.CloseKey(key)
+        except Exception:
+            return STYLE_OTHER
+        if str(tile) == "1":
+            return STYLE_OTHER
+        return {"10": STYLE_FILL, "2": STYLE_STRETCH, "0": STYLE_CENTER}.get(str(style), STYLE_OTHER)
+
+
+class WindowsBackend(Backend):
+    name = "windows"
+    # Shell windows that never count as fullscreen applications
+    desktop_classes = ("Progman", "WorkerW", "Shell_TrayWnd", "Shell_SecondaryTrayWnd")
+    audio_device_factory = PycawAudioDevice
+
+    def __init__(self):
+        self.user32 = WinDLL("user32", use_last_error=True)
+        self.imm32 = WinDLL("imm32", use_last_error=True)
+        self.user32.SendMessageW.restype = c_long
+
+    def get_scale_factor(self, root):
+        windll.shcore.SetProcessDpiAwareness(1)
+        return int(windll.shcore.GetScaleFactorForDevice(0) / 100)
+
+    def setup_bar_window(self, window):
+        window.overrideredirect(True)
+        hwnd = int(window.winfo_id())
+
+        # Set the window as a tool window (doesn't appear in Alt+Tab)
+        style = windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+        windll.user32.SetWindowLongW(
+            hwnd,
+            GWL_EXSTYLE,
+            style | WS_EX_TOOLWINDOW | WS_EX_TOPMOST | WS_EX_NOACTIVATE
+        )
+
+        # Set window always on top with proper flags
+        set_topmost(hwnd)
+
+    def raise_bar_window(self, window):
+        set_topmost(int(window.winfo_id()))
+
+    def create_space_reserver(self, window, monitor, height, manages_work_area):
+        return AppBarReserver(window, monitor, height, manages_work_area)
+
+    def get_foreground_window(self):
+        hwnd = windll.user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+
+        class_name = create_unicode_buffer(256)
+        windll.user32.GetClassNameW(hwnd, class_name, 256)
+        rect = wintypes.RECT()
+        windll.user32.GetWindowRect(hwnd, byref(rect))
+        return ForegroundWindow(
+            hwnd, class_name.value, (rect.left, rect.top, rect.right, rect.bottom), None, None
+        )
+
+    def get_input_method(self):
+        try:
+            hwnd = self.user32.GetForegroundWindow()
+            if not hwnd:
+                return "英"  # Default to English if can't get window
+
+            # Get IME context for the window
+            himc = self.imm32.ImmGetContext(hwnd)
+            if not himc:
+                # Ask the default IME window for the conversion mode instead
+                ime_hwnd = self.imm32.ImmGetDefaultIMEWnd(hwnd)
+                if not ime_hwnd:
+                    return "英"
+                result = self.user32.SendMessageW(ime_hwnd, WM_IME_CONTROL, IMC_GETCONVERSIONMODE, 0)
+                return "中" if result & IME_CMODE_NATIVE else "英"
+
+            conversion = wintypes.DWORD(0)
+            sentence = wintypes.DWORD(0)
+            ret = self.imm32.ImmGetConversionStatus(himc, byref(conversion), byref(sentence))
+            self.imm32.ImmReleaseContext(hwnd, himc)
+            if not ret:
+                return "英"
+            return "中" if conversion.value & IME_CMODE_NATIVE else "英"
+        except Exception as e:
+            logger.error("Error detecting input method: %s", e)
+            return "英"  # Default to English on error
+
+    def get_system_proxy(self):
+        # 查看Windows注册表中的代理设置
+        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Internet Settings")
+        try:
+            proxy_enable, _ = winreg.QueryValueEx(key, "ProxyEnable")
+            proxy_server, _ = winreg.QueryValueEx(key, "ProxyServer")
+        finally:
+            winreg.CloseKey(key)
+        return proxy_enable == 1, proxy_server
+
+    def open_path(self, path):
+        if path.startswith("::{"):
+            # Shell folder GUIDs such as This PC only open through Explorer
+            subprocess.Popen(["explorer", path])
+        elif os.path.exists(path):
+            os.startfile(path)
+        else:
+            logger.warning("路径不存在: %s", path)
+
+    def create_monitor_provider(self, root):
+        return WindowsMonitorProvider()
+
+    def create_activity_signals(self):
+        return WindowsActivitySignals()
+
+    def create_window_probe(self):
+        return WindowsWindowProbe()
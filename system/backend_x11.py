@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# system/backend_x11.py - Linux/X11 backend: EWMH struts, active-window events, row capture
+#
+# Imported only on Linux with $DISPLAY set, by system.backend.load_backend
+import os
+import select
+import threading
+
+import numpy as np
+from Xlib import X, Xatom, display as xdisplay
+
+from system.backend import Backend, SpaceReserver, ForegroundWindow
+from system.activity import ActivitySignals
+from system.displays import MonitorProvider, MonitorInfo, TkMonitorProvider, sort_monitors
+from system.window_probe import WindowProbe
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def convert_zpixmap(data, width, height, bits_per_pixel, byte_order):
+    """RGB pixels from a TrueColor ZPixmap reply of GetImage
+
+    Args:
+        data: Image bytes, `height` scanlines of a possibly padded stride
+        width: Image width in pixels
+        height: Image height in pixels
+        bits_per_pixel: From the server's pixmap format for the image depth
+        byte_order: X.LSBFirst or X.MSBFirst, the server's image byte order
+
+    Returns:
+        numpy.ndarray or None: (height, width, 3) uint8 RGB pixels, None for
+        formats other than 32 bits per pixel
+    """
+    if bits_per_pixel != 32 or height <= 0:
+        return None
+    stride = len(data) // height
+    if stride < width * 4:
+        return None
+    rows = np.frombuffer(data, dtype=np.uint8, count=stride * height).reshape(height, stride)
+    pixels = rows[:, :width * 4].reshape(height, width, 4)
+    if byte_order == X.MSBFirst:
+        return pixels[:, :, 1:4]  # XRGB
+    return pixels[:, :, 2::-1]  # BGRX
+
+
+class StrutReserver(SpaceReserver):
+    def __init__(self, backend, window, monitor, height):
+        """Reserve the bar's strip with _NET_WM_STRUT_PARTIAL
+
+        The window manager keeps the strip free for as long as the dock
+        window is mapped, so nothing has to be re-checked and hiding the
+        bar releases the space by itself.
+
+        Args:
+            backend: X11Backend owning the display connection
+            window: Tk window of the bar
+            monitor: MonitorInfo the bar sits on
+            height: Bar height in pixels
+        """
+        self.backend = backend
+        self.window = window
+        self.monitor = monitor
+        self.height = height
+
+    def set_strut(self, top, start_x, end_x):
+        display = self.backend.display
+        xwindow = display.create_resource_object("window", self.backend.get_window_handle(self.window))
+        # left, right, top, bottom, then start/end pairs for each edge
+        partial = [0, 0, top, 0, 0, 0, 0, 0, start_x, end_x, 0, 0]
+        xwindow.change_property(self.backend.atom("_NET_WM_STRUT_PARTIAL"), Xatom.CARDINAL, 32, partial)
+        # Older window managers only read the plain strut
+        xwindow.change_property(self.backend.atom("_NET_WM_STRUT"), Xatom.CARDINAL, 32, partial[:4])
+        display.flush()
+
+    def reserve(self):
+        try:
+            # Struts are measured from the edge of the whole X screen
+            self.set_strut(self.monitor.top + self.height, self.monitor.left, self.monitor.right - 1)
+        except Exception as e:
+            logger.error("Error setting the bar strut: %s", e)
+
+    def release(self):
+        try:
+            self.set_strut(0, 0, 0)
+        except Exception as e:
+            logger.error("Error clearing the bar strut: %s", e)
+
+
+class ActiveWindowWatcher:
+    def __init__(self):
+        """Track the active window from _NET_ACTIVE_WINDOW property events
+
+        A background thread owns its own display connection and blocks in
+        next_event. It re-reads the active window only when the root's
+        _NET_ACTIVE_WINDOW or the active window's _NET_WM_STATE changes,
+        so the Tk thread reads a cached value without any X round trip.
+        """
+        self.foreground = None  # Replaced as a whole, safe to read from any thread
+        self.display = xdisplay.Display()
+        self.root = self.display.screen().root
+        self.atoms = {
+            name: self.display.intern_atom(name)
+            for name in ("_NET_ACTIVE_WINDOW", "_NET_WM_STATE", "_NET_WM_STATE_FULLSCREEN", "_NET_WM_PID")
+        }
+        self.watched = None
+        self.stopping = threading.Event()
+        # Closing the display from another thread does not wake a blocked recv, a byte on this pipe does
+        self.wake_read, self.wake_write = os.pipe()
+        self.thread = threading.Thread(target=self._event_loop, name="x11-active-window", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def close(self):
+        """Stop the event thread, then close its display connection"""
+        self.stopping.set()
+        os.write(self.wake_write, b"\0")
+        if self.thread.is_alive():
+            self.thread.join(timeout=1)
+        try:
+            self.display.close()
+        except Exception:
+            pass
+        os.close(self.wake_read)
+        os.close(self.wake_write)
+
+    def read_active_window(self):
+        active = self.root.get_full_property(self.atoms["_NET_ACTIVE_WINDOW"], Xatom.WINDOW)
+        if not active or not active.value or not active.value[0]:
+            return None
+        window = self.display.create_resource_object("window", active.value[0])
+
+        # Follow state changes of the active window too, F11 does not change focus
+        if self.watched is not None and self.watched.id != window.id:
+            try:
+                self.watched.change_attributes(event_mask=X.NoEventMask)
+            except Exception:
+                pass  # Already destroyed
+        window.change_attributes(event_mask=X.PropertyChangeMask)
+        self.watched = window
+
+        wm_class = window.get_wm_class() or ("", "")
+        state = window.get_full_property(self.atoms["_NET_WM_STATE"], Xatom.ATOM)
+        pid = window.get_full_property(self.atoms["_NET_WM_PID"], Xatom.CARDINAL)
+        geometry = window.get_geometry()
+        origin = self.root.translate_coords(window, 0, 0)
+        left, top = origin.x, origin.y
+        return ForegroundWindow(
+            window.id,
+            wm_class[1],
+            (left, top, left + geometry.width, top + geometry.height),
+            bool(state) and self.atoms["_NET_WM_STATE_FULLSCREEN"] in state.value,
+            pid.value[0] if pid and pid.value else None
+        )
+
+    def update(self):
+        try:
+            self.foreground = self.read_active_window()
+        except Exception as e:
+            # The window can vanish between the event and the reads
+            logger.debug("Error reading the active window: %s", e)
+            self.foreground = None
+
+    def _event_loop(self):
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.update()
+        watched_atoms = (self.atoms["_NET_ACTIVE_WINDOW"], self.atoms["_NET_WM_STATE"])
+        try:
+            while not self.stopping.is_set():
+                # Handle everything already received, the reads in update() queue events too
+                while self.display.pending_events():
+                    event = self.display.next_event()
+                    if event.type == X.PropertyNotify and event.atom in watched_atoms:
+                        self.update()
+                select.select([self.display, self.wake_read], [], [])
+        except Exception as e:
+            if not self.stopping.is_set():
+                logger.error("X11 event loop stopped: %s", e)
+
+
+class X11ActivitySignals(ActivitySignals):
+    def __init__(self, display):
+        """Idle time from the MIT-SCREEN-SAVER extension, lock state is not known
+
+        Args:
+            display: Xlib display used on the Tk thread
+        """
+        self.root = display.screen().root
+        self.root.screensaver_query_info()  # Fails now if the extension is missing
+
+    def get_idle_seconds(self):
+        try:
+            return self.root.screensaver_query_info().idle / 1000.0
+        except Exception as e:
+            logger.error("Error reading idle time: %s", e)
+            return 0.0
+
+
+class X11MonitorProvider(MonitorProvider):
+    def __init__(self, display, root):
+        """Monitors from RandR 1.5 GetMonitors, Tk screen size as fallback
+
+        Args:
+            display: Xlib display used on the Tk thread
+            root: Tkinter root window for the fallback
+        """
+        self.display = display
+        self.fallback = TkMonitorProvider(root)
+
+    def get_monitors(self):
+        try:
+            reply = self.display.screen().root.xrandr_get_monitors()
+            monitors = [
+                MonitorInfo(
+                    self.display.get_atom_name(m.name), m.x, m.y,
+                    m.x + m.width_in_pixels, m.y + m.height_in_pixels, bool(m.primary)
+                )
+                for m in reply.monitors
+            ]
+        except Exception as e:
+            logger.error("Error enumerating monitors: %s", e)
+            monitors = []
+        if not monitors:
+            return self.fallback.get_monitors()
+        # Without a primary output the leftmost monitor takes the root window
+        if not any(m.is_primary for m in monitors):
+            first = min(monitors, key=lambda m: (m.left, m.top))
+            monitors[monitors.index(first)] = first._replace(is_primary=True)
+        return sort_monitors(monitors)
+
+
+class X11WindowProbe(WindowProbe):
+    def __init__(self, watcher):
+        """Foreground identity from the active-window watcher's cache"""
+        super().__init__()
+        self.watcher = watcher
+
+    def get_foreground(self):
+        foreground = self.watcher.foreground
+        if foreground is None:
+            return None
+        return (foreground.class_name, self.get_process_name(foreground.pid) if foreground.pid else "")
+
+
+class X11Backend(Backend):
+    name = "x11"
+    # WM_CLASS of desktop-icon windows drawn by common file managers
+    desktop_classes = ("Desktop", "Xfdesktop", "Nemo-desktop", "Pcmanfm", "Caja")
+
+    def __init__(self):
+        # Used on the Tk thread only, the watcher has its own connection
+        self.display = xdisplay.Display()
+        self.atoms = {}
+        self.watcher = ActiveWindowWatcher()
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.close()
+        self.display.close()
+
+    def atom(self, name):
+        atom = self.atoms.get(name)
+        if atom is None:
+            atom = self.atoms[name] = self.display.intern_atom(name)
+        return atom
+
+    def get_scale_factor(self, root):
+        # Tk reads the X server's DPI, 96 is scale 1
+        return max(1, round(root.winfo_fpixels("1i") / 96))
+
+    def setup_bar_window(self, window):
+        # A managed dock window, unlike override-redirect, gets its strut honoured
+        window.attributes("-type", "dock")
+        window.attributes("-topmost", True)
+
+    def get_window_handle(self, window):
+        # The toplevel wrapper, which is what _NET_ACTIVE_WINDOW and struts refer to
+        return int(window.wm_frame(), 16)
+
+    def create_space_reserver(self, window, monitor, height, manages_work_area):
+        # Struts are per window, every monitor's bar reserves its own strip
+        return StrutReserver(self, window, monitor, height)
+
+    def get_foreground_window(self):
+        return self.watcher.foreground
+
+    def capture_rect(self, left, top, right, bottom):
+        # XGetImage of just the requested strip, a few KB per tick; python-xlib has no XShm
+        width, height = right - left, bottom - top
+        image = self.display.screen().root.get_image(left, top, width, height, X.ZPixmap, 0xFFFFFFFF)
+        info = self.display.display.info
+        bits_per_pixel = next(
+            (f.bits_per_pixel for f in info.pixmap_formats if f.depth == image.depth), None
+        )
+        pixels = None
+        if image.depth in (24, 32):
+            pixels = convert_zpixmap(image.data, width, height, bits_per_pixel, info.image_byte_order)
+        if pixels is None:
+            # 16-bit and other visuals, PIL knows how to read them
+            logger.debug("Unsupported X image format, depth %d, %s bpp", image.depth, bits_per_pixel)
+            return Backend.capture_rect(self, left, top, right, bottom)
+        return pixels
+
+    def create_monitor_provider(self, root):
+        return X11MonitorProvider(self.display, root)
+
+    def create_activity_signals(self):
+        return X11ActivitySignals(self.display)
+
+    def create_window_probe(self):
+        return X11WindowProbe(self.watcher)
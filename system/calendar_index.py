@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# system/calendar_index.py - Incremental .ics parsing and an event index for the agenda
+#
+# Supported: VEVENT with DTSTART/DTEND/DURATION/SUMMARY, RRULE
+# (DAILY/WEEKLY/MONTHLY/YEARLY with INTERVAL, COUNT, UNTIL, daily and weekly
+# BYDAY), EXDATE and RECURRENCE-ID overrides. Series with other BY* parts,
+# e.g. "second Tuesday of the month", are skipped with a warning rather
+# than expanded wrongly. TZID times are read as local time, UTC times ("Z")
+# are converted to local time.
+#
+# Benchmark: python -m system.calendar_index [event_count]
+import os
+import re
+import sys
+import glob
+import time
+import bisect
+import calendar
+import threading
+from datetime import datetime, timedelta, timezone
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CALENDAR_DIR = os.path.join(os.path.expanduser("~"), ".concise_taskbar", "calendars")
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+DURATION_PATTERN = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+MAX_EVENT_DAYS = 366  # Longer events are only indexed on their first year of days
+
+
+class Event:
+    __slots__ = ("start", "end", "summary", "all_day")
+
+    def __init__(self, start, end, summary, all_day=False):
+        """One concrete occurrence, times are naive local datetimes"""
+        self.start = start
+        self.end = end
+        self.summary = summary
+        self.all_day = all_day
+
+    def __repr__(self):
+        return f"Event({self.start:%Y-%m-%d %H:%M}, {self.summary!r})"
+
+
+class RawEvent:
+    __slots__ = ("uid", "start", "end", "summary", "all_day", "rrule", "exdates", "recurrence_id")
+
+    def __init__(self):
+        """A VEVENT as parsed, before recurrence expansion"""
+        self.uid = None
+        self.start = None
+        self.end = None
+        self.summary = ""
+        self.all_day = False
+        self.rrule = None
+        self.exdates = set()
+        self.recurrence_id = None
+
+
+def parse_ics_datetime(value, params=""):
+    """Parse a DATE or DATE-TIME value
+
+    Returns:
+        tuple: (naive local datetime, is_date)
+    """
+    value = value.strip()
+    # Slicing is several times faster than strptime on large calendars
+    if len(value) == 8 or "VALUE=DATE" in params and "VALUE=DATE-TIME" not in params:
+        return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8])), True
+    if value[8:9] != "T":
+        raise ValueError(f"invalid date-time {value!r}")
+    dt = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                  int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    if value.endswith("Z"):
+        return dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None), False
+    return dt, False
+
+
+def parse_ics_duration(value):
+    match = DURATION_PATTERN.match(value.strip())
+    if not match:
+        return None
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0)
+    )
+    return -delta if sign == "-" else delta
+
+
+def iter_unfolded_lines(stream):
+    """Yield logical content lines, joining RFC 5545 folded continuations"""
+    pending = None
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if pending is not None:
+                pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def unescape_text(value):
+    return (value.replace("\\n", " ").replace("\\N", " ")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def parse_ics(stream):
+    """Stream VEVENTs out of an iCalendar file without loading it whole
+
+    Args:
+        stream: Iterable of text lines
+
+    Yields:
+        RawEvent
+    """
+    event = None
+    duration = None
+    for line in iter_unfolded_lines(stream):
+        if event is None:
+            if line == "BEGIN:VEVENT":
+                event = RawEvent()
+                duration = None
+            continue
+
+        if line == "END:VEVENT":
+            if event.start is not None:
+                if event.end is None:
+                    if duration is not None:
+                        event.end = event.start + duration
+                    else:
+                        event.end = event.start + (timedelta(days=1) if event.all_day else timedelta())
+                yield event
+            event = None
+            continue
+
+        head, _, value = line.partition(":")
+        name, _, params = head.partition(";")
+        name = name.upper()
+        try:
+            if name == "DTSTART":
+                event.start, event.all_day = parse_ics_datetime(value, params)
+            elif name == "DTEND":
+                event.end = parse_ics_datetime(value, params)[0]
+            elif name == "DURATION":
+                duration = parse_ics_duration(value)
+            elif name == "SUMMARY":
+                event.summary = unescape_text(value)
+            elif name == "UID":
+                event.uid = value
+            elif name == "RRULE":
+                event.rrule = dict(part.split("=", 1) for part in value.split(";") if "=" in part)
+            elif name == "EXDATE":
+                for item in value.split(","):
+                    event.exdates.add(parse_ics_datetime(item, params)[0])
+            elif name == "RECURRENCE-ID":
+                event.recurrence_id = parse_ics_datetime(value, params)[0]
+        except ValueError:
+            continue  # Skip malformed properties, keep the rest of the event
+
+
+def parse_ics_file(path):
+    """Parse one file into a list of RawEvent"""
+    with open(path, encoding="utf-8", errors="replace") as stream:
+        return list(parse_ics(stream))
+
+
+def add_months(dt, months):
+    """Same day and time `months` later, None when that day does not exist"""
+    month_index = dt.month - 1 + months
+    year, month = dt.year + month_index // 12, month_index % 12 + 1
+    if dt.day > calendar.monthrange(year, month)[1]:
+        return None
+    return dt.replace(year=year, month=month)
+
+
+def get_unsupported_parts(rule, start):
+    """BY* parts of an RRULE that iter_occurrence_starts cannot expand
+
+    Parts that only restate DTSTART, as many exporters write them, are
+    accepted, e.g. a monthly BYMONTHDAY equal to the start day.
+
+    Args:
+        rule: RRULE parts as a dict
+        start: DTSTART of the series
+
+    Returns:
+        list: Names of the unsupported parts, empty if the rule can be expanded
+    """
+    freq = rule.get("FREQ", "").upper()
+    unsupported = []
+    for name, value in rule.items():
+        if not name.startswith("BY"):
+            continue
+        if name == "BYDAY" and freq in ("DAILY", "WEEKLY"):
+            # Plain weekdays only, "2TU" style ordinals need monthly expansion
+            if all(day in WEEKDAYS for day in value.split(",")):
+                continue
+        elif name == "BYMONTHDAY" and freq in ("MONTHLY", "YEARLY") and value == str(start.day):
+            continue
+        elif name == "BYMONTH" and freq == "YEARLY" and value == str(start.month):
+            continue
+        unsupported.append(name)
+    return unsupported
+
+
+def iter_occurrence_starts(raw, window_start, window_end):
+    """Yield recurrence start times in order, up to window_end
+
+    Occurrences before window_start are skipped arithmetically where COUNT
+    does not require counting them.
+    """
+    rule = raw.rrule
+    freq = rule.get("FREQ", "").upper()
+    interval = max(1, int(rule.get("INTERVAL", "1") or 1))
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = parse_ics_datetime(rule["UNTIL"])[0] if "UNTIL" in rule else None
+    if until is not None and raw.all_day:
+        until = until.replace(hour=23, minute=59, second=59)
+    byday = [WEEKDAYS[d[-2:]] for d in rule.get("BYDAY", "").split(",") if d[-2:] in WEEKDAYS]
+    duration = raw.end - raw.start
+    earliest = window_start - duration
+
+    produced = 0
+    if freq == "DAILY" and byday:
+        # Every n-th day restricted to some weekdays, e.g. "every weekday"
+        step = timedelta(days=interval)
+        k = 0
+        if count is None and earliest > raw.start:
+            k = (earliest - raw.start) // step
+        while True:
+            dt = raw.start + step * k
+            k += 1
+            if dt > window_end or (until and dt > until) or (count is not None and produced >= count):
+                return
+            if dt.weekday() in byday:
+                produced += 1
+                yield dt
+    elif freq == "DAILY" or (freq == "WEEKLY" and not byday):
+        step = timedelta(days=interval * (7 if freq == "WEEKLY" else 1))
+        k = 0
+        if count is None and earliest > raw.start:
+            k = (earliest - raw.start) // step
+        while True:
+            dt = raw.start + step * k
+            if dt > window_end or (until and dt > until) or (count is not None and k >= count):
+                return
+            yield dt
+            k += 1
+    elif freq == "WEEKLY":
+        week_start = raw.start - timedelta(days=raw.start.weekday())
+        k = 0
+        if count is None and earliest > week_start:
+            k = (earliest - week_start).days // (7 * interval)
+        byday.sort()
+        while True:
+            base = week_start + timedelta(weeks=k * interval)
+            if base > window_end:
+                return
+            for weekday in byday:
+                dt = base + timedelta(days=weekday)
+                if dt < raw.start:
+                    continue
+                if dt > window_end or (until and dt > until) or (count is not None and produced >= count):
+                    return
+                produced += 1
+                yield dt
+            k += 1
+    elif freq in ("MONTHLY", "YEARLY"):
+        months = interval * (12 if freq == "YEARLY" else 1)
+        k = 0
+        while True:
+            dt = add_months(raw.start, k * months)
+            k += 1
+            if dt is None:
+                continue
+            if dt > window_end or (until and dt > until) or (count is not None and produced >= count):
+                return
+            produced += 1
+            yield dt
+    else:
+        yield raw.start
+
+
+def expand_events(raw_events, window_start, window_end):
+    """Expand raw events into occurrences overlapping the window
+
+    Args:
+        raw_events: Iterable of RawEvent
+        window_start: Naive datetime, occurrences ending before are dropped
+        window_end: Naive datetime, occurrences starting after are dropped
+
+    Returns:
+        list: Event
+    """
+    raw_events = list(raw_events)
+    # Overridden occurrences are replaced by their RECURRENCE-ID event
+    overridden = {}
+    for raw in raw_events:
+        if raw.recurrence_id is not None and raw.uid:
+            overridden.setdefault(raw.uid, set()).add(raw.recurrence_id)
+
+    events = []
+    for raw in raw_events:
+        duration = raw.end - raw.start
+        if raw.rrule is None or raw.recurrence_id is not None:
+            if raw.end >= window_start and raw.start <= window_end:
+                events.append(Event(raw.start, raw.end, raw.summary, raw.all_day))
+            continue
+        unsupported = get_unsupported_parts(raw.rrule, raw.start)
+        if unsupported:
+            logger.warning("Skipping %s, RRULE parts not supported: %s", raw.uid, ",".join(unsupported))
+            continue
+        skipped = raw.exdates | overridden.get(raw.uid, set())
+        try:
+            for start in iter_occurrence_starts(raw, window_start, window_end):
+                if start in skipped or start + duration < window_start:
+                    continue
+                events.append(Event(start, start + duration, raw.summary, raw.all_day))
+        except ValueError as e:
+            logger.warning("Skipping malformed RRULE in %s: %s", raw.uid, e)
+    return events
+
+
+class EventIndex:
+    def __init__(self, events):
+        """Sorted start times for "what's next" plus per-day buckets
+
+        Args:
+            events: List of Event
+        """
+        self.events = sorted(events, key=lambda e: e.start)
+        self.starts = [e.start for e in self.events]
+        self.by_day = {}
+        for event in self.events:
+            day = event.start.date()
+            # End is exclusive, an event ending at midnight does not touch the next day
+            last_day = (event.end - timedelta(microseconds=1)).date() if event.end > event.start else day
+            for _ in range(MAX_EVENT_DAYS):
+                self.by_day.setdefault(day, []).append(event)
+                if day >= last_day:
+                    break
+                day += timedelta(days=1)
+
+    def __len__(self):
+        return len(self.events)
+
+    def next_events(self, now, limit=5):
+        """Events starting at or after `now`, earliest first"""
+        i = bisect.bisect_left(self.starts, now)
+        return self.events[i:i + limit]
+
+    def events_on(self, day):
+        """Events touching a date, ordered by start"""
+        return self.by_day.get(day, [])
+
+    def has_events(self, day):
+        return day in self.by_day
+
+
+class CalendarStore:
+    def __init__(self, paths=None, directory=DEFAULT_CALENDAR_DIR, past_days=31, future_days=366,
+                 clock=datetime.now):
+        """Keep an EventIndex up to date with a set of .ics files
+
+        Only files whose mtime or size changed are re-parsed. The index is
+        rebuilt off the Tk thread by refresh_async() and swapped in whole.
+
+        Args:
+            paths: Explicit .ics file paths, in addition to `directory`
+            directory: Directory scanned for *.ics files, None to disable
+            past_days: Days before today to keep expanded occurrences for
+            future_days: Days after today to expand recurrences into
+            clock: Returns the current naive local datetime
+        """
+        self.paths = list(paths or [])
+        self.directory = directory
+        self.past_days = past_days
+        self.future_days = future_days
+        self.clock = clock
+        self.files = {}  # path -> ((mtime_ns, size), [RawEvent])
+        self.window_day = None
+        self.index = EventIndex([])
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def list_files(self):
+        files = [p for p in self.paths if os.path.isfile(p)]
+        if self.directory and os.path.isdir(self.directory):
+            files.extend(sorted(glob.glob(os.path.join(self.directory, "*.ics"))))
+        return files
+
+    def refresh(self):
+        """Re-parse changed files and rebuild the index if anything changed
+
+        Returns:
+            bool: True when a new index was built
+        """
+        with self.lock:
+            changed = False
+            present = set()
+            for path in self.list_files():
+                present.add(path)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                cached = self.files.get(path)
+                if cached is not None and cached[0] == signature:
+                    continue
+                try:
+                    self.files[path] = (signature, parse_ics_file(path))
+                except OSError as e:
+                    logger.error("Error reading calendar %s: %s", path, e)
+                    continue
+                changed = True
+
+            for path in set(self.files) - present:
+                del self.files[path]
+                changed = True
+
+            # The expansion window moves with the date
+            today = self.clock().date()
+            if today != self.window_day:
+                changed = True
+
+            if changed:
+                self.window_day = today
+                start = datetime.combine(today, datetime.min.time()) - timedelta(days=self.past_days)
+                end = start + timedelta(days=self.past_days + self.future_days)
+                raw_events = [raw for _, events in self.files.values() for raw in events]
+                self.index = EventIndex(expand_events(raw_events, start, end))
+            return changed
+
+    def refresh_async(self):
+        """Run refresh() on a worker thread unless one is still running"""
+        if self.worker is not None and self.worker.is_alive():
+            return
+        self.worker = threading.Thread(target=self._refresh_safely, name="calendar-refresh", daemon=True)
+        self.worker.start()
+
+    def _refresh_safely(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error("Error refreshing calendars: %s", e)
+
+    def next_events(self, limit=5):
+        return self.index.next_events(self.clock(), limit)
+
+    def events_on(self, day):
+        return self.index.events_on(day)
+
+    def has_events(self, day):
+        return self.index.has_events(day)
+
+
+def generate_ics(path, event_count, recurring_every=50, seed_day=None):
+    """Write a synthetic calendar for benchmarking
+
+    Args:
+        path: Output file
+        event_count: Number of VEVENTs
+        recurring_every: Every n-th event gets a weekly RRULE
+        seed_day: First event date, defaults to 100 days ago
+    """
+    seed_day = seed_day or (datetime.now() - timedelta(days=100)).replace(minute=0, second=0, microsecond=0)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//bench//EN\r\n")
+        for i in range(event_count):
+            start = seed_day + timedelta(minutes=37 * i)
+            f.write("BEGIN:VEVENT\r\n")
+            f.write(f"UID:bench-{i}@taskbar\r\n")
+            f.write(f"DTSTART:{start:%Y%m%dT%H%M%S}\r\n")
+            f.write(f"DTEND:{start + timedelta(minutes=30):%Y%m%dT%H%M%S}\r\n")
+            f.write(f"SUMMARY:Event {i} with a folded summary that is long enough to wrap o\r\n n the next line\r\n")
+            if recurring_every and i % recurring_every == 0:
+                f.write("RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=60\r\n")
+            f.write("END:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+
+def run_benchmark(event_count=50000):
+    """Time parsing, indexing and queries on a generated calendar
+
+    The phases are timed on their own first; "refresh (full)" is a cold
+    CalendarStore.refresh(), which runs all of them again.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.ics")
+        generate_ics(path, event_count)
+
+        store = CalendarStore(directory=directory)
+        window_start = datetime.combine(datetime.now().date(), datetime.min.time()) - timedelta(days=store.past_days)
+        window_end = window_start + timedelta(days=store.past_days + store.future_days)
+        p0 = time.perf_counter()
+        raw = parse_ics_file(path)
+        p1 = time.perf_counter()
+        events = expand_events(raw, window_start, window_end)
+        p2 = time.perf_counter()
+        EventIndex(events)
+        p3 = time.perf_counter()
+
+        t1 = time.perf_counter()
+        store.refresh()
+        t2 = time.perf_counter()
+        unchanged = store.refresh()
+        t3 = time.perf_counter()
+
+        now = datetime.now()
+        queries = 10000
+        q0 = time.perf_counter()
+        for i in range(queries):
+            store.index.next_events(now + timedelta(minutes=i), 5)
+        q1 = time.perf_counter()
+        for i in range(queries):
+            store.index.events_on((now + timedelta(days=i % 300 - 150)).date())
+        q2 = time.perf_counter()
+
+    print(f"{len(raw)} VEVENTs, {len(store.index)} indexed occurrences")
+    print(f"parse:            {(p1 - p0) * 1000:8.1f} ms")
+    print(f"expand:           {(p2 - p1) * 1000:8.1f} ms")
+    print(f"index:            {(p3 - p2) * 1000:8.1f} ms")
+    print(f"refresh (full):   {(t2 - t1) * 1000:8.1f} ms  stat + parse + expand + index")
+    print(f"refresh (no-op):  {(t3 - t2) * 1000:8.3f} ms  rebuilt={unchanged}")
+    print(f"next_events:      {(q1 - q0) / queries * 1e6:8.2f} us/query")
+    print(f"events_on:        {(q2 - q1) / queries * 1e6:8.2f} us/query")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# system/clash_client.py - Clash external controller client, never called on the Tk thread
+import json
+import queue
+import random
+import threading
+import http.client
+from urllib.parse import quote
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLASH_MODES = ["rule", "global", "direct"]
+
+
+def format_rate(bytes_per_second):
+    """Format a transfer rate compactly, e.g. 850B, 12K, 3.4M"""
+    value = float(bytes_per_second)
+    for unit in ("B", "K", "M"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" or value >= 10 else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}G"
+
+
+class ClashClient:
+    def __init__(self, host="127.0.0.1", port=9090, secret=None, timeout=5.0,
+                 min_backoff=1.0, max_backoff=30.0, refresh_interval=30.0):
+        """Talk to the Clash REST API from two background threads
+
+        The traffic thread holds the streaming /traffic response and reads it
+        line by line. The control thread owns one keep-alive connection for
+        /configs and /proxies requests queued by the UI. The Tk thread only
+        reads get_state() snapshots and queues commands.
+
+        Args:
+            host: External controller host
+            port: External controller port
+            secret: Controller secret, sent as a bearer token
+            timeout: Socket timeout in seconds
+            min_backoff: First reconnect delay in seconds
+            max_backoff: Upper bound of the reconnect delay
+            refresh_interval: Seconds between mode/proxy group refreshes
+        """
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.refresh_interval = refresh_interval
+
+        self.lock = threading.Lock()
+        self.state = {
+            "connected": False,
+            "up": 0,
+            "down": 0,
+            "mode": None,
+            "groups": {}  # Selector group -> {"now": name, "all": [names]}
+        }
+        self.commands = queue.Queue()
+        self.stopping = threading.Event()
+        self.threads = []
+        self.traffic_connection = None
+
+    def get_headers(self):
+        headers = {"Connection": "keep-alive"}
+        if self.secret:
+            headers["Authorization"] = f"Bearer {self.secret}"
+        return headers
+
+    def start(self):
+        if self.threads:
+            return
+        self.stopping.clear()
+        for target, name in ((self._traffic_loop, "clash-traffic"), (self._control_loop, "clash-control")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.stopping.set()
+        self.commands.put(None)
+        # Closing the socket unblocks the streaming readline
+        connection = self.traffic_connection
+        if connection is not None:
+            connection.close()
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.threads = []
+
+    def get_state(self):
+        """Snapshot of connection, traffic, mode and proxy groups"""
+        with self.lock:
+            state = dict(self.state)
+            state["groups"] = dict(self.state["groups"])
+            return state
+
+    def set_mode(self, mode):
+        """Queue a proxy mode change, returns immediately"""
+        self.commands.put(("mode", mode))
+
+    def select_proxy(self, group, proxy):
+        """Queue a proxy selection in a Selector group, returns immediately"""
+        self.commands.put(("select", group, proxy))
+
+    def refresh(self):
+        """Queue a re-read of mode and proxy groups"""
+        self.commands.put(("refresh",))
+
+    def backoff_delays(self):
+        """Exponential reconnect delays with jitter"""
+        delay = self.min_backoff
+        while True:
+            yield delay * random.uniform(0.8, 1.2)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _traffic_loop(self):
+        delays = self.backoff_delays()
+        while not self.stopping.is_set():
+            try:
+                self._stream_traffic()
+                delays = self.backoff_delays()  # Clean end of stream, start over fast
+            except Exception as e:
+                logger.warning("Clash traffic stream unavailable: %s", e)
+            with self.lock:
+                self.state["connected"] = False
+                self.state["up"] = self.state["down"] = 0
+            self.stopping.wait(next(delays))
+
+    def _stream_traffic(self):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        self.traffic_connection = connection
+        try:
+            connection.request("GET", "/traffic", headers=self.get_headers())
+            response = connection.getresponse()
+            if response.status != 200:
+                raise OSError(f"HTTP {response.status}")
+            with self.lock:
+                self.state["connected"] = True
+            # One JSON object per line, about once a second
+            while not self.stopping.is_set():
+                line = response.readline()
+                if not line:
+                    return
+                line = line.strip()
+                if not line:
+                    continue
+                traffic = json.loads(line)
+                with self.lock:
+                    self.state["up"] = traffic.get("up", 0)
+                    self.state["down"] = traffic.get("down", 0)
+        finally:
+            self.traffic_connection = None
+            connection.close()
+
+    def _control_loop(self):
+        connection = None
+        self.commands.put(("refresh",))
+        while not self.stopping.is_set():
+            try:
+                command = self.commands.get(timeout=self.refresh_interval)
+            except queue.Empty:
+                command = ("refresh",)
+            if command is None:
+                break
+            if connection is None:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._run_command(connection, command)
+            except Exception as e:
+                logger.warning("Clash controller request failed: %s", e)
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+
+    def _request(self, connection, method, path, body=None):
+        headers = self.get_headers()
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        # Read the whole body so the connection can be reused
+        data = response.read()
+        if response.status >= 400:
+            raise OSError(f"{method} {path}: HTTP {response.status}")
+        return json.loads(data) if data else None
+
+    def _run_command(self, connection, command):
+        if command[0] == "mode":
+            self._request(connection, "PATCH", "/configs", {"mode": command[1]})
+        elif command[0] == "select":
+            _, group, proxy = command
+            self._request(connection, "PUT", f"/proxies/{quote(group, safe='')}", {"name": proxy})
+
+        # Every command ends with fresh state for the menu
+        configs = self._request(connection, "GET", "/configs") or {}
+        proxies = (self._request(connection, "GET", "/proxies") or {}).get("proxies", {})
+        groups = {
+            name: {"now": proxy.get("now"), "all": list(proxy.get("all", []))}
+            for name, proxy in proxies.items()
+            if proxy.get("type") == "Selector"
+        }
+        with self.lock:
+            self.state["mode"] = str(configs.get("mode", "")).lower() or None
+            self.state["groups"] = groups
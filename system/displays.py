@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# system/displays.py - Monitor enumeration behind a swappable provider
+from collections import namedtuple
+
+from system.backend import get_backend
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Monitor rectangle in virtual-desktop pixels, right/bottom exclusive
+MonitorInfo = namedtuple("MonitorInfo", ["name", "left", "top", "right", "bottom", "is_primary"])
+
+
+def monitor_width(monitor):
+    return monitor.right - monitor.left
+
+
+def monitor_height(monitor):
+    return monitor.bottom - monitor.top
+
+
+def virtual_bounds(monitors):
+    """Bounding box of all monitors
+
+    Args:
+        monitors: List of MonitorInfo
+
+    Returns:
+        tuple: (left, top, right, bottom)
+    """
+    return (
+        min(m.left for m in monitors),
+        min(m.top for m in monitors),
+        max(m.right for m in monitors),
+        max(m.bottom for m in monitors)
+    )
+
+
+def monitor_index_for_rect(rect, monitors):
+    """Find the monitor a window rectangle mostly lies on
+
+    Args:
+        rect: (left, top, right, bottom) window rectangle
+        monitors: List of MonitorInfo
+
+    Returns:
+        int or None: Index of the monitor with the largest overlap
+    """
+    left, top, right, bottom = rect
+    best_index, best_area = None, 0
+    for index, m in enumerate(monitors):
+        width = min(right, m.right) - max(left, m.left)
+        height = min(bottom, m.bottom) - max(top, m.top)
+        if width > 0 and height > 0 and width * height > best_area:
+            best_index, best_area = index, width * height
+    return best_index
+
+
+def covers_monitor(rect, monitor):
+    """Check whether a window rectangle covers a whole monitor"""
+    left, top, right, bottom = rect
+    return (
+        left <= monitor.left and top <= monitor.top and
+        right >= monitor.right and bottom >= monitor.bottom
+    )
+
+
+class MonitorProvider:
+    """Interface for listing the attached monitors"""
+
+    def get_monitors(self):
+        """Return the attached monitors, primary first
+
+        Returns:
+            list: MonitorInfo entries
+        """
+        raise NotImplementedError
+
+
+class TkMonitorProvider(MonitorProvider):
+    def __init__(self, root):
+        """Single-monitor fallback using the Tk screen size
+
+        Args:
+            root: Tkinter root window
+        """
+        self.root = root
+
+    def get_monitors(self):
+        return [MonitorInfo(
+            "primary", 0, 0, self.root.winfo_screenwidth(), self.root.winfo_screenheight(), True
+        )]
+
+
+class FakeMonitorProvider(MonitorProvider):
+    def __init__(self, monitors):
+        """Fixed monitor layout, for tests and non-Windows development
+
+        Args:
+            monitors: List of MonitorInfo or (left, top, right, bottom) tuples,
+                the first tuple is taken as primary
+        """
+        self.monitors = [
+            m if isinstance(m, MonitorInfo) else MonitorInfo(f"fake{i}", *m, i == 0)
+            for i, m in enumerate(monitors)
+        ]
+
+    def get_monitors(self):
+        return sort_monitors(self.monitors)
+
+
+def sort_monitors(monitors):
+    """Order monitors primary first, then left to right"""
+    return sorted(monitors, key=lambda m: (not m.is_primary, m.left, m.top))
+
+
+def get_monitor_provider(root):
+    """Pick the monitor provider for the current platform
+
+    Args:
+        root: Tkinter root window, used by the fallback provider
+    """
+    try:
+        return get_backend().create_monitor_provider(root)
+    except Exception as e:
+        logger.error("Error loading monitor provider: %s", e)
+    return TkMonitorProvider(root)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# system/memory_health.py - Periodic memory snapshots and growth-trend detection
+import os
+import time
+import tracemalloc
+from collections import deque
+
+import psutil
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MB = 1024 * 1024
+
+
+class MemorySnapshot:
+    __slots__ = ("time", "rss", "widgets", "after_jobs", "top_allocators")
+
+    def __init__(self, time, rss, widgets, after_jobs, top_allocators):
+        """One health sample
+
+        Args:
+            time: Monotonic timestamp in seconds
+            rss: Resident set size in bytes
+            widgets: Number of live Tk widgets
+            after_jobs: Number of pending Tk `after` jobs
+            top_allocators: List of (location, size_bytes) from tracemalloc
+        """
+        self.time = time
+        self.rss = rss
+        self.widgets = widgets
+        self.after_jobs = after_jobs
+        self.top_allocators = top_allocators
+
+
+def slope(points):
+    """Least-squares slope of (x, y) points, 0.0 for fewer than two"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+class MemoryHealth:
+    def __init__(self, root, history_size=288, trace=False, top_count=5,
+                 rss_growth_per_hour=2 * MB, widget_growth_per_hour=5, max_after_jobs=50,
+                 clock=time.monotonic, process=None):
+        """Record memory health into a bounded history and flag growth
+
+        Args:
+            root: Tkinter root window, widgets and after jobs are counted from it
+            history_size: Number of snapshots kept (288 x 5 min = one day)
+            trace: Start tracemalloc and record the top allocators
+            top_count: Number of allocators kept per snapshot
+            rss_growth_per_hour: RSS trend in bytes/hour that counts as a leak
+            widget_growth_per_hour: Widget count trend per hour that counts as a leak
+            max_after_jobs: Pending after jobs above this count as a timer pile-up
+            clock: Monotonic time source, replaceable for testing
+            process: psutil.Process to read RSS from, defaults to this process
+        """
+        self.root = root
+        self.history = deque(maxlen=history_size)
+        self.trace = trace
+        self.top_count = top_count
+        self.rss_growth_per_hour = rss_growth_per_hour
+        self.widget_growth_per_hour = widget_growth_per_hour
+        self.max_after_jobs = max_after_jobs
+        self.clock = clock
+        self.process = process or psutil.Process(os.getpid())
+        self.warnings = []
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+
+    def count_widgets(self):
+        """Count every live widget below the root, Toplevels included"""
+        count = 0
+        stack = [self.root]
+        while stack:
+            widget = stack.pop()
+            children = widget.winfo_children()
+            count += len(children)
+            stack.extend(children)
+        return count
+
+    def count_after_jobs(self):
+        """Count pending `after` callbacks in the Tcl interpreter"""
+        return len(self.root.tk.splitlist(self.root.tk.call("after", "info")))
+
+    def get_top_allocators(self):
+        if not tracemalloc.is_tracing():
+            return []
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:self.top_count]
+        return [(str(stat.traceback), stat.size) for stat in stats]
+
+    def sample(self):
+        """Record one snapshot and check the trends
+
+        Returns:
+            MemorySnapshot
+        """
+        snapshot = MemorySnapshot(
+            self.clock(),
+            self.process.memory_info().rss,
+            self.count_widgets(),
+            self.count_after_jobs(),
+            self.get_top_allocators() if self.trace else []
+        )
+        self.history.append(snapshot)
+        self.warnings = self.check_trends()
+        for warning in self.warnings:
+            logger.warning("Memory health: %s", warning)
+        return snapshot
+
+    def check_trends(self):
+        """Flag growth over the recorded history
+
+        Trends need at least an hour of history, so start-up allocation is
+        not mistaken for a leak.
+
+        Returns:
+            list: Human-readable warnings, empty when healthy
+        """
+        warnings = []
+        if not self.history:
+            return warnings
+        latest = self.history[-1]
+        if latest.after_jobs > self.max_after_jobs:
+            warnings.append(f"{latest.after_jobs} pending after jobs")
+
+        span = latest.time - self.history[0].time
+        if span < 3600:
+            return warnings
+
+        hours = [(s.time / 3600, s) for s in self.history]
+        rss_trend = slope([(h, s.rss) for h, s in hours])
+        if rss_trend > self.rss_growth_per_hour:
+            warnings.append(f"RSS growing {rss_trend / MB:.1f} MB/hour")
+        widget_trend = slope([(h, s.widgets) for h, s in hours])
+        if widget_trend > self.widget_growth_per_hour:
+            warnings.append(f"widget count growing {widget_trend:.1f}/hour")
+        return warnings
+
+    def get_report(self):
+        """Summary lines of the latest snapshot and trends"""
+        if not self.history:
+            return ["No samples yet"]
+        latest = self.history[-1]
+        lines = [
+            f"RSS {latest.rss / MB:.1f} MB",
+            f"Widgets {latest.widgets}",
+            f"After jobs {latest.after_jobs}"
+        ]
+        lines.extend(f"{location}: {size / 1024:.0f} KB" for location, size in latest.top_allocators)
+        lines.extend(self.warnings)
+        return lines
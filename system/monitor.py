@@ -1,37 +1,77 @@
 #!/usr/bin/env python3
 # system/monitor.py - System monitoring functionality
 import psutil
-import numpy as np
 from datetime import datetime
-from ctypes import cast, POINTER, windll, c_uint, create_unicode_buffer, byref, WinDLL, c_long
-from ctypes import wintypes
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-import winreg
+
+from system.audio import VolumeController
+from system.backend import get_backend
+from system.clash_client import ClashClient, format_rate
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class SystemMonitor:
-    def __init__(self):
-        """Initialize system monitor"""
-        pass
+    def __init__(self, audio_device_factory=None, clash_settings=None, backend=None):
+        """Initialize system monitor
+        
+        Args:
+            audio_device_factory: Creates AudioDevice instances, one for
+                reading on the Tk thread and one for the volume writer thread;
+                defaults to the backend's, None there disables volume control
+            clash_settings: Dict of ClashClient host, port and secret
+            backend: Platform Backend, defaults to get_backend()
+        """
+        self.backend = backend or get_backend()
+        audio_device_factory = audio_device_factory or self.backend.audio_device_factory
+        self.audio_device = audio_device_factory() if audio_device_factory else None
+        self.volume_controller = VolumeController(audio_device_factory)
+        self.volume_controller.start()
+        
+        # Live traffic and mode switching through the Clash external controller
+        self.clash_client = ClashClient(**(clash_settings or {}))
+        self.clash_client.start()
     
     def get_volume(self):
         """Get current system volume level"""
+        if self.audio_device is None:
+            return self.get_volume_text()
         try:
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            volume = cast(interface, POINTER(IAudioEndpointVolume))
-            
-            # Check for mute state first
-            if volume.GetMute():
-                return "静音"
-            
-            volume_value = volume.GetMasterVolumeLevelScalar()  # 0.0 to 1.0
-            
-            return f"音量 {volume_value * 100:.0f}"
-            
+            self.volume_controller.reconcile(
+                self.audio_device.get_volume(),  # 0.0 to 1.0
+                self.audio_device.get_mute()
+            )
         except Exception as e:
-            print(f"Error fetching volume: {e}")
+            logger.error("Error fetching volume: %s", e)
+        return self.get_volume_text()
+    
+    def get_volume_text(self):
+        """Format the best known volume, optimistic while a change is being written"""
+        volume, mute = self.volume_controller.get_state()
+        # Check for mute state first
+        if mute:
+            return "静音"
+        if volume is None:
             return "音量 N/A"
+        return f"音量 {volume * 100:.0f}"
+    
+    def scroll_volume(self, notches):
+        """Adjust the volume by wheel notches without blocking on the endpoint
+        
+        Returns:
+            str: Volume text to show right away
+        """
+        self.volume_controller.scroll(notches)
+        return self.get_volume_text()
+    
+    def toggle_mute(self):
+        """Toggle mute without blocking on the endpoint
+        
+        Returns:
+            str: Volume text to show right away
+        """
+        if self.audio_device is not None:
+            self.volume_controller.toggle_mute()
+        return self.get_volume_text()
     
     def get_power(self):
         """Get battery power status"""
@@ -41,7 +81,7 @@ class SystemMonitor:
                 return f"电量 {battery.percent}%"
             return "Power N/A"
         except Exception as e:
-            print(f"Error fetching power status: {e}")
+            logger.error("Error fetching power status: %s", e)
             return "Power N/A"
     
     def get_day_of_week(self):
@@ -60,84 +100,48 @@ class SystemMonitor:
             "day_of_week": self.get_day_of_week()
         }
     
+    def get_status(self):
+        """Sample every status item once
+
+        The result is shared by all bars, so adding monitors does not add
+        COM, registry or IME queries.
+
+        Returns:
+            dict: clash, clash_text, input, volume, power and time_info entries
+        """
+        return {
+            "clash": self.get_clash_status(),
+            "clash_text": self.get_clash_text(),
+            "input": self.get_input_method(),
+            "volume": self.get_volume(),
+            "power": self.get_power(),
+            "time_info": self.get_time_info()
+        }
+    
     def get_input_method(self):
-        """Get current Windows input method state
+        """Get the focused window's input method state
         
         Returns:
-            str: "中" for Chinese input, "英" for English input
+            str: "中" for Chinese input, "英" for English input, "" if unknown
         """
-        try:
-            # Define Windows API constants
-            WM_IME_CONTROL = 0x0283
-            IMC_GETCONVERSIONMODE = 0x0001
-            IME_CMODE_NATIVE = 0x0001  # Chinese mode
-            
-            # Get user32 and imm32 DLLs
-            user32 = WinDLL('user32', use_last_error=True)
-            imm32 = WinDLL('imm32', use_last_error=True)
-            
-            # Get foreground window
-            hwnd = user32.GetForegroundWindow()
-            if not hwnd:
-                return "英"  # Default to English if can't get window
-            
-            # Get IME context for the window
-            himc = imm32.ImmGetContext(hwnd)
-            
-            if not himc:
-                # Try to get default IME window
-                ime_hwnd = imm32.ImmGetDefaultIMEWnd(hwnd)
-                
-                if ime_hwnd:
-                    # Use SendMessage to get conversion mode
-                    LRESULT = c_long
-                    user32.SendMessageW.restype = LRESULT
-                    result = user32.SendMessageW(ime_hwnd, WM_IME_CONTROL, IMC_GETCONVERSIONMODE, 0)
-                    
-                    # Determine input state
-                    if result & IME_CMODE_NATIVE:
-                        return "中"
-                    else:
-                        return "英"
-                return "英"
-            
-            # Get conversion mode through ImmGetConversionStatus
-            dwConversion = wintypes.DWORD(0)
-            dwSentence = wintypes.DWORD(0)
-            
-            ret = imm32.ImmGetConversionStatus(himc, byref(dwConversion), byref(dwSentence))
-            
-            # Release IME context
-            imm32.ImmReleaseContext(hwnd, himc)
-            
-            if not ret:
-                return "英"
-            
-            # Check if in Chinese input mode
-            if dwConversion.value & IME_CMODE_NATIVE:
-                return "中"
-            else:
-                return "英"
-            
-        except Exception as e:
-            print(f"Error detecting input method: {e}")
-            return "英"  # Default to English on error
+        return self.backend.get_input_method() or ""
         
+    def get_clash_text(self):
+        """Clash label text, with live rates while the controller is reachable"""
+        state = self.clash_client.get_state()
+        if not state["connected"]:
+            return "Clash"
+        return f"↑{format_rate(state['up'])} ↓{format_rate(state['down'])}"
+    
     def get_clash_status(self):
-        '''Check if Clash proxy is enabled in system settings
-        查看Windows注册表中的代理设置
-        '''
+        '''Check if Clash proxy is enabled in system settings'''
         try:
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
-                                r"Software\Microsoft\Windows\CurrentVersion\Internet Settings")
-            proxy_enable, _ = winreg.QueryValueEx(key, "ProxyEnable")
-            proxy_server, _ = winreg.QueryValueEx(key, "ProxyServer")
-            winreg.CloseKey(key)
+            proxy_enable, proxy_server = self.backend.get_system_proxy()
             
             # 查看到Clash默认代理端口为7890
-            if proxy_enable == 1 and "7890" in proxy_server:
+            if proxy_enable and "7890" in proxy_server:
                 return "Clash ON"
             else:
                 return "Clash OFF"
         except Exception as e:
-            return "Clash N/A"
\ No newline at end of file
+            return "Clash N/A"
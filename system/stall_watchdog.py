@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# system/stall_watchdog.py - Detect Tk event-loop stalls and sample the main thread's stack
+#
+# Demo (needs a display): python -m system.stall_watchdog [block_seconds]
+import os
+import sys
+import time
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DUMP_PATH = os.path.join(os.path.expanduser("~"), ".concise_taskbar", "stalls.txt")
+
+
+class StallEvent:
+    __slots__ = ("wall_time", "duration", "stack")
+
+    def __init__(self, wall_time, duration, stack):
+        """One event-loop stall
+
+        Args:
+            wall_time: datetime the stall was detected
+            duration: Seconds the heartbeat ran late, measured when it finally ran
+            stack: Formatted main-thread stack lines, innermost call last
+        """
+        self.wall_time = wall_time
+        self.duration = duration
+        self.stack = stack
+
+    def get_location(self):
+        """Innermost frame as "file:line in function", the likely culprit"""
+        if not self.stack:
+            return "unknown"
+        # format_stack entries start with '  File "path", line N, in func'
+        first_line = self.stack[-1].strip().splitlines()[0]
+        return first_line.replace("File ", "", 1)
+
+
+class StallWatchdog:
+    def __init__(self, root, interval=100, threshold=0.25, poll_interval=0.05,
+                 max_events=50, clock=time.monotonic):
+        """Measure how late a Tk `after` heartbeat runs, from a watchdog thread
+
+        The Tk thread reschedules a heartbeat every `interval` ms and records
+        when it ran. The watchdog thread wakes every `poll_interval` seconds;
+        once the heartbeat is `threshold` seconds overdue it samples the main
+        thread's stack with sys._current_frames, while the blocking call is
+        still on it. The next heartbeat closes the stall with its duration.
+
+        Args:
+            root: Tkinter root window running the event loop
+            interval: Heartbeat interval in milliseconds
+            threshold: Lateness in seconds that counts as a stall
+            poll_interval: Seconds between watchdog checks
+            max_events: Number of stalls kept, oldest dropped first
+            clock: Monotonic time source, replaceable for testing
+        """
+        self.root = root
+        self.interval = interval
+        self.threshold = threshold
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.events = deque(maxlen=max_events)
+        self.main_thread_id = threading.main_thread().ident
+
+        self.lock = threading.Lock()
+        self.expected = None  # When the next heartbeat is due
+        self.pending = None  # (wall_time, stack) sampled for a stall in progress
+        self.after_id = None
+        self.stopping = threading.Event()
+        self.active = threading.Event()  # Cleared while paused, the thread then sleeps
+        self.thread = None
+
+    def start(self):
+        """Start the heartbeat, call from the Tk thread"""
+        if self.thread is not None:
+            return
+        self.main_thread_id = threading.get_ident()
+        self.stopping.clear()
+        self.resume()
+        self.thread = threading.Thread(target=self._watch_loop, name="stall-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.active.set()  # Wake a paused thread so it sees the stop
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def pause(self):
+        """Stop the heartbeat and the checks, e.g. while the session is locked"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.active.clear()
+        with self.lock:
+            self.expected = None
+            self.pending = None
+
+    def resume(self):
+        """Restart the heartbeat after pause(), a no-op while it runs"""
+        if self.after_id is not None or self.stopping.is_set():
+            return
+        with self.lock:
+            self.expected = self.clock() + self.interval / 1000.0
+        self.after_id = self.root.after(self.interval, self._heartbeat)
+        self.active.set()
+
+    def set_interval(self, interval):
+        """Change the heartbeat interval, used from the next heartbeat on
+
+        Lateness is measured against the time each heartbeat was due, so a
+        slower heartbeat does not read as a stall.
+        """
+        self.interval = interval
+
+    def _heartbeat(self):
+        now = self.clock()
+        with self.lock:
+            late = now - self.expected
+            pending, self.pending = self.pending, None
+            self.expected = now + self.interval / 1000.0
+        if pending is not None:
+            wall_time, frames = pending
+            event = StallEvent(wall_time, late, frames.format())
+            self.events.append(event)
+            logger.warning("Event loop stalled %.0f ms at %s", late * 1000, event.get_location())
+        if not self.stopping.is_set():
+            self.after_id = self.root.after(self.interval, self._heartbeat)
+
+    def sample_main_stack(self):
+        """Stack of the Tk thread as it is right now, innermost call last
+
+        Only file names, line numbers and function names are copied here;
+        the source lines are looked up when the result is formatted.
+
+        Returns:
+            traceback.StackSummary
+        """
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return traceback.StackSummary()
+        frames = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)
+        frames.reverse()
+        return frames
+
+    def check(self, now, poll_late):
+        """One watchdog check, called from the watchdog thread
+
+        Args:
+            now: Current clock reading
+            poll_late: Seconds this check itself ran late; a late watchdog
+                means the whole process was suspended (system sleep), which
+                is not a stall of the event loop
+
+        Returns:
+            bool: True if a new stall was sampled
+        """
+        with self.lock:
+            if self.expected is None or self.pending is not None:
+                return False
+            if poll_late > self.threshold:
+                self.expected = now + self.interval / 1000.0
+                return False
+            if now - self.expected < self.threshold:
+                return False
+            # Sample while holding the lock, so the heartbeat cannot close the stall first
+            frames = self.sample_main_stack()
+            self.pending = (datetime.now(), frames)
+        # Logged now as well, a permanent hang never reaches the next heartbeat;
+        # formatting reads source files, so it happens after the lock is released
+        logger.warning(
+            "Event loop blocked for over %.0f ms:\n%s", self.threshold * 1000, "".join(frames.format()[-8:])
+        )
+        return True
+
+    def _watch_loop(self):
+        last = self.clock()
+        while not self.stopping.wait(self.poll_interval):
+            if not self.active.is_set():
+                self.active.wait()
+                last = self.clock()
+                continue
+            now = self.clock()
+            try:
+                self.check(now, now - last - self.poll_interval)
+            except Exception as e:
+                logger.error("Error in stall watchdog: %s", e)
+            last = now
+
+    def get_events(self):
+        """Recorded stalls, oldest first"""
+        return list(self.events)
+
+    def get_report(self):
+        """Summary lines of the recorded stalls, newest first"""
+        if not self.events:
+            return ["No stalls recorded"]
+        return [
+            f"{event.wall_time:%m-%d %H:%M:%S}  {event.duration * 1000:.0f} ms  {event.get_location()}"
+            for event in reversed(self.events)
+        ]
+
+    def dump(self, path=DEFAULT_DUMP_PATH):
+        """Write every recorded stall with its full stack to a text file
+
+        Returns:
+            str: The path written
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for event in self.get_events():
+                f.write(f"== {event.wall_time:%Y-%m-%d %H:%M:%S}  stalled {event.duration * 1000:.0f} ms\n")
+                f.writelines(event.stack)
+                f.write("\n")
+        logger.info("Wrote %d stalls to %s", len(self.events), path)
+        return path
+
+
+def run_demo(block_seconds=0.6):
+    """Block the Tk thread inside an after job and print the stall that was caught"""
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw()
+    watchdog = StallWatchdog(root)
+    watchdog.start()
+
+    def blocking_job():
+        time.sleep(block_seconds)
+
+    root.after(300, blocking_job)
+    root.after(int(block_seconds * 1000) + 800, root.quit)
+    root.mainloop()
+    watchdog.stop()
+    root.destroy()
+
+    for event in watchdog.get_events():
+        print(f"stalled {event.duration * 1000:.0f} ms at {event.get_location()}")
+    caught = any("blocking_job" in event.get_location() for event in watchdog.get_events())
+    print("caught blocking_job" if caught else "stall NOT caught")
+
+
+if __name__ == "__main__":
+    run_demo(float(sys.argv[1]) if len(sys.argv) > 1 else 0.6)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# system/window_probe.py - Cheap queries about what is on screen, without capturing it
+from system.backend import get_backend
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Wallpaper placement modes the color cache can reproduce
+STYLE_FILL = "fill"
+STYLE_STRETCH = "stretch"
+STYLE_CENTER = "center"
+STYLE_OTHER = "other"
+
+
+class WindowProbe:
+    """Interface for window and wallpaper queries, reports nothing by default"""
+
+    def __init__(self):
+        self.process_names = {}  # pid -> executable name, pids are reused so kept small
+
+    def get_process_name(self, pid):
+        import psutil
+        name = self.process_names.get(pid)
+        if name is None:
+            try:
+                name = psutil.Process(pid).name()
+            except Exception:
+                name = ""
+            if len(self.process_names) >= 64:
+                self.process_names.clear()
+            self.process_names[pid] = name
+        return name
+
+    def get_foreground(self):
+        """Identify the foreground window
+
+        Returns:
+            tuple or None: (class_name, process_name)
+        """
+        return None
+
+    def is_desktop_at(self, points):
+        """Whether only the desktop is visible at every screen point
+
+        Args:
+            points: Iterable of (x, y) virtual-desktop coordinates
+        """
+        return False
+
+    def get_wallpaper_path(self):
+        """Path of the current wallpaper image, None for a solid color"""
+        return None
+
+    def get_wallpaper_style(self):
+        """STYLE_FILL, STYLE_STRETCH, STYLE_CENTER or STYLE_OTHER"""
+        return STYLE_OTHER
+
+
+class FakeWindowProbe(WindowProbe):
+    def __init__(self, desktop=True, wallpaper_path=None, wallpaper_style=STYLE_FILL, foreground=None):
+        """Settable probe for tests
+
+        Args:
+            desktop: Value returned by is_desktop_at
+            wallpaper_path: Value returned by get_wallpaper_path
+            wallpaper_style: Value returned by get_wallpaper_style
+            foreground: Value returned by get_foreground
+        """
+        super().__init__()
+        self.foreground = foreground
+        self.desktop = desktop
+        self.wallpaper_path = wallpaper_path
+        self.wallpaper_style = wallpaper_style
+
+    def get_foreground(self):
+        return self.foreground
+
+    def is_desktop_at(self, points):
+        return self.desktop
+
+    def get_wallpaper_path(self):
+        return self.wallpaper_path
+
+    def get_wallpaper_style(self):
+        return self.wallpaper_style
+
+
+def get_window_probe():
+    """Pick the window probe for the current platform"""
+    try:
+        return get_backend().create_window_probe()
+    except Exception as e:
+        logger.error("Error loading window probe: %s", e)
+    return WindowProbe()
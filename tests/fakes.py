@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# tests/fakes.py - Headless stand-ins for the Tk root shared by the tests
+
+
+class FakeTk:
+    def __init__(self, root):
+        """The `root.tk` interpreter, answering only `after info`"""
+        self.root = root
+
+    def call(self, *args):
+        if args == ("after", "info"):
+            return tuple(self.root.jobs)
+        raise NotImplementedError(args)
+
+    def splitlist(self, value):
+        return tuple(value)
+
+
+class FakeRoot:
+    def __init__(self):
+        """Tk root without a display, `after` jobs run on a scripted clock
+
+        Time only moves in advance(), which runs every job that falls due in
+        order. Pass `root.clock` as the clock of the code under test so both
+        read the same time, in seconds.
+        """
+        self.now = 0.0
+        self.jobs = {}  # after id -> (due, sequence, callback)
+        self.sequence = 0
+        self.children = []
+        self.slaves = []  # Packed children, in pack order
+        self.tk = FakeTk(self)
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, callback, *args):
+        self.sequence += 1
+        after_id = f"after#{self.sequence}"
+        self.jobs[after_id] = (self.now + ms / 1000.0, self.sequence, lambda: callback(*args))
+        return after_id
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, after_id):
+        self.jobs.pop(after_id, None)
+
+    def advance(self, seconds):
+        """Move the clock forward, running the jobs that fall due on the way"""
+        end = self.now + seconds
+        while True:
+            due = [(job[0], job[1], after_id) for after_id, job in self.jobs.items() if job[0] <= end]
+            if not due:
+                break
+            when, _, after_id = min(due)
+            self.now = max(self.now, when)
+            self.jobs.pop(after_id)[2]()
+        self.now = end
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def pack_slaves(self):
+        return list(self.slaves)
+
+
+class FakeWidget:
+    def __init__(self, master=None, **options):
+        """Tk widget stand-in keeping its options, bindings and packing
+
+        Created widgets join their master's `children`; packing is
+        recorded in the master's `slaves` list, in pack order.
+        """
+        self.master = master
+        self.options = dict(options)
+        self.bindings = {}
+        self.pack_options = None
+        self.destroyed = False
+        self.children = []
+        self.slaves = []
+        if master is not None:
+            master.children.append(self)
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, name):
+        return self.options.get(name, "")
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+    def pack(self, **options):
+        self.pack_forget()
+        self.pack_options = options
+        self.master.slaves.append(self)
+
+    def pack_forget(self):
+        if self.pack_options is not None:
+            self.master.slaves.remove(self)
+            self.pack_options = None
+
+    @property
+    def packed(self):
+        return self.pack_options is not None
+
+    def destroy(self):
+        self.pack_forget()
+        self.destroyed = True
+        if self.master is not None and self in self.master.children:
+            self.master.children.remove(self)
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def pack_slaves(self):
+        return list(self.slaves)
+
+
+class FakeStringVar:
+    def __init__(self, master=None, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeMenu(FakeWidget):
+    def __init__(self, master=None, **options):
+        """tk.Menu stand-in counting entries and posts"""
+        super().__init__(master, **options)
+        self.entries = []
+        self.posts = 0
+
+    def add_command(self, label, command=None, **options):
+        self.entries.append(label)
+
+    def add_separator(self):
+        self.entries.append(None)
+
+    def add_cascade(self, label, menu=None, **options):
+        self.entries.append(label)
+
+    def add_radiobutton(self, label, **options):
+        self.entries.append(label)
+
+    def delete(self, first, last=None):
+        self.entries = []
+
+    def post(self, x, y):
+        self.posts += 1
+
+
+def install_fake_widgets(monkeypatch):
+    """Replace the tkinter widget classes the UI modules build with the fakes above"""
+    import tkinter
+    monkeypatch.setattr(tkinter, "Label", FakeWidget)
+    monkeypatch.setattr(tkinter, "Menu", FakeMenu)
+    monkeypatch.setattr(tkinter, "StringVar", FakeStringVar)
+
+
+class FakeCaptureBackend:
+    def __init__(self, regions=(), default=(128, 128, 128), record=True):
+        """Backend whose screen is flat colored rectangles, recording each capture
+
+        Args:
+            regions: (left, top, right, bottom, (r, g, b)) rectangles, later ones on top
+            default: Color outside every region
+            record: Keep the captures list, off for long runs that measure memory
+        """
+        self.regions = list(regions)
+        self.default = default
+        self.record = record
+        self.captures = []  # (left, top, right, bottom) per capture_rect call
+
+    def capture_rect(self, left, top, right, bottom):
+        import numpy as np
+        if self.record:
+            self.captures.append((left, top, right, bottom))
+        pixels = np.empty((bottom - top, right - left, 3), dtype=np.uint8)
+        pixels[:] = self.default
+        for r_left, r_top, r_right, r_bottom, color in self.regions:
+            x0, x1 = max(left, r_left), min(right, r_right)
+            y0, y1 = max(top, r_top), min(bottom, r_bottom)
+            if x0 < x1 and y0 < y1:
+                pixels[y0 - top:y1 - top, x0 - left:x1 - left] = color
+        return pixels
+
+
+class FakeWindow(FakeRoot, FakeWidget):
+    def __init__(self):
+        """Bar window: a root with a scripted clock that can also be configured and shown"""
+        FakeRoot.__init__(self)
+        FakeWidget.__init__(self)
+        self.visible = True
+
+    def withdraw(self):
+        self.visible = False
+
+    def deiconify(self):
+        self.visible = True
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# tests/test_activity.py - ActivityGovernor states, throttling and pausing
+from system.activity import ActivityGovernor, FakeActivitySignals, ACTIVE, IDLE, PAUSED
+from tests.fakes import FakeRoot
+
+
+def make_governor(signals=None):
+    root = FakeRoot()
+    signals = signals or FakeActivitySignals()
+    governor = ActivityGovernor(root, signals, idle_threshold=300, idle_factor=5, check_interval=1000)
+    runs = {"sampler": 0, "fullscreen": 0}
+
+    def count(name):
+        def callback():
+            runs[name] += 1
+        return callback
+
+    governor.add_job("sampler", count("sampler"), 1000)
+    governor.add_job("fullscreen", count("fullscreen"), 1000, pausable=False)
+    return root, signals, governor, runs
+
+
+def test_jobs_run_once_at_start_then_every_interval():
+    root, _, governor, runs = make_governor()
+    governor.start()
+    assert runs == {"sampler": 1, "fullscreen": 1}
+
+    root.advance(5)
+    assert runs == {"sampler": 6, "fullscreen": 6}
+    assert governor.state == ACTIVE
+
+
+def test_idle_throttles_pausable_and_unpausable_jobs():
+    root, signals, governor, runs = make_governor()
+    governor.start()
+    signals.idle_seconds = 600
+    root.advance(1)  # The activity check notices, the tick at 1 s was already due
+    assert governor.state == IDLE
+
+    before = dict(runs)
+    root.advance(10)
+    assert runs["sampler"] - before["sampler"] == 2
+    assert runs["fullscreen"] - before["fullscreen"] == 2
+
+
+def test_lock_pauses_every_job_and_unlock_resumes_with_one_run():
+    root, signals, governor, runs = make_governor()
+    transitions = []
+    governor.add_listener(lambda old, new: transitions.append((old, new)))
+    governor.start()
+
+    signals.locked = True
+    root.advance(1)
+    assert governor.state == PAUSED
+    paused_at = dict(runs)
+    root.advance(60)
+    assert runs == paused_at
+    # Only the activity check is left
+    assert len(root.jobs) == 1
+
+    signals.locked = False
+    root.advance(1)
+    assert governor.state == ACTIVE
+    # One immediate refresh on resume, then the normal rate
+    assert runs == {name: count + 1 for name, count in paused_at.items()}
+    root.advance(3)
+    assert runs["sampler"] == paused_at["sampler"] + 4
+    assert transitions == [(ACTIVE, PAUSED), (PAUSED, ACTIVE)]
+
+
+def test_hidden_bar_keeps_unpausable_jobs_until_the_session_locks():
+    root, signals, governor, runs = make_governor()
+    transitions = []
+    governor.add_listener(lambda old, new: transitions.append((old, new)))
+    governor.start()
+    governor.set_hidden(True)
+    root.advance(5)
+    assert runs == {"sampler": 1, "fullscreen": 6}
+
+    signals.locked = True
+    governor.update_state()
+    root.advance(60)
+    assert runs == {"sampler": 1, "fullscreen": 6}
+
+    # Unlocked under the still fullscreen window: the check resumes at once
+    signals.locked = False
+    governor.update_state()
+    assert runs == {"sampler": 1, "fullscreen": 7}
+    assert transitions == [(ACTIVE, PAUSED)]
+
+
+def test_hidden_bar_pauses_at_once_without_waiting_for_a_check():
+    root, _, governor, runs = make_governor()
+    governor.start()
+    governor.set_hidden(True)
+    assert governor.state == PAUSED
+    assert [job.after_id for job in governor.jobs.values() if job.pausable] == [None]
+
+    governor.set_hidden(False)
+    assert governor.state == ACTIVE
+    assert runs["sampler"] == 2
+
+
+def test_set_interval_reschedules_the_pending_tick():
+    root, _, governor, runs = make_governor()
+    governor.start()
+    governor.set_interval("sampler", 250)
+    root.advance(1)
+    assert runs["sampler"] == 5
+
+
+def test_stop_leaves_no_timer_pending():
+    root, _, governor, _ = make_governor()
+    governor.start()
+    root.advance(3)
+    governor.stop()
+    assert root.jobs == {}
+
+
+def test_unhiding_while_idle_refreshes_at_once():
+    # A fullscreen video ends while the user has not touched the input for a while
+    root, signals, governor, runs = make_governor()
+    governor.start()
+    signals.idle_seconds = 600
+    governor.set_hidden(True)
+    assert governor.state == PAUSED
+    root.advance(60)
+    paused_at = runs["sampler"]
+
+    governor.set_hidden(False)
+    assert governor.state == IDLE
+    assert runs["sampler"] == paused_at + 1
+    root.advance(4.9)
+    assert runs["sampler"] == paused_at + 1
+    root.advance(0.1)
+    assert runs["sampler"] == paused_at + 2
+
+
+def test_unpausable_jobs_follow_the_new_rate_at_once():
+    root, signals, governor, runs = make_governor()
+    governor.start()
+    signals.idle_seconds = 600
+    root.advance(1)
+    assert governor.state == IDLE
+    root.advance(0.5)  # The fullscreen tick is now due 5 s out
+
+    signals.idle_seconds = 0
+    governor.update_state()
+    assert governor.state == ACTIVE
+    before = runs["fullscreen"]
+    root.advance(1)
+    assert runs["fullscreen"] == before + 1
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# tests/test_app_color_memory.py - Remembered colors: LRU, expiry and the foreground switch path
+from system.displays import MonitorInfo
+from system.window_probe import FakeWindowProbe
+from utils.app_color_memory import AppColorMemory
+from utils.color_adapter import ColorAdapter
+from tests.fakes import FakeCaptureBackend, FakeWindow
+
+EDITOR = ("Chrome_WidgetWin_1", "code.exe")
+BROWSER = ("Chrome_WidgetWin_1", "msedge.exe")
+TERMINAL = ("CASCADIA_HOSTING_WINDOW_CLASS", "WindowsTerminal.exe")
+DARK = [(30, 30, 30)]
+LIGHT = [(248, 248, 248)]
+
+
+def make_memory(max_entries=2, max_age=60.0):
+    t = [0.0]
+    return AppColorMemory(max_entries, max_age, clock=lambda: t[0]), t
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    memory, _ = make_memory(max_entries=2)
+    memory.put(EDITOR, DARK)
+    memory.put(BROWSER, LIGHT)
+    # A lookup counts as use, so the browser is now the oldest
+    assert memory.get(EDITOR) == DARK
+    memory.put(TERMINAL, DARK)
+
+    assert list(memory.entries) == [EDITOR, TERMINAL]
+    assert memory.get(BROWSER) is None
+
+
+def test_put_refreshes_an_existing_entry():
+    memory, _ = make_memory(max_entries=2)
+    memory.put(EDITOR, DARK)
+    memory.put(BROWSER, LIGHT)
+    memory.put(EDITOR, LIGHT)
+    memory.put(TERMINAL, DARK)
+    assert list(memory.entries) == [EDITOR, TERMINAL]
+    assert memory.get(EDITOR) == LIGHT
+
+
+def test_entries_expire_after_max_age():
+    memory, t = make_memory(max_entries=8, max_age=60.0)
+    memory.put(EDITOR, DARK)
+    t[0] = 60.0
+    assert memory.get(EDITOR) == DARK  # Exactly max_age old is still fresh
+    t[0] = 60.5
+    assert memory.get(EDITOR) is None
+    assert EDITOR not in memory.entries
+
+
+def test_lookups_do_not_extend_the_age():
+    memory, t = make_memory(max_entries=8, max_age=60.0)
+    memory.put(EDITOR, DARK)
+    for t[0] in (20.0, 40.0, 59.0):
+        assert memory.get(EDITOR) == DARK
+    t[0] = 61.0
+    assert memory.get(EDITOR) is None
+
+
+def test_evict_drops_aged_entries_that_are_never_looked_up():
+    memory, t = make_memory(max_entries=8, max_age=60.0)
+    memory.put(EDITOR, DARK)
+    t[0] = 30.0
+    memory.put(BROWSER, LIGHT)
+    t[0] = 70.0
+    memory.put(TERMINAL, DARK)
+    assert list(memory.entries) == [BROWSER, TERMINAL]
+
+
+def test_hit_rate_counts_hits_and_misses():
+    memory, _ = make_memory()
+    assert memory.get_hit_rate() == 0.0
+    memory.get(EDITOR)
+    memory.put(EDITOR, DARK)
+    memory.get(EDITOR)
+    memory.get(EDITOR)
+    assert (memory.hits, memory.misses) == (2, 1)
+    assert abs(memory.get_hit_rate() - 2 / 3) < 1e-9
+
+
+SCREEN = MonitorInfo("primary", 0, 0, 1920, 1080, True)
+
+
+def make_adapter(screen_color):
+    """ColorAdapter over a flat colored screen, with a settable foreground"""
+    root = FakeWindow()
+    backend = FakeCaptureBackend(default=screen_color)
+    probe = FakeWindowProbe(desktop=False)
+    adapter = ColorAdapter(root, 22, monitor=SCREEN, window_probe=probe, backend=backend)
+    adapter.fader.clock = root.clock
+    return root, backend, probe, adapter
+
+
+def test_remembered_colors_are_applied_at_once_on_a_switch():
+    root, backend, probe, adapter = make_adapter(LIGHT[0])
+    adapter.update_colors()
+    adapter.app_memory.put(EDITOR, DARK)
+
+    probe.foreground = EDITOR
+    adapter.check_foreground()
+    # The fade to the remembered color starts before anything is captured
+    assert adapter.fader.targets[adapter.bars[0]][0] == DARK[0]
+    assert len(backend.captures) == 1
+    assert adapter.app_memory.hits == 1
+
+
+def test_one_lazy_capture_per_switch_the_earlier_one_cancelled():
+    root, backend, probe, adapter = make_adapter(LIGHT[0])
+    probe.foreground = EDITOR
+    adapter.check_foreground()
+    first = adapter.lazy_after_id
+    assert first in root.jobs
+
+    root.advance(0.1)
+    probe.foreground = BROWSER
+    adapter.check_foreground()
+    assert first not in root.jobs and adapter.lazy_after_id in root.jobs
+    # Polling again without a switch schedules nothing more
+    adapter.check_foreground()
+    assert len(root.jobs) == 1
+
+    root.advance(1)
+    assert len(backend.captures) == 1
+    assert adapter.lazy_after_id is None
+    assert adapter.bars[0].bg_color == "#f8f8f8"
+
+
+def test_colors_are_remembered_only_while_the_foreground_is_unchanged():
+    root, backend, probe, adapter = make_adapter(DARK[0])
+    probe.foreground = EDITOR
+    # Not confirmed by check_foreground yet, the capture may show the previous window
+    adapter.update_colors()
+    assert adapter.app_memory.entries == {}
+
+    adapter.check_foreground()
+    root.advance(1)  # The lazy capture
+    assert adapter.app_memory.entries[EDITOR][1] == DARK
+
+    # Switched, but check_foreground has not seen it yet
+    probe.foreground = BROWSER
+    backend.default = LIGHT[0]
+    adapter.update_colors()
+    assert BROWSER not in adapter.app_memory.entries
+    assert adapter.app_memory.entries[EDITOR][1] == DARK
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# tests/test_audio.py - Rate-limited volume writes and reconciliation with device readings
+import time
+import threading
+
+from system.audio import VolumeController, FakeAudioDevice
+
+
+class SlowAudioDevice(FakeAudioDevice):
+    def __init__(self, volume=0.5, mute=False):
+        """Blocks inside set_volume until the test lets the write finish"""
+        super().__init__(volume, mute)
+        self.entered = threading.Event()
+        self.proceed = threading.Event()
+        self.done = threading.Event()
+
+    def set_volume(self, volume):
+        self.entered.set()
+        self.proceed.wait(5)
+        super().set_volume(volume)
+        self.done.set()
+
+
+def test_stale_reading_during_a_write_keeps_the_optimistic_volume():
+    device = SlowAudioDevice(volume=0.5)
+    controller = VolumeController(lambda: device, step=0.02, settle_time=0.0)
+    controller.reconcile(0.5, False)
+    controller.start()
+    try:
+        assert abs(controller.scroll(5) - 0.6) < 1e-9
+        assert device.entered.wait(5)
+
+        # The status poll reads the device while the write is still in flight
+        controller.reconcile(0.5, False)
+        assert abs(controller.get_state()[0] - 0.6) < 1e-9
+
+        device.proceed.set()
+        assert device.done.wait(5)
+    finally:
+        controller.stop()
+    assert abs(device.volume - 0.6) < 1e-9
+    assert not controller.writing
+
+    # Once the write has landed and settled, readings are taken again
+    controller.reconcile(0.4, True)
+    assert controller.get_state() == (0.4, True)
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_fast_scrolling_is_merged_into_few_writes():
+    device = FakeAudioDevice(volume=0.5)
+    controller = VolumeController(lambda: device, step=0.01, max_rate=20, settle_time=0.0)
+    controller.reconcile(0.5, False)
+    controller.start()
+    try:
+        for _ in range(30):
+            controller.scroll(1)
+        assert wait_until(lambda: abs(device.volume - 0.8) < 1e-9)
+    finally:
+        controller.stop()
+    assert device.volume_writes <= 3
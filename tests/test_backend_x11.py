@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# tests/test_backend_x11.py - X11 image conversion and shutdown, against a fake display
+import time
+import socket
+import logging
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+from Xlib import X
+
+from system import backend_x11
+from system.backend import Backend
+from system.backend_x11 import ActiveWindowWatcher, X11Backend, convert_zpixmap
+
+RGB = np.array([[[10, 20, 30], [40, 50, 60], [70, 80, 90]],
+                [[11, 21, 31], [41, 51, 61], [71, 81, 91]]], dtype=np.uint8)
+
+
+def pack(rgb, order, pad=0):
+    """ZPixmap bytes for 32 bpp pixels, each scanline padded by `pad` bytes"""
+    height, width, _ = rgb.shape
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    if order == X.LSBFirst:
+        pixels[:, :, :3] = rgb[:, :, ::-1]  # BGRX
+    else:
+        pixels[:, :, 1:] = rgb  # XRGB
+    rows = np.zeros((height, width * 4 + pad), dtype=np.uint8)
+    rows[:, :width * 4] = pixels.reshape(height, width * 4)
+    return rows.tobytes()
+
+
+def test_both_byte_orders_convert_to_rgb():
+    for order in (X.LSBFirst, X.MSBFirst):
+        pixels = convert_zpixmap(pack(RGB, order), 3, 2, 32, order)
+        assert np.array_equal(pixels, RGB)
+
+
+def test_padded_scanlines_are_cut_to_the_image_width():
+    pixels = convert_zpixmap(pack(RGB, X.LSBFirst, pad=8), 3, 2, 32, X.LSBFirst)
+    assert np.array_equal(pixels, RGB)
+
+
+def test_other_formats_are_left_to_the_fallback():
+    assert convert_zpixmap(bytes(2 * 3 * 2), 3, 2, 16, X.LSBFirst) is None
+    assert convert_zpixmap(bytes(2 * 3 * 3), 3, 2, 32, X.LSBFirst) is None  # Short scanlines
+
+
+def test_capture_rect_falls_back_to_pil_for_16_bit_visuals(monkeypatch):
+    image = SimpleNamespace(depth=16, data=bytes(3 * 2 * 2))
+    root = SimpleNamespace(get_image=lambda *args: image)
+    info = SimpleNamespace(
+        pixmap_formats=[SimpleNamespace(depth=16, bits_per_pixel=16, scanline_pad=32)],
+        image_byte_order=X.LSBFirst,
+    )
+    backend = X11Backend.__new__(X11Backend)
+    backend.display = SimpleNamespace(screen=lambda: SimpleNamespace(root=root), display=SimpleNamespace(info=info))
+    calls = []
+    monkeypatch.setattr(Backend, "capture_rect", lambda self, *rect: calls.append(rect) or RGB)
+
+    assert backend.capture_rect(0, 0, 3, 2) is RGB
+    assert calls == [(0, 0, 3, 2)]
+
+
+class FakeXDisplay:
+    def __init__(self):
+        """Xlib display backed by a socket pair, events arrive with send_event()
+
+        Like python-xlib, close() does not wake a thread waiting on the
+        socket, and next_event() is only safe when pending_events() says so.
+        """
+        self.server, self.client = socket.socketpair()
+        self.client.setblocking(False)
+        self.incoming = []
+        self.queue = []
+        self.lock = threading.Lock()
+        self.closed = False
+        self.property_reads = 0
+        root = SimpleNamespace(change_attributes=lambda **kwargs: None, get_full_property=self.get_full_property)
+        self.screen = lambda: SimpleNamespace(root=root)
+
+    def get_full_property(self, *args):
+        self.property_reads += 1
+        return None
+
+    def intern_atom(self, name):
+        return hash(name)
+
+    def fileno(self):
+        return self.client.fileno()
+
+    def send_event(self, event):
+        with self.lock:
+            self.incoming.append(event)
+        self.server.send(b"e")
+
+    def pending_events(self):
+        try:
+            received = len(self.client.recv(4096))
+        except BlockingIOError:
+            received = 0
+        with self.lock:
+            self.queue.extend(self.incoming[:received])
+            del self.incoming[:received]
+            return len(self.queue)
+
+    def next_event(self):
+        assert self.queue, "next_event would block"
+        return self.queue.pop(0)
+
+    def close(self):
+        self.closed = True
+        self.server.close()
+        self.client.close()
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_watcher_handles_property_events(monkeypatch):
+    monkeypatch.setattr(backend_x11.xdisplay, "Display", FakeXDisplay)
+    watcher = ActiveWindowWatcher()
+    display = watcher.display
+    watcher.start()
+    try:
+        assert wait_until(lambda: display.property_reads == 1)
+        display.send_event(SimpleNamespace(type=X.PropertyNotify, atom=watcher.atoms["_NET_ACTIVE_WINDOW"]))
+        display.send_event(SimpleNamespace(type=X.PropertyNotify, atom=hash("WM_NAME")))
+        display.send_event(SimpleNamespace(type=X.PropertyNotify, atom=watcher.atoms["_NET_WM_STATE"]))
+        assert wait_until(lambda: display.property_reads == 3)
+    finally:
+        watcher.close()
+
+
+def test_watcher_close_wakes_its_blocked_event_thread(monkeypatch, caplog):
+    monkeypatch.setattr(backend_x11.xdisplay, "Display", FakeXDisplay)
+    watcher = ActiveWindowWatcher()
+    watcher.start()
+    assert wait_until(lambda: watcher.display.property_reads == 1)
+    assert watcher.thread.is_alive()
+
+    start = time.monotonic()
+    with caplog.at_level(logging.ERROR):
+        watcher.close()
+    assert time.monotonic() - start < 0.5  # Not the 1 s join timeout
+    assert not watcher.thread.is_alive()
+    assert watcher.display.closed
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+def test_backend_stop_closes_the_watcher_and_its_own_display(monkeypatch):
+    monkeypatch.setattr(backend_x11.xdisplay, "Display", FakeXDisplay)
+    backend = X11Backend()
+    backend.stop()
+    assert not backend.watcher.thread.is_alive()
+    assert backend.watcher.display.closed and backend.display.closed
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# tests/test_calendar_index.py - ICS parsing, RRULE expansion and the incremental calendar store
+import os
+from datetime import date, datetime, timedelta
+
+from system import calendar_index
+from system.calendar_index import parse_ics, expand_events, get_unsupported_parts, CalendarStore, EventIndex
+
+WINDOW_START = datetime(2026, 1, 1)
+WINDOW_END = datetime(2026, 12, 31)
+
+
+def make_calendar(*events):
+    """iCalendar lines for VEVENTs given as lists of property lines"""
+    lines = ["BEGIN:VCALENDAR"]
+    for i, properties in enumerate(events):
+        lines += ["BEGIN:VEVENT", f"UID:event-{i}"] + list(properties) + ["END:VEVENT"]
+    return lines + ["END:VCALENDAR"]
+
+
+def expand(*events):
+    raw = list(parse_ics(make_calendar(*events)))
+    return sorted(expand_events(raw, WINDOW_START, WINDOW_END), key=lambda e: e.start)
+
+
+def starts(events):
+    return [event.start for event in events]
+
+
+def test_folded_summary_and_duration():
+    events = expand([
+        "DTSTART:20260105T090000",
+        "DURATION:PT1H30M",
+        "SUMMARY:Planning with a long",
+        "  title",
+    ])
+    assert len(events) == 1
+    assert events[0].summary == "Planning with a long title"
+    assert events[0].end == datetime(2026, 1, 5, 10, 30)
+
+
+def test_weekly_byday():
+    # 2026-01-05 is a Monday
+    events = expand(["DTSTART:20260105T090000", "RRULE:FREQ=WEEKLY;BYDAY=MO,TH;COUNT=4"])
+    assert starts(events) == [
+        datetime(2026, 1, 5, 9), datetime(2026, 1, 8, 9),
+        datetime(2026, 1, 12, 9), datetime(2026, 1, 15, 9),
+    ]
+
+
+def test_daily_byday_keeps_weekdays_and_counts_only_them():
+    # Starts on a Friday, COUNT counts the weekdays produced, not the days stepped
+    events = expand(["DTSTART:20260109T080000", "RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR;COUNT=3"])
+    assert starts(events) == [datetime(2026, 1, 9, 8), datetime(2026, 1, 12, 8), datetime(2026, 1, 13, 8)]
+
+
+def test_monthly_on_the_31st_skips_short_months():
+    events = expand(["DTSTART:20260131T120000", "RRULE:FREQ=MONTHLY;COUNT=3"])
+    assert starts(events) == [datetime(2026, 1, 31, 12), datetime(2026, 3, 31, 12), datetime(2026, 5, 31, 12)]
+
+
+def test_by_parts_that_restate_dtstart_are_expanded():
+    events = expand(["DTSTART:20260115T100000", "RRULE:FREQ=MONTHLY;BYMONTHDAY=15;COUNT=2"])
+    assert starts(events) == [datetime(2026, 1, 15, 10), datetime(2026, 2, 15, 10)]
+    events = expand(["DTSTART:20260301", "RRULE:FREQ=YEARLY;BYMONTH=3;BYMONTHDAY=1"])
+    assert starts(events) == [datetime(2026, 3, 1)]
+
+
+def test_unsupported_by_parts_skip_the_series():
+    # "Second Tuesday of every month" must not turn into "the 13th of every month"
+    assert expand(["DTSTART:20260113T100000", "RRULE:FREQ=MONTHLY;BYDAY=2TU"]) == []
+    assert expand(["DTSTART:20260101T100000", "RRULE:FREQ=MONTHLY;BYMONTHDAY=1,15"]) == []
+    assert expand(["DTSTART:20260130T100000", "RRULE:FREQ=MONTHLY;BYDAY=FR;BYSETPOS=-1"]) == []
+    # A plain event next to it is unaffected
+    assert len(expand(["DTSTART:20260113T100000", "RRULE:FREQ=YEARLY;BYWEEKNO=2"],
+                      ["DTSTART:20260120T100000"])) == 1
+
+
+def test_get_unsupported_parts():
+    start = datetime(2026, 1, 13)
+    assert get_unsupported_parts({"FREQ": "WEEKLY", "BYDAY": "MO,WE"}, start) == []
+    assert get_unsupported_parts({"FREQ": "WEEKLY", "BYDAY": "1MO"}, start) == ["BYDAY"]
+    assert get_unsupported_parts({"FREQ": "MONTHLY", "BYDAY": "2TU"}, start) == ["BYDAY"]
+    assert get_unsupported_parts({"FREQ": "YEARLY", "BYMONTH": "6"}, start) == ["BYMONTH"]
+    assert get_unsupported_parts({"FREQ": "DAILY", "BYHOUR": "9,17"}, start) == ["BYHOUR"]
+
+
+def test_exdate_and_recurrence_id_override():
+    events = expand(
+        ["DTSTART:20260105T090000", "RRULE:FREQ=WEEKLY;COUNT=4", "EXDATE:20260112T090000", "SUMMARY:Sync"],
+    )
+    assert starts(events) == [datetime(2026, 1, 5, 9), datetime(2026, 1, 19, 9), datetime(2026, 1, 26, 9)]
+
+    calendar = make_calendar(
+        ["DTSTART:20260105T090000", "RRULE:FREQ=WEEKLY;COUNT=2", "SUMMARY:Sync"],
+    )
+    # The moved occurrence shares the series UID
+    calendar[-1:-1] = [
+        "BEGIN:VEVENT", "UID:event-0", "RECURRENCE-ID:20260112T090000",
+        "DTSTART:20260113T150000", "SUMMARY:Sync (moved)", "END:VEVENT",
+    ]
+    events = sorted(expand_events(list(parse_ics(calendar)), WINDOW_START, WINDOW_END), key=lambda e: e.start)
+    assert [(e.start, e.summary) for e in events] == [
+        (datetime(2026, 1, 5, 9), "Sync"), (datetime(2026, 1, 13, 15), "Sync (moved)"),
+    ]
+
+
+def write_calendar(path, *events, mtime_ns=None):
+    path.write_text("\r\n".join(make_calendar(*events)) + "\r\n", encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def count_parses(monkeypatch):
+    """Record the path of every file CalendarStore parses"""
+    parsed = []
+    parse_ics_file = calendar_index.parse_ics_file
+
+    def counting(path):
+        parsed.append(os.path.basename(path))
+        return parse_ics_file(path)
+
+    monkeypatch.setattr(calendar_index, "parse_ics_file", counting)
+    return parsed
+
+
+def make_store(directory, now):
+    clock = [now]
+    store = CalendarStore(directory=str(directory), past_days=1, future_days=7, clock=lambda: clock[0])
+    return store, clock
+
+
+def summaries(events):
+    return [event.summary for event in events]
+
+
+def test_refresh_parses_only_changed_files(tmp_path, monkeypatch):
+    parsed = count_parses(monkeypatch)
+    work = tmp_path / "work.ics"
+    home = tmp_path / "home.ics"
+    write_calendar(work, ["DTSTART:20260105T090000", "SUMMARY:Standup"], mtime_ns=1_000_000_000)
+    write_calendar(home, ["DTSTART:20260105T190000", "SUMMARY:Dinner"], mtime_ns=1_000_000_000)
+    store, _ = make_store(tmp_path, datetime(2026, 1, 5, 8))
+
+    assert store.refresh()
+    assert sorted(parsed) == ["home.ics", "work.ics"]
+    assert not store.refresh()
+    assert len(parsed) == 2
+
+    # Same size, newer mtime
+    write_calendar(work, ["DTSTART:20260105T100000", "SUMMARY:Standup"], mtime_ns=2_000_000_000)
+    assert store.refresh()
+    assert parsed[2:] == ["work.ics"]
+    # Same mtime, different size
+    write_calendar(home, ["DTSTART:20260105T190000", "SUMMARY:Late dinner"], mtime_ns=1_000_000_000)
+    assert store.refresh()
+    assert parsed[3:] == ["home.ics"]
+    assert summaries(store.events_on(date(2026, 1, 5))) == ["Standup", "Late dinner"]
+    assert store.index.events[0].start == datetime(2026, 1, 5, 10)
+
+
+def test_refresh_drops_deleted_files_without_parsing(tmp_path, monkeypatch):
+    parsed = count_parses(monkeypatch)
+    write_calendar(tmp_path / "work.ics", ["DTSTART:20260105T090000", "SUMMARY:Standup"])
+    home = write_calendar(tmp_path / "home.ics", ["DTSTART:20260105T190000", "SUMMARY:Dinner"])
+    store, _ = make_store(tmp_path, datetime(2026, 1, 5, 8))
+    store.refresh()
+
+    os.remove(home)
+    assert store.refresh()
+    assert len(parsed) == 2
+    assert list(store.files) == [str(tmp_path / "work.ics")]
+    assert summaries(store.events_on(date(2026, 1, 5))) == ["Standup"]
+
+
+def test_date_change_rolls_the_window_without_parsing(tmp_path, monkeypatch):
+    parsed = count_parses(monkeypatch)
+    write_calendar(tmp_path / "gym.ics",
+                   ["DTSTART:20260101T070000", "DURATION:PT1H", "RRULE:FREQ=DAILY", "SUMMARY:Gym"])
+    store, clock = make_store(tmp_path, datetime(2026, 1, 5, 23, 59))
+    store.refresh()
+    # past_days + future_days from the start of yesterday
+    assert summaries(store.index.events) == ["Gym"] * 8
+    assert store.has_events(date(2026, 1, 4)) and store.has_events(date(2026, 1, 11))
+    assert not store.has_events(date(2026, 1, 12))
+
+    clock[0] += timedelta(minutes=1)
+    assert store.refresh()
+    assert len(parsed) == 1
+    assert store.has_events(date(2026, 1, 12))
+    assert not store.has_events(date(2026, 1, 4))
+    assert store.next_events(1)[0].start == datetime(2026, 1, 6, 7)
+    # Later the same day nothing is rebuilt
+    clock[0] += timedelta(hours=12)
+    assert not store.refresh()
+
+
+def make_index():
+    return EventIndex(expand(
+        ["DTSTART:20260105T220000", "DTEND:20260106T000000", "SUMMARY:Late call"],
+        ["DTSTART:20260105T100000", "DTEND:20260107T120000", "SUMMARY:Offsite"],
+        ["DTSTART;VALUE=DATE:20260106", "SUMMARY:Holiday"],
+        ["DTSTART;VALUE=DATE:20260108", "DTEND;VALUE=DATE:20260110", "SUMMARY:Trip"],
+        ["DTSTART:20260106T090000", "SUMMARY:Reminder"],
+    ))
+
+
+def test_events_on_spans_multi_day_all_day_and_midnight_ending_events():
+    index = make_index()
+    assert summaries(index.events_on(date(2026, 1, 5))) == ["Offsite", "Late call"]
+    # The late call ends exactly at midnight and does not touch the 6th
+    assert summaries(index.events_on(date(2026, 1, 6))) == ["Offsite", "Holiday", "Reminder"]
+    assert summaries(index.events_on(date(2026, 1, 7))) == ["Offsite"]
+    # An all-day DTEND is exclusive
+    assert summaries(index.events_on(date(2026, 1, 9))) == ["Trip"]
+    assert not index.has_events(date(2026, 1, 10))
+
+
+def test_next_events_starts_at_now_in_start_order():
+    index = make_index()
+    assert summaries(index.next_events(datetime(2026, 1, 5, 12), limit=3)) == ["Late call", "Holiday", "Reminder"]
+    # An event starting exactly now is still next, one already under way is not
+    assert summaries(index.next_events(datetime(2026, 1, 6, 9))) == ["Reminder", "Trip"]
+    assert index.next_events(datetime(2026, 1, 9)) == []
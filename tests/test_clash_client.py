@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# tests/test_clash_client.py - ClashClient against a local stub of the external controller
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+
+import pytest
+
+from system.clash_client import ClashClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like Clash
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # One handler instance per TCP connection
+        self.connection_id = self.server.stub.next_connection()
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status=204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub.record(self, "GET", None)
+        if self.path == "/traffic":
+            stub.serve_traffic(self)
+        elif self.path == "/configs":
+            self.send_json({"mode": stub.mode.capitalize()})
+        elif self.path == "/proxies":
+            self.send_json({"proxies": {
+                stub.group: {"type": "Selector", "now": stub.selected, "all": ["Tokyo", "Osaka"]},
+                "DIRECT": {"type": "Direct"},
+            }})
+        else:
+            self.send_empty(404)
+
+    def do_PATCH(self):
+        stub = self.server.stub
+        body = self.read_json()
+        stub.record(self, "PATCH", body)
+        stub.mode = body["mode"]
+        self.send_empty()
+
+    def do_PUT(self):
+        stub = self.server.stub
+        body = self.read_json()
+        stub.record(self, "PUT", body)
+        if unquote(self.path) != f"/proxies/{stub.group}":
+            self.send_empty(404)
+            return
+        stub.selected = body["name"]
+        self.send_empty()
+
+
+class ClashStub:
+    def __init__(self, traffic_script):
+        """Stub controller, `traffic_script` says how each /traffic request is answered
+
+        Script entries: "fail" answers 503, "drop" streams two lines and
+        closes in the middle of the third, "end" streams two lines and
+        closes cleanly, "stream" streams until stopped.
+        """
+        self.traffic_script = list(traffic_script)
+        self.traffic_attempts = []  # Clock reading of each /traffic request
+        self.requests = []  # (connection id, method, path, body)
+        self.mode = "rule"
+        self.group = "Proxy Group"
+        self.selected = "Osaka"
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def next_connection(self):
+        with self.lock:
+            self.connections += 1
+            return self.connections
+
+    def record(self, handler, method, body):
+        with self.lock:
+            self.requests.append((handler.connection_id, method, handler.path, body))
+
+    def control_requests(self):
+        with self.lock:
+            return [r for r in self.requests if r[2] != "/traffic"]
+
+    def serve_traffic(self, handler):
+        with self.lock:
+            self.traffic_attempts.append(time.monotonic())
+            action = self.traffic_script.pop(0) if self.traffic_script else "stream"
+        if action == "fail":
+            handler.send_empty(503)
+            return
+        # Clash streams without a length, the body ends when the connection does
+        handler.close_connection = True
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        try:
+            if action in ("drop", "end"):
+                handler.wfile.write(b'{"up": 1, "down": 2}\n{"up": 3, "down": 4}\n')
+                if action == "drop":
+                    handler.wfile.write(b'{"up": 5, "do')
+                handler.wfile.flush()
+                return
+            while not self.stopping.wait(0.02):
+                handler.wfile.write(b'{"up": 300, "down": 4000}\n')
+                handler.wfile.flush()
+        except OSError:
+            pass  # The client closed the stream
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def make_client():
+    started = []
+
+    def make(traffic_script=(), **options):
+        stub = ClashStub(traffic_script)
+        stub.start()
+        client = ClashClient(port=stub.port, timeout=2.0, **options)
+        started.append((stub, client))
+        return stub, client
+
+    yield make
+    for stub, client in started:
+        client.stop()
+        stub.stop()
+
+
+def test_backoff_doubles_with_jitter_up_to_the_maximum():
+    client = ClashClient(min_backoff=1.0, max_backoff=30.0)
+    delays = client.backoff_delays()
+    for base in (1, 2, 4, 8, 16, 30, 30):
+        assert base * 0.8 <= next(delays) <= base * 1.2
+
+
+def test_traffic_stream_reconnects_after_errors_and_a_mid_stream_drop(make_client):
+    stub, client = make_client(["fail", "fail", "drop", "stream"], min_backoff=0.05, max_backoff=0.2)
+    client.start()
+
+    assert wait_until(lambda: client.get_state()["up"] == 300)
+    state = client.get_state()
+    assert state["connected"] and state["down"] == 4000
+    assert len(stub.traffic_attempts) == 4
+
+    # Each failure waits longer than the one before: ~0.05 s, ~0.1 s, ~0.2 s
+    gaps = [b - a for a, b in zip(stub.traffic_attempts, stub.traffic_attempts[1:])]
+    assert 0.04 <= gaps[0] < gaps[1] < gaps[2]
+    assert gaps[2] < 0.2 * 1.2 + 0.1
+
+
+def test_stream_ending_cleanly_resets_the_backoff(make_client):
+    stub, client = make_client(["fail", "fail", "fail", "end", "fail"], min_backoff=0.05, max_backoff=1.0)
+    client.start()
+    assert wait_until(lambda: len(stub.traffic_attempts) >= 6)
+
+    gaps = [b - a for a, b in zip(stub.traffic_attempts, stub.traffic_attempts[1:])]
+    # Three failures grow the delay to ~0.2 s, a stream that ended cleanly starts over at ~0.05 s
+    assert gaps[2] > 0.15
+    assert gaps[3] < 0.1
+    assert gaps[3] < gaps[4]
+
+
+def test_stop_closes_the_stream(make_client):
+    stub, client = make_client()
+    client.start()
+    assert wait_until(lambda: client.get_state()["connected"])
+
+    threads = list(client.threads)
+    client.stop()
+    assert not any(thread.is_alive() for thread in threads)
+    assert not client.get_state()["connected"]
+
+
+def test_mode_and_proxy_switches_share_one_keep_alive_connection(make_client):
+    stub, client = make_client()
+    client.start()
+    assert wait_until(lambda: client.get_state()["mode"] == "rule")
+    assert client.get_state()["groups"] == {"Proxy Group": {"now": "Osaka", "all": ["Tokyo", "Osaka"]}}
+
+    client.set_mode("global")
+    assert wait_until(lambda: client.get_state()["mode"] == "global")
+    client.select_proxy("Proxy Group", "Tokyo")
+    assert wait_until(lambda: client.get_state()["groups"]["Proxy Group"]["now"] == "Tokyo")
+
+    requests = stub.control_requests()
+    assert ("PATCH", "/configs", {"mode": "global"}) in [r[1:] for r in requests]
+    assert ("PUT", "/proxies/Proxy%20Group", {"name": "Tokyo"}) in [r[1:] for r in requests]
+    # Initial refresh plus two commands, each followed by GET /configs and /proxies
+    assert len(requests) == 8
+    assert len({r[0] for r in requests}) == 1
+
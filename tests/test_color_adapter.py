@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# tests/test_color_adapter.py - Sampling below several bars, against a fake screen
+from system.displays import MonitorInfo
+from system.window_probe import FakeWindowProbe
+from utils.color_adapter import ColorAdapter
+from tests.fakes import FakeCaptureBackend, FakeWidget, FakeWindow
+
+RED, GREEN, BLUE = (200, 0, 0), (0, 200, 0), (0, 0, 200)
+PRIMARY = MonitorInfo("primary", 0, 0, 1920, 1080, True)
+RIGHT = MonitorInfo("right", 1920, 0, 3840, 1080, False)
+SIDE = MonitorInfo("side", -1080, 500, 0, 2420, False)
+
+
+def make_adapter(monitors, regions, **probe):
+    root = FakeWindow()
+    backend = FakeCaptureBackend(regions)
+    probe.setdefault("desktop", False)
+    adapter = ColorAdapter(root, 22, monitor=monitors[0], window_probe=FakeWindowProbe(**probe), backend=backend)
+    for monitor in monitors[1:]:
+        adapter.add_bar(FakeWidget(), monitor)
+    return root, backend, adapter
+
+
+def screen_of(*colored_monitors):
+    return [(m.left, m.top, m.right, m.bottom, color) for m, color in colored_monitors]
+
+
+def test_each_bar_gets_the_color_below_its_own_monitor():
+    _, backend, adapter = make_adapter(
+        [PRIMARY, RIGHT, SIDE], screen_of((PRIMARY, RED), (RIGHT, GREEN), (SIDE, BLUE))
+    )
+    assert adapter.sample_screen_colors() == [RED, GREEN, BLUE]
+
+
+def test_one_single_row_strip_per_distinct_sample_row():
+    _, backend, adapter = make_adapter(
+        [PRIMARY, RIGHT, SIDE], screen_of((PRIMARY, RED), (RIGHT, GREEN), (SIDE, BLUE))
+    )
+    adapter.sample_screen_colors()
+    # Side by side monitors share a strip, the lower one gets its own instead of 500 rows between
+    assert sorted(backend.captures) == [(-1080, 524, 0, 525), (0, 24, 3840, 25)]
+
+
+def test_bars_over_the_desktop_use_the_wallpaper_and_skip_the_capture(tmp_path):
+    from PIL import Image
+    path = tmp_path / "wallpaper.png"
+    Image.new("RGB", (64, 36), BLUE).save(path)
+    _, backend, adapter = make_adapter([PRIMARY, RIGHT], screen_of((PRIMARY, RED)), desktop=True,
+                                       wallpaper_path=str(path))
+    assert adapter.sample_screen_colors() == [BLUE, BLUE]
+    assert backend.captures == []
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# tests/test_color_fade.py - Fades on a scripted clock, and per-frame contrast in ColorAdapter
+from system.backend import Backend
+from system.window_probe import WindowProbe
+from utils.color_adapter import ColorAdapter
+from utils.color_fade import ColorFader, to_hex
+from tests.fakes import FakeRoot, FakeWidget, FakeWindow
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREY = (128, 128, 128)
+
+
+def make_fader():
+    root = FakeRoot()
+    painted = []
+    fader = ColorFader(root, lambda key, bg, fg, bg_rgb: painted.append((key, bg, fg, bg_rgb)),
+                       duration=200, fps=60, clock=root.clock)
+    return root, fader, painted
+
+
+def test_first_target_snaps_without_a_timer():
+    root, fader, painted = make_fader()
+    assert fader.set_target("bar", BLACK, WHITE)
+    assert painted == [("bar", "#000000", "#ffffff", BLACK)]
+    assert root.jobs == {} and not fader.is_fading()
+
+
+def test_fade_takes_twelve_frames_at_200_ms_and_60_fps():
+    root, fader, painted = make_fader()
+    fader.set_target("bar", BLACK, WHITE)
+    painted.clear()
+
+    fader.set_target("bar", WHITE, BLACK)
+    assert painted == []
+    ticks = 0
+    while fader.is_fading():
+        root.advance(fader.frame_interval / 1000)
+        ticks += 1
+    assert fader.steps == 12
+    assert len(painted) == 12 and ticks == 12
+    assert painted[-1] == ("bar", "#ffffff", "#000000", WHITE)
+    # Brighter every frame, no jump back
+    levels = [bg_rgb[0] for _, _, _, bg_rgb in painted]
+    assert levels == sorted(set(levels))
+    assert root.jobs == {} and fader.after_id is None
+
+
+def test_retarget_mid_fade_continues_from_the_shown_color():
+    root, fader, painted = make_fader()
+    fader.set_target("bar", BLACK, WHITE)
+    fader.set_target("bar", WHITE, BLACK)
+    root.advance(5 * fader.frame_interval / 1000)
+    shown = fader.shown["bar"]
+    assert shown[0] not in (BLACK, WHITE)
+
+    painted.clear()
+    fader.set_target("bar", GREY, WHITE)
+    assert fader.fades["bar"].frames == fader.get_frames(shown, (GREY, WHITE))
+    root.advance(1)
+    first = painted[0][3]
+    # The first new frame is one step away from the color that was shown
+    assert all(abs(a - b) < 40 for a, b in zip(first, shown[0]))
+    assert fader.shown["bar"] == (GREY, WHITE)
+    assert root.jobs == {} and fader.after_id is None
+
+
+def test_unchanged_target_returns_false():
+    root, fader, painted = make_fader()
+    assert fader.set_target("bar", BLACK, WHITE)
+    assert not fader.set_target("bar", BLACK, WHITE)
+    assert fader.set_target("bar", WHITE, BLACK)
+    root.advance(0.1)
+    assert not fader.set_target("bar", WHITE, BLACK)  # Mid-fade as well
+    root.advance(1)
+    assert len(painted) == 13
+
+
+def test_special_elements_get_the_contrast_of_each_frame():
+    root = FakeWindow()
+    adapter = ColorAdapter(root, window_probe=WindowProbe(), backend=Backend())
+    adapter.fader.clock = root.clock
+    label, special = FakeWidget(), FakeWidget()
+    seen = []
+    adapter.add_ui_element(label)
+    adapter.register_special_element(special, lambda element, bg, is_dark: seen.append((bg, is_dark)))
+
+    bar = adapter.bars[0]
+    adapter.apply_colors(bar, BLACK)
+    assert seen == [("#000000", True)]
+    seen.clear()
+
+    adapter.apply_colors(bar, WHITE)
+    assert seen == []  # Nothing painted before the first frame
+    root.advance(1)
+    # Dark while the frames are dark, light only once the frames are light
+    assert [is_dark for _, is_dark in seen] == sorted((is_dark for _, is_dark in seen), reverse=True)
+    assert seen[0][1] and not seen[-1][1]
+    for bg, is_dark in seen:
+        assert is_dark == adapter.is_dark_color(tuple(int(bg[i:i + 2], 16) for i in (1, 3, 5)))
+    assert seen[-1][0] == to_hex(WHITE) and label.options == {"bg": "#ffffff", "fg": "#000000"}
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# tests/test_config.py - Config validation, defaults and reload diffs
+import pytest
+
+from utils.config import parse_config, ConfigError
+
+
+def test_memory_trace_defaults_off_and_must_be_a_boolean():
+    assert parse_config({}).memory_trace is False
+    assert parse_config({"memory_trace": True}).memory_trace is True
+    with pytest.raises(ConfigError):
+        parse_config({"memory_trace": "yes"})
+
+
+@pytest.mark.parametrize("data", [
+    {"intervals": {"colors": True}},
+    {"intervals": {"config": False}},
+    {"countdown_minutes": True},
+    {"padx": True},
+    {"items": [{"id": "time", "type": "status", "source": "time", "padx": False}]},
+])
+def test_booleans_are_not_accepted_as_integers(data):
+    with pytest.raises(ConfigError):
+        parse_config(data)
+
+
+def test_integer_settings_still_accept_numbers():
+    config = parse_config({"intervals": {"colors": 500}, "countdown_minutes": 0, "padx": 0})
+    assert config.intervals["colors"] == 500
+    assert config.countdown_minutes == 0
+    assert all(item.padx in (0, 16) for item in config.items)
+
+
+def test_config_reload_interval_is_configurable():
+    assert parse_config({}).intervals["config"] == 2000
+    assert parse_config({"intervals": {"config": 5000}}).intervals["config"] == 5000
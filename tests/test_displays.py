@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# tests/test_displays.py - Monitor layout helpers against fake monitor layouts
+from system.displays import (
+    FakeMonitorProvider, MonitorInfo, covers_monitor, monitor_index_for_rect, virtual_bounds
+)
+
+# A primary 1920x1080 with a portrait monitor to its left, 500 px lower
+SIDE = MonitorInfo("side", -1080, 500, 0, 2420, False)
+PRIMARY = MonitorInfo("primary", 0, 0, 1920, 1080, True)
+
+
+def test_provider_lists_the_primary_first_then_left_to_right():
+    provider = FakeMonitorProvider([SIDE, PRIMARY, (1920, 0, 3840, 1080)])
+    assert [m.name for m in provider.get_monitors()] == ["primary", "side", "fake2"]
+    # Plain tuples: the first one is the primary
+    assert [m.is_primary for m in FakeMonitorProvider([(0, 0, 10, 10), (10, 0, 20, 10)]).get_monitors()] == [True, False]
+
+
+def test_virtual_bounds_span_every_monitor():
+    assert virtual_bounds([PRIMARY, SIDE]) == (-1080, 0, 1920, 2420)
+
+
+def test_window_belongs_to_the_monitor_with_the_largest_overlap():
+    monitors = [PRIMARY, SIDE]
+    assert monitor_index_for_rect((100, 100, 500, 500), monitors) == 0
+    assert monitor_index_for_rect((-800, 600, -100, 900), monitors) == 1
+    # Straddling the edge, mostly on the side monitor
+    assert monitor_index_for_rect((-600, 600, 200, 900), monitors) == 1
+    # Only touching an edge is no overlap
+    assert monitor_index_for_rect((1920, 0, 2000, 100), monitors) is None
+    assert monitor_index_for_rect((-1080, 0, 0, 500), monitors) is None
+
+
+def test_covers_monitor_needs_the_whole_rectangle():
+    assert covers_monitor((0, 0, 1920, 1080), PRIMARY)
+    assert covers_monitor((-10, -10, 1930, 1090), PRIMARY)
+    assert not covers_monitor((0, 22, 1920, 1080), PRIMARY)
+    assert not covers_monitor((0, 0, 1920, 1080), SIDE)
+    assert covers_monitor((-1080, 500, 0, 2420), SIDE)
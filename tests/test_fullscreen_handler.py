@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# tests/test_fullscreen_handler.py - Per-monitor fullscreen detection and bar hiding
+from system.backend import ForegroundWindow
+from system.displays import MonitorInfo
+from handlers.fullscreen_handler import FullscreenHandler
+
+PRIMARY = MonitorInfo("primary", 0, 0, 1920, 1080, True)
+RIGHT = MonitorInfo("right", 1920, 0, 3840, 1080, False)
+
+
+class FakeManager:
+    def __init__(self, monitor, handle):
+        """WorkspaceManager stand-in for one bar"""
+        self.monitor = monitor
+        self.root = handle
+        self.visible = True
+
+    def get_monitor(self):
+        return self.monitor
+
+    def hide(self):
+        self.visible = False
+
+    def show(self):
+        self.visible = True
+
+
+class FakeBackend:
+    desktop_classes = ("Progman",)
+
+    def __init__(self):
+        self.foreground = None
+
+    def get_foreground_window(self):
+        return self.foreground
+
+    def get_window_handle(self, window):
+        return window  # The fake managers' roots are their handles
+
+
+def make_handler():
+    backend = FakeBackend()
+    managers = [FakeManager(PRIMARY, 1), FakeManager(RIGHT, 2)]
+    return backend, managers, FullscreenHandler(None, managers, backend)
+
+
+def window(rect, class_name="App", fullscreen=None, handle=100):
+    return ForegroundWindow(handle, class_name, rect, fullscreen, None)
+
+
+def test_only_the_foreground_monitor_is_evaluated():
+    backend, _, handler = make_handler()
+    backend.foreground = window((1920, 0, 3840, 1080))
+    assert handler.get_fullscreen_states() == {1: True}
+    backend.foreground = window((100, 100, 900, 700))
+    assert handler.get_fullscreen_states() == {0: False}
+    # Maximized under the bar is not fullscreen
+    backend.foreground = window((1920, 22, 3840, 1080))
+    assert handler.get_fullscreen_states() == {1: False}
+
+
+def test_platform_flag_is_trusted_over_the_rectangle():
+    backend, _, handler = make_handler()
+    backend.foreground = window((0, 0, 1920, 1080), fullscreen=False)
+    assert handler.get_fullscreen_states() == {0: False}
+    backend.foreground = window((100, 100, 900, 700), fullscreen=True)
+    assert handler.get_fullscreen_states() == {0: True}
+
+
+def test_own_bars_are_ignored_and_the_desktop_shows_every_bar():
+    backend, _, handler = make_handler()
+    backend.foreground = window((1920, 0, 3840, 22), handle=2)
+    assert handler.get_fullscreen_states() == {}
+    backend.foreground = window((0, 0, 3840, 1080), class_name="Progman")
+    assert handler.get_fullscreen_states() == {0: False, 1: False}
+    backend.foreground = None
+    assert handler.get_fullscreen_states() == {}
+
+
+def test_video_on_one_monitor_stays_hidden_while_the_other_is_used():
+    backend, managers, handler = make_handler()
+    backend.foreground = window((1920, 0, 3840, 1080))
+    handler.monitor_fullscreen()
+    assert [m.visible for m in managers] == [True, False]
+    assert handler.is_fullscreen()
+
+    backend.foreground = window((100, 100, 900, 700))
+    handler.monitor_fullscreen()
+    assert [m.visible for m in managers] == [True, False]
+
+    backend.foreground = window((1920, 0, 3840, 1080), fullscreen=False)
+    handler.monitor_fullscreen()
+    assert [m.visible for m in managers] == [True, True]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# tests/test_ipc_server.py - Line framing and coalescing of the IPC endpoint
+import socket
+
+from handlers.ipc_client import IpcClient
+from handlers.ipc_server import IpcServer
+
+
+def make_connection(server):
+    """A connected socket pair, the server side registered like an accepted client"""
+    client, conn = socket.socketpair()
+    conn.setblocking(False)
+    server.buffers[conn] = b""
+    return client, conn
+
+
+def feed(server, client, conn, data):
+    client.sendall(data)
+    server._read(conn)
+
+
+def test_rest_of_an_overlong_line_is_not_a_command():
+    server = IpcServer(("127.0.0.1", 0), max_line=64)
+    client, conn = make_connection(server)
+
+    feed(server, client, conn, b"SET a " + b"x" * 100)
+    # The tail of the same line, which must not be read as "SET evil 1"
+    feed(server, client, conn, b"SET evil 1")
+    feed(server, client, conn, b"\nSET ok 1\n")
+    assert server.take_updates() == {"ok": "1"}
+    client.close()
+    conn.close()
+
+
+def test_overlong_line_within_one_read_is_skipped():
+    server = IpcServer(("127.0.0.1", 0), max_line=64)
+    client, conn = make_connection(server)
+
+    feed(server, client, conn, b"SET a " + b"x" * 100 + b"\nSET b 2\nSET c")
+    feed(server, client, conn, b" 3\n")
+    assert server.take_updates() == {"b": "2", "c": "3"}
+    client.close()
+    conn.close()
+
+
+def test_updates_are_coalesced_per_item_over_a_socket():
+    server = IpcServer(("127.0.0.1", 0))
+    server.start()
+    try:
+        client = IpcClient(server.address)
+        client.send_lines([f"SET build {i}" for i in range(100)] + ["SET other x", "DEL other"])
+        assert client.ping()
+        client.close()
+    finally:
+        server.stop()
+    assert server.take_updates() == {"build": "99", "other": None}
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# tests/test_keyboard_handler.py - Chord matching, stale keys and the hotkey table
+import json
+from types import SimpleNamespace
+
+from handlers.keyboard_handler import ChordMatcher, KeyboardHandler, load_hotkeys
+
+HOTKEYS = {"ctrl+alt+shift+q": "exit", "ctrl+alt+r": "refresh"}
+
+
+class Key:
+    def __init__(self, name):
+        self.name = name
+
+
+def make_matcher(**kwargs):
+    t = [0.0]
+    return ChordMatcher(HOTKEYS, clock=lambda: t[0], **kwargs), t
+
+
+def press_all(matcher, *names):
+    return [matcher.press(name) for name in names]
+
+
+def test_chord_fires_once_per_press():
+    matcher, _ = make_matcher()
+    assert press_all(matcher, "ctrl", "alt", "r") == [None, None, "refresh"]
+    # Auto-repeat of the held chord
+    assert matcher.press("r") is None
+    matcher.release("r")
+    assert matcher.press("r") == "refresh"
+
+
+def test_foreign_key_blocks_the_chord():
+    matcher, _ = make_matcher()
+    assert press_all(matcher, "ctrl", "alt", "x", "r") == [None, None, None, None]
+    matcher.release("x")
+    matcher.release("r")
+    assert matcher.press("r") == "refresh"
+
+
+def test_missed_release_goes_stale_after_max_hold():
+    matcher, t = make_matcher(max_hold=60.0)
+    # Ctrl and X pressed, then the lock screen swallowed both releases
+    press_all(matcher, "ctrl", "x")
+    t[0] = 30.0
+    assert press_all(matcher, "alt", "r") == [None, None]
+    for name in ("alt", "r"):
+        matcher.release(name)
+    t[0] = 120.0
+    assert press_all(matcher, "ctrl", "alt", "r") == [None, None, "refresh"]
+
+
+def test_more_keys_than_can_be_held_resets():
+    matcher, _ = make_matcher(max_keys=4)
+    press_all(matcher, "a", "b", "c", "d")
+    # A fifth key cannot be held together with the four stale ones
+    assert press_all(matcher, "ctrl", "alt", "r") == [None, None, "refresh"]
+
+
+def test_reset_request_is_applied_on_the_next_key_event():
+    calls = []
+    handler = KeyboardHandler({"exit": lambda: None, "refresh": lambda: calls.append("refresh")}, HOTKEYS)
+    # Stand-ins for pynput's Key and KeyCode
+    handler.keyboard = SimpleNamespace(Key=Key)
+    handler._on_press(Key("ctrl_l"))
+    handler._on_press(SimpleNamespace(vk=0x58, char="x"))
+    # Session locked, both releases lost
+    handler.request_reset()
+    handler._on_press(Key("ctrl_l"))
+    handler._on_press(Key("alt_l"))
+    handler._on_press(SimpleNamespace(vk=0x52, char="\x12"))
+    handler.dispatch_pending()
+    # Without the reset the stale X would block the chord
+    assert calls == ["refresh"]
+    assert list(handler.matcher.held) == ["ctrl", "alt", "r"]
+
+
+def test_actions_are_coalesced_and_run_on_dispatch():
+    calls = []
+    handler = KeyboardHandler({"exit": lambda: calls.append("exit"), "refresh": lambda: calls.append("refresh")}, HOTKEYS)
+    for action in ("refresh", "refresh", "exit"):
+        handler.post(action)
+    handler.dispatch_pending()
+    assert calls == ["refresh", "exit"]
+
+
+def test_no_default_hotkeys_and_file_overrides(tmp_path):
+    assert load_hotkeys(str(tmp_path / "missing.json")) == {}
+    path = tmp_path / "hotkeys.json"
+    path.write_text(json.dumps(HOTKEYS), encoding="utf-8")
+    assert load_hotkeys(str(path)) == HOTKEYS
+    path.write_text("[1, 2]", encoding="utf-8")
+    assert load_hotkeys(str(path)) == {}
+
+
+def test_no_listener_without_hotkeys():
+    handler = KeyboardHandler({"exit": lambda: None}, {})
+    assert not handler.start_listening()
+    assert not handler.is_listening()
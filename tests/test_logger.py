@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# tests/test_logger.py - Rate limiting and shutdown flushing of the log pipeline
+import logging
+
+from utils import logger as log
+
+
+def make_record(msg, *args):
+    return logging.LogRecord("taskbar.test", logging.ERROR, __file__, 1, msg, args, None)
+
+
+def test_repeats_are_counted_on_the_next_record_after_the_interval():
+    t = [0.0]
+    rate_filter = log.RateLimitFilter(interval=60.0, clock=lambda: t[0])
+
+    assert rate_filter.filter(make_record("Error: %s", "a"))
+    for _ in range(3):
+        t[0] += 1
+        assert not rate_filter.filter(make_record("Error: %s", "b"))
+
+    t[0] += 60
+    record = make_record("Error: %s", "c")
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "Error: c (repeated 3 times)"
+    assert rate_filter.flush() == []
+
+
+def test_flush_releases_counts_of_repeats_that_stopped():
+    t = [0.0]
+    rate_filter = log.RateLimitFilter(interval=60.0, clock=lambda: t[0])
+
+    rate_filter.filter(make_record("Error: %s", "a"))
+    rate_filter.filter(make_record("Other"))
+    for arg in ("b", "c"):
+        t[0] += 1
+        rate_filter.filter(make_record("Error: %s", arg))
+
+    records = rate_filter.flush()
+    assert [r.getMessage() for r in records] == ["Error: c (repeated 2 times)"]
+    # Released once only
+    assert rate_filter.flush() == []
+
+
+def test_shutdown_logs_pending_repeat_counts(tmp_path):
+    log.setup_logging(log_dir=str(tmp_path), interval=60.0)
+    try:
+        child = log.get_logger("test")
+        for i in range(4):
+            child.error("Sampling failed: %s", i)
+    finally:
+        log.shutdown_logging()
+
+    lines = [line for line in log.get_recent_logs() if "Sampling failed" in line]
+    assert lines[0].endswith("Sampling failed: 0")
+    assert lines[-1].endswith("Sampling failed: 3 (repeated 3 times)")
+    assert len(lines) == 2
+
+
+def test_dropped_records_keep_no_traceback_or_arguments():
+    t = [0.0]
+    rate_filter = log.RateLimitFilter(interval=60.0, clock=lambda: t[0])
+
+    def fail():
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            record = make_record("Failed: %s", e)
+            record.exc_info = (type(e), e, e.__traceback__)
+            return record
+
+    assert rate_filter.filter(fail())
+    t[0] += 1
+    dropped = fail()
+    assert not rate_filter.filter(dropped)
+    assert dropped.exc_info is None and dropped.args is None
+
+    [record] = rate_filter.flush()
+    assert record.getMessage() == "Failed: boom (repeated 1 times)"
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# tests/test_memory_health.py - A simulated week of the bar's real tick paths, and the leaks they guard against
+import tracemalloc
+from types import SimpleNamespace
+
+from system.activity import ActivityGovernor, FakeActivitySignals
+from system.backend import SpaceReserver
+from system.displays import MonitorInfo
+from system.memory_health import MemoryHealth, MB
+from system.window_probe import FakeWindowProbe
+from ui.taskbar import TaskbarUI
+from utils.color_adapter import ColorAdapter
+from utils.config import parse_config, DEFAULT_ITEMS
+from utils.workspace_manager import WorkspaceManager
+from tests.fakes import FakeCaptureBackend, FakeMenu, FakeRoot, FakeWidget, FakeWindow, install_fake_widgets
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+SAMPLE_INTERVAL = 300000  # The default "memory" job interval, 5 minutes
+SCREEN = MonitorInfo("primary", 0, 0, 1920, 1080, True)
+
+
+class FakeProcess:
+    def __init__(self, rss):
+        """psutil.Process stand-in, `rss` is called for each reading"""
+        self.rss = rss
+
+    def memory_info(self):
+        return SimpleNamespace(rss=self.rss())
+
+
+def make_status(minute):
+    return {
+        "time_info": {"time": f"{minute // 60 % 24:02d}:{minute % 60:02d}", "date": f"{minute // 1440 + 1}日"},
+        "clash": "Clash ON" if minute % 7 else "Clash OFF",
+        "clash_text": "Clash",
+        "input": "中" if minute % 3 else "英",
+        "volume": f"{minute % 101}%",
+        "power": f"{100 - minute % 90}%",
+        "countdown": f"{minute % 15} 分钟后: 例会" if minute % 60 > 45 else None,
+    }
+
+
+def run_week(monkeypatch, app_count=100):
+    """Run the bar's tick paths through the governor for a week of scripted time
+
+    Every job runs the real code, on fake widgets and a fake screen: color
+    sampling, status updates, foreground checks with their lazy captures,
+    fader frames and the system menu. The user comes back to one editor
+    every other switch and goes through `app_count` other applications in
+    between, each with its own color. The memory health samples read
+    traced memory as RSS.
+
+    Returns:
+        tuple: (MemoryHealth, FakeWindow, ColorAdapter)
+    """
+    install_fake_widgets(monkeypatch)
+    root = FakeWindow()
+    backend = FakeCaptureBackend(record=False)
+    probe = FakeWindowProbe(desktop=False)
+    taskbar = TaskbarUI(root, system_monitor=None, config=parse_config({}))
+    adapter = ColorAdapter(root, 22, monitor=SCREEN, window_probe=probe, backend=backend)
+    adapter.fader.clock = root.clock
+    adapter.app_memory.clock = root.clock
+    adapter.add_ui_elements(list(taskbar.items.values()))
+    health = MemoryHealth(root, clock=root.clock, process=FakeProcess(lambda: tracemalloc.get_traced_memory()[0]))
+
+    switches = [0]
+
+    def switch_app():
+        # Back to the editor every other switch, so the color memory both hits and misses
+        switches[0] += 1
+        app = 0 if switches[0] % 2 else switches[0] // 2 % app_count
+        probe.foreground = (f"Window{app}", f"app{app}.exe")
+        backend.default = (app * 37 % 256, app * 91 % 256, app * 53 % 256)
+
+    # Minutes where the app ticks every second, a week of those would take minutes to run
+    governor = ActivityGovernor(root, FakeActivitySignals(), check_interval=HOUR * 1000)
+    governor.add_job("switch", switch_app, 600000)
+    governor.add_job("foreground", adapter.check_foreground, 60000)
+    governor.add_job("colors", adapter.update_colors, 300000)
+    governor.add_job("status", lambda: taskbar.apply_status(make_status(int(root.now) // 60)), 300000)
+    governor.add_job("menu", lambda: taskbar.open_system_menu(SimpleNamespace(x_root=0, y_root=0)), HOUR * 1000)
+    # Hourly samples keep the whole week in the history
+    governor.add_job("memory", health.sample, HOUR * 1000)
+    governor.start()
+    root.advance(WEEK)
+    return health, root, adapter
+
+
+def test_a_week_of_real_ticks_stays_flat(monkeypatch):
+    tracing = tracemalloc.is_tracing()
+    tracemalloc.start()
+    try:
+        health, root, adapter = run_week(monkeypatch)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    assert len(health.history) == 7 * 24 + 1
+    assert health.history[-1].time == WEEK
+    # Caches and histories fill on the first day, then traced memory stays put
+    first_day, last = health.history[24], health.history[-1]
+    assert last.rss - first_day.rss < 64 * 1024
+    assert health.warnings == []
+    # The bar items and the system menu, with no labels or menus piling up
+    assert {s.widgets for s in health.history} == {len(DEFAULT_ITEMS) + 1}
+    assert len(root.children) == len(DEFAULT_ITEMS) + 1
+    # The other five jobs and the activity check, plus at most a lazy capture and a fade frame
+    assert max(s.after_jobs for s in health.history) <= 8
+    assert adapter.app_memory.hits > 0
+    assert len(adapter.app_memory.entries) <= adapter.app_memory.max_entries
+    assert len(adapter.fader.gradients) <= adapter.fader.cache_size
+
+
+def run_samples(seconds, rss_at, on_sample=None):
+    """Drive MemoryHealth through the governor with a scripted RSS"""
+    root = FakeRoot()
+    frame = FakeWidget(root)
+    for _ in range(12):
+        FakeWidget(frame)
+    health = MemoryHealth(root, clock=root.clock, process=FakeProcess(lambda: rss_at(root.now)))
+
+    def sample():
+        if on_sample:
+            on_sample(frame)
+        health.sample()
+
+    governor = ActivityGovernor(root, FakeActivitySignals(), check_interval=HOUR * 1000)
+    governor.add_job("memory", sample, SAMPLE_INTERVAL)
+    governor.start()
+    root.advance(seconds)
+    return health
+
+
+def test_steady_rss_growth_is_reported_at_its_rate():
+    health = run_samples(DAY, lambda now: 80 * MB + 3 * MB * now / HOUR)
+
+    assert len(health.history) == 288
+    assert health.warnings == ["RSS growing 3.0 MB/hour"]
+    report = health.get_report()
+    assert report[0] == f"RSS {80 + 3 * 24:.1f} MB"
+    assert report[-1] == "RSS growing 3.0 MB/hour"
+
+
+def test_no_trend_before_an_hour_of_history():
+    health = run_samples(50 * 60, lambda now: 80 * MB + 30 * MB * now / HOUR)
+    assert len(health.history) == 11
+    assert health.warnings == []
+
+
+def test_widget_leak_is_reported():
+    # One label leaked per 5-minute sample, 12 an hour
+    health = run_samples(2 * HOUR, lambda now: 80 * MB, lambda frame: FakeWidget(frame))
+    assert health.warnings == ["widget count growing 12.0/hour"]
+
+
+class CountingReserver(SpaceReserver):
+    needs_checks = True
+
+    def __init__(self):
+        self.calls = []
+
+    def reserve(self):
+        self.calls.append("reserve")
+
+    def check(self):
+        self.calls.append("check")
+
+    def suspend(self):
+        self.calls.append("suspend")
+
+
+class FakeBackend:
+    def __init__(self):
+        self.reserver = CountingReserver()
+
+    def setup_bar_window(self, window):
+        pass
+
+    def raise_bar_window(self, window):
+        pass
+
+    def create_space_reserver(self, window, monitor, height, manages_work_area):
+        return self.reserver
+
+
+def test_hide_show_cycles_leave_no_timers_behind():
+    window = FakeWindow()
+    backend = FakeBackend()
+    manager = WorkspaceManager(22, MonitorInfo("primary", 0, 0, 1920, 1080, True), backend)
+    manager.set_root(window)
+    health = MemoryHealth(window, clock=window.clock, process=FakeProcess(lambda: 80 * MB))
+
+    for _ in range(100):
+        manager.hide()
+        manager.show()
+        manager.check_work_area()
+    window.advance(HOUR)
+
+    # The periodic check is a governor job now, the manager owns no `after` chain
+    assert health.count_after_jobs() == 0
+    assert backend.reserver.calls.count("reserve") == 101
+    assert backend.reserver.calls.count("check") == 100
+
+
+def test_system_menu_is_built_once_and_reposted(monkeypatch):
+    install_fake_widgets(monkeypatch)
+    root = FakeWindow()
+    taskbar = TaskbarUI(root, system_monitor=None, config=parse_config({}))
+
+    for i in range(50):
+        taskbar.open_system_menu(SimpleNamespace(x_root=i, y_root=0))
+
+    menus = [child for child in root.children if isinstance(child, FakeMenu)]
+    assert menus == [taskbar.system_menu]
+    assert taskbar.system_menu.posts == 50
+    assert taskbar.system_menu.entries[-1] == "退出"
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# tests/test_stall_watchdog.py - Stall detection against a scripted event loop
+import threading
+
+from system.stall_watchdog import StallWatchdog
+from tests.fakes import FakeRoot
+
+
+def test_pause_stops_the_heartbeat_and_the_checks():
+    root = FakeRoot()
+    watchdog = StallWatchdog(root, interval=100, threshold=0.25, clock=root.clock)
+    watchdog.resume()
+    root.advance(1)
+    assert len(root.jobs) == 1
+
+    watchdog.pause()
+    assert root.jobs == {}
+    root.now += 10
+    assert not watchdog.check(root.now, 0.0)
+
+    watchdog.resume()
+    root.advance(1)
+    assert not watchdog.check(root.now, 0.0)
+    assert watchdog.get_events() == []
+
+
+def test_slower_heartbeat_is_not_a_stall():
+    root = FakeRoot()
+    watchdog = StallWatchdog(root, interval=100, threshold=0.25, clock=root.clock)
+    watchdog.resume()
+    watchdog.set_interval(500)
+    for _ in range(20):
+        root.advance(0.05)
+        assert not watchdog.check(root.now, 0.0)
+    assert watchdog.get_events() == []
+
+
+def block_event_loop(entered, release):
+    entered.set()
+    release.wait(5)
+
+
+def test_stall_is_reported_with_the_blocking_function():
+    root = FakeRoot()
+    watchdog = StallWatchdog(root, interval=100, threshold=0.25, clock=root.clock)
+    watchdog.resume()
+    root.advance(0.5)
+
+    # Stands in for the Tk thread: while it blocks, no heartbeat runs
+    entered, release = threading.Event(), threading.Event()
+    blocker = threading.Thread(target=block_event_loop, args=(entered, release))
+    blocker.start()
+    try:
+        assert entered.wait(5)
+        watchdog.main_thread_id = blocker.ident
+        root.now += 0.2
+        assert not watchdog.check(root.now, 0.0)
+        root.now += 0.2
+        assert watchdog.check(root.now, 0.0)
+        assert not watchdog.check(root.now, 0.0)  # One sample per stall
+    finally:
+        release.set()
+        blocker.join()
+
+    root.advance(0.1)
+    [event] = watchdog.get_events()
+    # Innermost frames are inside threading, the blocking call sits just above them
+    blocking = [line for line in event.stack if "in block_event_loop" in line]
+    assert len(blocking) == 1 and "release.wait(5)" in blocking[0]
+    assert abs(event.duration - 0.3) < 1e-6  # Heartbeat was due at 0.6 s, ran at 0.9 s
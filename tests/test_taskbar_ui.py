@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# tests/test_taskbar_ui.py - Hot reload patching of the bar widgets
+import pytest
+
+from ui.taskbar import TaskbarUI
+from utils.config import parse_config, DEFAULT_ITEMS
+from tests.fakes import FakeRoot, install_fake_widgets
+
+
+@pytest.fixture
+def make_taskbar(monkeypatch):
+    install_fake_widgets(monkeypatch)
+
+    def make(items=None):
+        root = FakeRoot()
+        taskbar = TaskbarUI(root, system_monitor=None, config=parse_config(config_with(items)))
+        return root, taskbar
+
+    return make
+
+
+def config_with(items=None, **changes):
+    """Config data for `items` (the defaults if None), with some items' settings replaced"""
+    items = [dict(item) for item in (DEFAULT_ITEMS if items is None else items)]
+    for item in items:
+        item.update(changes.get(item["id"], {}))
+    return {"items": items}
+
+
+def packed_ids(root, taskbar):
+    ids = {widget: item_id for item_id, widget in taskbar.items.items()}
+    return [ids[widget] for widget in root.pack_slaves()]
+
+
+def test_every_item_is_packed_in_config_order(make_taskbar):
+    root, taskbar = make_taskbar()
+    assert packed_ids(root, taskbar) == [item["id"] for item in DEFAULT_ITEMS]
+
+
+def test_changed_text_and_font_are_configured_in_place(make_taskbar):
+    root, taskbar = make_taskbar()
+    files, time_label = taskbar.items["files"], taskbar.items["time"]
+    packed = list(root.pack_slaves())
+
+    added, removed = taskbar.apply_config(parse_config(config_with(
+        files={"text": "文档"}, time={"font": ["Consolas", 12]}
+    )))
+    assert (added, removed) == ([], [])
+    assert taskbar.items["files"] is files and files.cget("text") == "文档"
+    assert time_label.cget("font") == ("Consolas", 12)
+    # No repack for changes that keep the layout
+    assert root.pack_slaves() == packed
+
+
+@pytest.mark.parametrize("changes", [
+    {"date": {"source": "power"}},
+    {"files": {"menu": "system"}},
+    {"files": {"type": "status", "source": "time"}},
+])
+def test_recreated_items_are_packed_in_their_place(make_taskbar, changes):
+    root, taskbar = make_taskbar()
+    [item_id] = changes
+    old = taskbar.items[item_id]
+
+    added, removed = taskbar.apply_config(parse_config(config_with(**changes)))
+    new = taskbar.items[item_id]
+    assert removed == [old] and added == [new]
+    assert old.destroyed and new.packed
+    assert packed_ids(root, taskbar) == [item["id"] for item in DEFAULT_ITEMS]
+
+
+def test_recreated_status_label_joins_its_new_source(make_taskbar):
+    root, taskbar = make_taskbar()
+    taskbar.set_status_text("power", "80%")
+    taskbar.apply_config(parse_config(config_with(date={"source": "power"})))
+
+    label = taskbar.items["date"]
+    assert label.cget("text") == "80%"
+    assert label in taskbar.status_labels["power"]
+    assert len(taskbar.status_labels["date"]) == 0
+
+
+def test_added_and_removed_items(make_taskbar):
+    root, taskbar = make_taskbar()
+    items = [item for item in DEFAULT_ITEMS if item["id"] != "music"]
+    items.insert(2, {"id": "notes", "type": "launcher", "text": "笔记", "path": "C:\\"})
+    music = taskbar.items["music"]
+
+    added, removed = taskbar.apply_config(parse_config(config_with(items)))
+    assert removed == [music] and music.destroyed and not music.packed
+    assert added == [taskbar.items["notes"]] and added[0].packed
+    assert "music" not in taskbar.items
+    assert packed_ids(root, taskbar) == [item["id"] for item in items]
+    assert len(root.children) == len(items)
+
+
+def test_reorder_and_side_changes_repack_without_new_widgets(make_taskbar):
+    root, taskbar = make_taskbar()
+    widgets = dict(taskbar.items)
+    items = list(reversed(DEFAULT_ITEMS))
+
+    assert taskbar.apply_config(parse_config(config_with(items, edge={"side": "right", "padx": 4}))) == ([], [])
+    assert taskbar.items == widgets
+    assert packed_ids(root, taskbar) == [item["id"] for item in items]
+    assert widgets["edge"].pack_options == {"side": "right", "padx": 4}
+
+
+def test_style_change_rebuilds_every_item(make_taskbar):
+    root, taskbar = make_taskbar()
+    old = dict(taskbar.items)
+    added, removed = taskbar.apply_config(parse_config(dict(config_with(), foreground="white")))
+    assert sorted(map(id, removed)) == sorted(map(id, old.values()))
+    assert all(widget.destroyed for widget in old.values())
+    assert all(widget.packed for widget in taskbar.items.values())
+    assert len(root.pack_slaves()) == len(DEFAULT_ITEMS)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# tests/test_wallpaper_cache.py - Wallpaper placement mapping and cache invalidation
+import os
+
+from PIL import Image
+
+from system.window_probe import STYLE_FILL, STYLE_STRETCH, STYLE_CENTER, STYLE_OTHER
+from utils.wallpaper_cache import WallpaperColorCache, get_source_row
+
+
+def mean_color(row):
+    return tuple(int(c) for c in row.mean(axis=0).round())
+
+
+def test_stretch_scales_each_axis_on_its_own():
+    # 1000x500 image on a 2000x1000 monitor: half scale both ways
+    assert get_source_row(STYLE_STRETCH, 1000, 500, 2000, 1000, 10) == (0.0, 5, 1000.0)
+    # 1000x1000 image on 2000x500: rows are squeezed 2:1
+    assert get_source_row(STYLE_STRETCH, 1000, 1000, 2000, 500, 10) == (0.0, 20, 1000.0)
+
+
+def test_fill_covers_the_monitor_and_crops_the_overflow():
+    # 4:3 image on a 16:9 monitor: scaled to width, top and bottom cropped
+    left, source_y, right = get_source_row(STYLE_FILL, 1600, 1200, 1920, 1080, 10)
+    assert (left, right) == (0.0, 1600.0)
+    # 1200 * 1.2 = 1440 rows shown as 1080, 180 cropped off the top, then back to image scale
+    assert source_y == int((10 + 180) / 1.2)
+
+    # Ultra-wide image: scaled to height, left and right cropped equally
+    left, source_y, right = get_source_row(STYLE_FILL, 4000, 1000, 1920, 1080, 0)
+    scale = 1080 / 1000
+    assert source_y == 0
+    assert abs(left - (4000 * scale - 1920) / 2 / scale) < 1e-9
+    assert abs((right - left) - 1920 / scale) < 1e-9
+
+
+def test_center_is_unscaled_and_gives_up_on_a_border():
+    # Larger image: the middle 1920 columns, rows offset by half the overflow
+    assert get_source_row(STYLE_CENTER, 2920, 2080, 1920, 1080, 10) == (500.0, 510, 2420.0)
+    # Narrower image leaves the background color at the sides
+    assert get_source_row(STYLE_CENTER, 1000, 2000, 1920, 1080, 10) is None
+    # Shorter image: the top rows show the background color
+    assert get_source_row(STYLE_CENTER, 1920, 800, 1920, 1080, 10) is None
+
+
+def make_wallpaper(path, size, top, bottom):
+    """Image with `top` color in the upper half and `bottom` below"""
+    img = Image.new("RGB", size, bottom)
+    img.paste(Image.new("RGB", (size[0], size[1] // 2), top), (0, 0))
+    img.save(path)
+    return str(path)
+
+
+def test_colors_follow_the_style_mapping(tmp_path):
+    red, blue = (200, 0, 0), (0, 0, 200)
+    # Tall image: fill crops to the middle rows, stretch shows the top half
+    path = make_wallpaper(tmp_path / "tall.png", (100, 400), red, blue)
+    cache = WallpaperColorCache(mean_color)
+    geometry = [(200, 100, 5)]
+    assert cache.get_colors(path, STYLE_STRETCH, geometry) == [red]
+    # Fill scales 100x400 to 200x800 and keeps rows 350-450, the sample is at 355 of 800
+    assert cache.get_colors(path, STYLE_FILL, geometry) == [red]
+    assert cache.get_colors(path, STYLE_FILL, [(200, 100, 60)]) == [blue]
+    assert cache.get_colors(path, STYLE_CENTER, geometry) == [None]
+    assert cache.get_colors(path, STYLE_OTHER, geometry) is None
+
+
+def test_cache_is_invalidated_by_path_mtime_style_and_geometry(tmp_path):
+    red, green = (200, 0, 0), (0, 200, 0)
+    first = make_wallpaper(tmp_path / "a.png", (64, 64), red, red)
+    second = make_wallpaper(tmp_path / "b.png", (64, 64), green, green)
+    cache = WallpaperColorCache(mean_color, max_entries=8)
+    geometry = [(64, 64, 2)]
+
+    assert cache.get_colors(first, STYLE_FILL, geometry) == [red]
+    assert cache.get_colors(first, STYLE_FILL, geometry) == [red]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Same file rewritten: a new mtime means a new entry
+    make_wallpaper(tmp_path / "a.png", (64, 64), green, green)
+    stat = os.stat(first)
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get_colors(first, STYLE_FILL, geometry) == [green]
+    assert cache.misses == 2
+
+    assert cache.get_colors(first, STYLE_STRETCH, geometry) == [green]
+    assert cache.get_colors(second, STYLE_STRETCH, geometry) == [green]
+    assert cache.get_colors(second, STYLE_STRETCH, [(32, 64, 2)]) == [green]
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_cache_keeps_only_the_most_recent_entries(tmp_path):
+    path = make_wallpaper(tmp_path / "a.png", (32, 32), (9, 9, 9), (9, 9, 9))
+    cache = WallpaperColorCache(mean_color, max_entries=2)
+    for width in (10, 20, 30):
+        cache.get_colors(path, STYLE_FILL, [(width, 32, 0)])
+    assert len(cache.entries) == 2
+    cache.get_colors(path, STYLE_FILL, [(10, 32, 0)])
+    assert cache.misses == 4
+
+
+def test_unreadable_wallpaper_is_not_decoded_again(tmp_path, monkeypatch):
+    path = tmp_path / "broken.jpg"
+    path.write_bytes(b"not an image")
+    cache = WallpaperColorCache(mean_color)
+    opened = []
+    real_open = Image.open
+    monkeypatch.setattr(Image, "open", lambda *args: opened.append(args) or real_open(*args))
+
+    for _ in range(3):
+        assert cache.get_colors(str(path), STYLE_FILL, [(64, 64, 2)]) is None
+    assert len(opened) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # A fixed file has a new mtime and is read again
+    make_wallpaper(path, (64, 64), (200, 0, 0), (200, 0, 0))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    monkeypatch.setattr(Image, "open", real_open)
+    assert cache.get_colors(str(path), STYLE_FILL, [(64, 64, 2)]) == [(200, 0, 0)]
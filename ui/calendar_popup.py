@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# ui/calendar_popup.py - Month view and upcoming events dropped down from the date label
+import tkinter as tk
+import calendar
+from datetime import datetime, date
+
+WEEKDAY_NAMES = ["一", "二", "三", "四", "五", "六", "日"]
+
+
+class CalendarPopup:
+    def __init__(self, root, calendar_store, font, font_small, agenda_size=5):
+        """Initialize the calendar dropdown
+
+        Args:
+            root: Tkinter window the dropdown belongs to
+            calendar_store: CalendarStore providing events
+            font: Font for the month header
+            font_small: Font for days and events
+            agenda_size: Number of upcoming events listed
+        """
+        self.root = root
+        self.calendar_store = calendar_store
+        self.font = font
+        self.font_small = font_small
+        self.agenda_size = agenda_size
+        self.window = None
+
+    def toggle(self, event=None):
+        """Open the dropdown under the clicked widget, or close it"""
+        if self.window is not None:
+            self.hide()
+            return
+        widget = event.widget if event else self.root
+        self.show(widget.winfo_rootx(), widget.winfo_rooty() + widget.winfo_height())
+
+    def show(self, x, y):
+        self.window = tk.Toplevel(self.root)
+        self.window.overrideredirect(True)
+        self.window.attributes("-topmost", True)
+        self.window.configure(bg="#F8F8F8", padx=12, pady=8)
+        self.window.bind("<Escape>", lambda e: self.hide())
+
+        today = datetime.now().date()
+        self.build_month(today)
+        self.build_agenda()
+
+        self.window.update_idletasks()
+        # Keep the dropdown on the bar's monitor
+        x = min(x, self.root.winfo_rootx() + self.root.winfo_width() - self.window.winfo_reqwidth())
+        self.window.geometry(f"+{x}+{y}")
+        self.window.focus_force()
+
+    def hide(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def build_month(self, today):
+        frame = tk.Frame(self.window, bg="#F8F8F8")
+        frame.pack(fill="x")
+
+        tk.Label(frame, text=f"{today.year}年{today.month}月", font=self.font, bg="#F8F8F8").grid(
+            row=0, column=0, columnspan=7, pady=(0, 4)
+        )
+        for column, name in enumerate(WEEKDAY_NAMES):
+            tk.Label(frame, text=name, font=self.font_small, fg="gray", bg="#F8F8F8", width=3).grid(
+                row=1, column=column
+            )
+
+        for row, week in enumerate(calendar.monthcalendar(today.year, today.month), start=2):
+            for column, day in enumerate(week):
+                if not day:
+                    continue
+                current = date(today.year, today.month, day)
+                # Underline days that have events
+                font = self.font_small + ("underline",) if self.calendar_store.has_events(current) else self.font_small
+                if current == today:
+                    label = tk.Label(frame, text=day, font=font, fg="white", bg="#0A64D2", width=3)
+                else:
+                    label = tk.Label(frame, text=day, font=font, bg="#F8F8F8", width=3)
+                label.grid(row=row, column=column, pady=1)
+
+    def build_agenda(self):
+        events = self.calendar_store.next_events(self.agenda_size)
+        tk.Frame(self.window, height=1, bg="#DDDDDD").pack(fill="x", pady=6)
+        if not events:
+            tk.Label(self.window, text="暂无日程", font=self.font_small, fg="gray", bg="#F8F8F8").pack(anchor="w")
+            return
+        for event in events:
+            when = f"{event.start:%m-%d}" if event.all_day else f"{event.start:%m-%d %H:%M}"
+            tk.Label(
+                self.window, text=f"{when}  {event.summary}", font=self.font_small,
+                bg="#F8F8F8", anchor="w", justify="left"
+            ).pack(anchor="w")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# ui/stall_popup.py - Recorded event-loop stalls, opened from the system menu
+import tkinter as tk
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class StallPopup:
+    def __init__(self, root, stall_watchdog, font, font_small):
+        """Initialize the stall list
+
+        Args:
+            root: Tkinter window the popup belongs to
+            stall_watchdog: StallWatchdog providing the recorded stalls
+            font: Font for the header
+            font_small: Font for the stall lines
+        """
+        self.root = root
+        self.stall_watchdog = stall_watchdog
+        self.font = font
+        self.font_small = font_small
+        self.window = None
+
+    def toggle(self, event=None):
+        """Open the list under the bar's left edge, or close it"""
+        if self.window is not None:
+            self.hide()
+            return
+        self.show(self.root.winfo_rootx() + 16, self.root.winfo_rooty() + self.root.winfo_height())
+
+    def show(self, x, y):
+        self.window = tk.Toplevel(self.root)
+        self.window.overrideredirect(True)
+        self.window.attributes("-topmost", True)
+        self.window.configure(bg="#F8F8F8", padx=12, pady=8)
+        self.window.bind("<Escape>", lambda e: self.hide())
+
+        tk.Label(self.window, text="卡顿记录", font=self.font, bg="#F8F8F8").pack(anchor="w")
+        tk.Frame(self.window, height=1, bg="#DDDDDD").pack(fill="x", pady=6)
+        for line in self.stall_watchdog.get_report():
+            tk.Label(
+                self.window, text=line, font=self.font_small, bg="#F8F8F8", anchor="w", justify="left"
+            ).pack(anchor="w")
+
+        tk.Frame(self.window, height=1, bg="#DDDDDD").pack(fill="x", pady=6)
+        buttons = tk.Frame(self.window, bg="#F8F8F8")
+        buttons.pack(fill="x")
+        self.status = tk.Label(buttons, font=self.font_small, fg="gray", bg="#F8F8F8")
+        self.status.pack(side="left")
+        for text, command in (("关闭", self.hide), ("保存", self.dump)):
+            button = tk.Label(buttons, text=text, font=self.font_small, bg="#F8F8F8", cursor="hand2")
+            button.pack(side="right", padx=(8, 0))
+            button.bind("<Button-1>", lambda e, command=command: command())
+
+        self.window.geometry(f"+{x}+{y}")
+        self.window.focus_force()
+
+    def hide(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def dump(self):
+        """Save every stall with its full stack and show where it went"""
+        try:
+            path = self.stall_watchdog.dump()
+        except OSError as e:
+            logger.error("Error saving stalls: %s", e)
+            self.status.config(text="保存失败")
+            return
+        self.status.config(text=path)
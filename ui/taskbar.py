@@ -1,138 +1,337 @@
 #!/usr/bin/env python3
 # ui/taskbar.py - TaskbarUI component handling all UI elements
 import tkinter as tk
-import os
-import webbrowser
+
+from ui.calendar_popup import CalendarPopup
+from ui.stall_popup import StallPopup
+from system.backend import get_backend
+from utils.config import parse_config, diff_items
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 class TaskbarUI:
-    def __init__(self, root, system_monitor):
+    def __init__(self, root, system_monitor, calendar_store=None, config=None, stall_watchdog=None):
+        """Bar widgets built from the declarative config
+
+        Args:
+            root: Window hosting the bar
+            system_monitor: SystemMonitor shared by every bar
+            calendar_store: CalendarStore for the date popup, None to disable it
+            config: TaskbarConfig, built-in defaults if None
+            stall_watchdog: StallWatchdog listed from the system menu, None to hide the entry
+        """
         self.root = root
         self.system_monitor = system_monitor
+        self.calendar_store = calendar_store
+        self.stall_watchdog = stall_watchdog
         
-        # Default style settings
-        self.DEFAULT_FONT = ("Microsoft YaHei", 14, "bold")
-        self.DEFAULT_FONT_SMALL = ("Microsoft YaHei", 13, "bold")
-        self.DEFAULT_FG = "black"
-        self.DEFAULT_BG = "#F8F8F8"
         self.DEFAULT_CURSOR = "hand2"
         
         # Special color flags
         self.is_clash_on = False
         
+        # Config items, id -> widget, and status labels by source
+        self.config = None
+        self.items = {}
+        self.item_configs = {}
+        self.status_labels = {}
+        self.last_texts = {}  # Status source -> last text, so new labels start filled in
+        
+        # Labels created by external tools over IPC, id -> label
+        self.custom_items = {}
+        
+        self.calendar_popup = None
+        self.stall_popup = None
+        self.system_menu = None
+        self.clash_menu = None
+        self.clash_group_menus = {}  # Proxy group -> reused submenu
+        self.clash_mode = tk.StringVar(self.root)
+        
         # Set up all UI elements
-        self.setup_ui()
+        self.setup_ui(config or parse_config({}))
         
-    def setup_ui(self):
+    def setup_ui(self, config):
         """Set up all UI labels and buttons"""
-        # Time label
-        self.label_time = tk.Label(self.root, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
-        self.label_time.pack(side="right", padx=16)
+        self.apply_config(config)
+    
+    def apply_style(self, config):
+        self.DEFAULT_FONT = config.font
+        self.DEFAULT_FONT_SMALL = config.font_small
+        self.DEFAULT_FG = config.foreground
+        self.DEFAULT_BG = config.background
+        for label in self.custom_items.values():
+            label.config(font=self.DEFAULT_FONT)
+        # Menus and the popup are rebuilt lazily with the new fonts
+        for menu in [self.system_menu, self.clash_menu] + list(self.clash_group_menus.values()):
+            if menu is not None:
+                menu.destroy()
+        self.system_menu = self.clash_menu = None
+        self.clash_group_menus = {}
+        if self.calendar_popup is not None:
+            self.calendar_popup.hide()
+            self.calendar_popup = None
+        if self.calendar_store is not None:
+            self.calendar_popup = CalendarPopup(self.root, self.calendar_store, self.DEFAULT_FONT, self.DEFAULT_FONT_SMALL)
+        if self.stall_popup is not None:
+            self.stall_popup.hide()
+            self.stall_popup = None
+        if self.stall_watchdog is not None:
+            self.stall_popup = StallPopup(self.root, self.stall_watchdog, self.DEFAULT_FONT, self.DEFAULT_FONT_SMALL)
+    
+    def apply_config(self, config):
+        """Patch the bar to match a config, touching only what changed
+        
+        Removed items are destroyed and added ones created. Items whose
+        type, source or menu changed are recreated, other changes are
+        configured in place. Widgets are repacked only when the layout
+        changed, and a style change rebuilds every item.
         
-        # Date label
-        self.label_date = tk.Label(self.root, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
-        self.label_date.pack(side="right", padx=8)
+        Args:
+            config: TaskbarConfig
+            
+        Returns:
+            tuple: (added widgets, removed widgets) for color registration
+        """
+        old_config = self.config
+        self.config = config
+        if old_config is None or old_config.style() != config.style():
+            self.apply_style(config)
+            old_items = []
+            removed = list(self.items)
+        else:
+            old_items = old_config.items
+            removed = []
         
-        # Power label
-        self.label_power = tk.Label(self.root, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
-        self.label_power.pack(side="right", padx=8)
+        added, dropped, changed, order_changed = diff_items(old_items, config.items)
+        removed.extend(dropped)
+        new_configs = {item.id: item for item in config.items}
+        relayout = bool(added or removed or order_changed)
+        for item_id in changed:
+            old, new = self.item_configs[item_id], new_configs[item_id]
+            if (old.type, old.source, old.menu) != (new.type, new.source, new.menu):
+                # The new widget is packed by the relayout below
+                removed.append(item_id)
+                added.append(item_id)
+                relayout = True
+                continue
+            if (old.side, old.padx) != (new.side, new.padx):
+                relayout = True
+            widget = self.items[item_id]
+            if old.font != new.font:
+                widget.config(font=new.font or self.DEFAULT_FONT)
+            if new.type == "launcher" and old.text != new.text:
+                widget.config(text=new.text)
+            self.item_configs[item_id] = new
         
-        # Volume label
-        self.label_volume = tk.Label(self.root, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
-        self.label_volume.pack(side="right", padx=8)
+        removed_widgets = [self.destroy_item(item_id) for item_id in removed]
+        added_widgets = [self.create_item(new_configs[item_id]) for item_id in added]
         
-        # Input method label
-        self.label_input = tk.Label(self.root, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
-        self.label_input.pack(side="right", padx=8)
-
-        # Clash status label
-        self.label_clash = tk.Label(self.root, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
-        self.label_clash.pack(side="right", padx=8)
-        
-        # Tic brand
-        self.button_tic = tk.Label(self.root, text="江麦里   |", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        # self.button_tic = tk.Label(self.root, text=" ", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_tic.pack(side="left", padx=16)
-        self.button_tic.bind("<Button-1>", self.open_folder_computer)
-        self.button_tic.bind("<Button-3>", self.open_system_menu)
-        
-        # Files button
-        self.button_files = tk.Label(self.root, text="文件", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_files.pack(side="left", padx=8)
-        self.button_files.bind("<Button-1>", self.open_folder_d6)
-        
-        # Apps button
-        self.button_apps = tk.Label(self.root, text="应用", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_apps.pack(side="left", padx=8)
-        self.button_apps.bind("<Button-1>", self.open_folder_list)
-        
-        # Terminal button
-        self.button_terminal = tk.Label(self.root, text="终端", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_terminal.pack(side="left", padx=8)
-        self.button_terminal.bind("<Button-1>", self.open_folder_terminal)
-        
-        # Music button
-        self.button_music = tk.Label(self.root, text="音乐", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_music.pack(side="left", padx=8)
-        self.button_music.bind("<Button-1>", self.open_folder_music)
-        
-        # Draft button
-        self.button_draft = tk.Label(self.root, text="草稿", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_draft.pack(side="left", padx=8)
-        self.button_draft.bind("<Button-1>", self.open_folder_onenote)
-        
-        # Plan button
-        self.button_plan = tk.Label(self.root, text="计划", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_plan.pack(side="left", padx=8)
-        self.button_plan.bind("<Button-1>", self.open_folder_todo)
-
-        # Edge button
-        self.button_edge = tk.Label(self.root, text="互联", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_edge.pack(side="left", padx=8)
-        self.button_edge.bind("<Button-1>", self.open_folder_edge)
+        if relayout:
+            self.pack_items()
+        return added_widgets, removed_widgets
+    
+    def create_item(self, item):
+        """Create the widget for one config item, packed later by pack_items"""
+        label = tk.Label(
+            self.root, text=item.text or "", font=item.font or self.DEFAULT_FONT,
+            fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w"
+        )
+        if item.type == "launcher":
+            label.config(cursor=self.DEFAULT_CURSOR)
+            label.bind("<Button-1>", lambda e, item_id=item.id: self.launch(item_id))
+        else:
+            self.status_labels.setdefault(item.source, []).append(label)
+            if item.source in self.last_texts:
+                label.config(text=self.last_texts[item.source])
+            self.bind_status_label(label, item.source)
+        if item.menu == "system":
+            label.bind("<Button-3>", self.open_system_menu)
         
-        # VSCode button
-        self.button_vscode = tk.Label(self.root, text="VSCode", font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, cursor=self.DEFAULT_CURSOR)
-        self.button_vscode.pack(side="left", padx=8)
-        self.button_vscode.bind("<Button-1>", self.open_folder_vscode)
+        self.items[item.id] = label
+        self.item_configs[item.id] = item
+        return label
+    
+    def bind_status_label(self, label, source):
+        if source == "date" and self.calendar_popup is not None:
+            label.config(cursor=self.DEFAULT_CURSOR)
+            label.bind("<Button-1>", self.calendar_popup.toggle)
+        elif source == "volume":
+            label.config(cursor=self.DEFAULT_CURSOR)
+            label.bind("<MouseWheel>", self.scroll_volume)
+            label.bind("<Button-4>", self.scroll_volume)  # X11 wheel up
+            label.bind("<Button-5>", self.scroll_volume)  # X11 wheel down
+            label.bind("<Button-1>", self.toggle_mute)
+        elif source == "clash":
+            label.config(cursor=self.DEFAULT_CURSOR)
+            label.bind("<Button-1>", self.open_clash_menu)
+    
+    def destroy_item(self, item_id):
+        label = self.items.pop(item_id)
+        item = self.item_configs.pop(item_id)
+        if item.type == "status":
+            self.status_labels[item.source].remove(label)
+        label.destroy()
+        return label
+    
+    def pack_items(self):
+        """Repack every item in config order, external items stay outermost on the right"""
+        widgets = [self.items[item.id] for item in self.config.items] + list(self.custom_items.values())
+        for widget in widgets:
+            widget.pack_forget()
+        for item in self.config.items:
+            self.items[item.id].pack(side=item.side, padx=item.padx)
+        for label in self.custom_items.values():
+            label.pack(side="right", padx=8)
+    
+    def is_clash_label(self, widget):
+        return widget in self.status_labels.get("clash", ())
+    
+    def set_status_text(self, source, text):
+        """Show a status text on every label of a source, skipping unchanged ones"""
+        self.last_texts[source] = text
+        for label in self.status_labels.get(source, ()):
+            if label.cget("text") != text:
+                label.config(text=text)
         
     def update_status(self):
-        """Update all status information in the UI"""
-        # Get input method state directly from system_monitor
-        clash_status = self.system_monitor.get_clash_status()
-        input_mode = self.system_monitor.get_input_method()
-        volume_status = self.system_monitor.get_volume()
-        power_status = self.system_monitor.get_power()
-        time_info = self.system_monitor.get_time_info()
+        """Sample system status and update the UI"""
+        self.apply_status(self.system_monitor.get_status())
+    
+    def apply_status(self, status):
+        """Update all status information in the UI
+        
+        Args:
+            status: Dict returned by SystemMonitor.get_status
+        """
+        time_info = status["time_info"]
         
         # Update status text (but not colors - ColorAdapter handles that)
-        self.label_clash.config(text="Clash")
+        self.set_status_text("clash", status.get("clash_text", "Clash"))
         
         # Track clash status for special color handling
-        self.is_clash_on = (clash_status == "Clash ON")
+        self.is_clash_on = (status["clash"] == "Clash ON")
+        
+        self.set_status_text("input", status["input"])
+        self.set_status_text("volume", status["volume"])
+        self.set_status_text("power", status["power"])
+        # A meeting countdown replaces the date when one is close
+        self.set_status_text("date", status.get("countdown") or time_info["date"])
+        self.set_status_text("time", time_info["time"])
+    
+    def set_custom_item(self, item_id, text):
+        """Create or update an external status label
+        
+        Args:
+            item_id: Id chosen by the external tool
+            text: Label text
+            
+        Returns:
+            tuple: (label, created) where created is True for a new label
+        """
+        label = self.custom_items.get(item_id)
+        if label is not None:
+            if label.cget("text") != text:
+                label.config(text=text)
+            return label, False
         
-        self.label_input.config(text=input_mode)
-        self.label_volume.config(text=volume_status)
-        self.label_power.config(text=power_status)
-        self.label_date.config(text=time_info["date"])
-        self.label_time.config(text=time_info["time"])
+        label = tk.Label(self.root, text=text, font=self.DEFAULT_FONT, fg=self.DEFAULT_FG, bg=self.DEFAULT_BG, anchor="w")
+        label.pack(side="right", padx=8)
+        self.custom_items[item_id] = label
+        return label, True
+    
+    def remove_custom_item(self, item_id):
+        """Destroy an external status label
         
-        # Schedule next update
-        self.root.after(1000, self.update_status)
+        Returns:
+            tk.Label or None: The destroyed label, if it existed
+        """
+        label = self.custom_items.pop(item_id, None)
+        if label is not None:
+            label.destroy()
+        return label
+    
+    def scroll_volume(self, event):
+        """Change the volume with the mouse wheel, the label updates optimistically"""
+        if event.num == 4:
+            notches = 1
+        elif event.num == 5:
+            notches = -1
+        else:
+            notches = event.delta / 120  # One notch is 120 on Windows
+        self.set_status_text("volume", self.system_monitor.scroll_volume(notches))
+    
+    def toggle_mute(self, event=None):
+        self.set_status_text("volume", self.system_monitor.toggle_mute())
     
     # Button click handlers
-    def open_folder_computer(self, event=None):
-        os.system('explorer ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}')
+    def launch(self, item_id):
+        """Open the path of a launcher item, read at click time so reloads apply"""
+        item = self.item_configs.get(item_id)
+        if item is None or not item.path:
+            return
+        try:
+            get_backend().open_path(item.path)
+        except OSError as e:
+            logger.error("Error launching %s: %s", item.path, e)
     
     def open_system_menu(self, event=None):
-        system_menu = tk.Menu(self.root, tearoff=0, font=self.DEFAULT_FONT_SMALL)
-        system_menu.add_command(label="重启", command=self.restart_computer)
-        system_menu.add_command(label="关机", command=self.shutdown_computer)
-        system_menu.add_command(label="睡眠", command=self.put_computer_to_sleep)
-        system_menu.add_command(label="设置", command=self.open_settings)
-        system_menu.add_command(label="面板", command=self.open_control_panel)
-        system_menu.add_command(label="退出", command=self.exit_program)
+        # Built once and reposted, a new Menu per right-click would never be freed
+        if self.system_menu is None:
+            self.system_menu = tk.Menu(self.root, tearoff=0, font=self.DEFAULT_FONT_SMALL)
+            self.system_menu.add_command(label="重启", command=self.restart_computer)
+            self.system_menu.add_command(label="关机", command=self.shutdown_computer)
+            self.system_menu.add_command(label="睡眠", command=self.put_computer_to_sleep)
+            self.system_menu.add_command(label="设置", command=self.open_settings)
+            self.system_menu.add_command(label="面板", command=self.open_control_panel)
+            if self.stall_popup is not None:
+                self.system_menu.add_command(label="卡顿", command=self.stall_popup.toggle)
+            self.system_menu.add_command(label="退出", command=self.exit_program)
         
-        system_menu.post(event.x_root, event.y_root)
+        self.system_menu.post(event.x_root, event.y_root)
+    
+    def open_clash_menu(self, event=None):
+        """Mode and proxy group menu, built from the last controller snapshot"""
+        clash_client = self.system_monitor.clash_client
+        state = clash_client.get_state()
+        # Fetch fresh groups in the background for the next time the menu opens
+        clash_client.refresh()
+        
+        if self.clash_menu is None:
+            self.clash_menu = tk.Menu(self.root, tearoff=0, font=self.DEFAULT_FONT_SMALL)
+        menu = self.clash_menu
+        menu.delete(0, "end")
+        
+        if not state["connected"] and state["mode"] is None:
+            menu.add_command(label="Clash 未连接", state="disabled")
+            menu.post(event.x_root, event.y_root)
+            return
+        
+        self.clash_mode.set(state["mode"] or "")
+        for mode, label in (("rule", "规则"), ("global", "全局"), ("direct", "直连")):
+            menu.add_radiobutton(
+                label=label, value=mode, variable=self.clash_mode,
+                command=lambda mode=mode: clash_client.set_mode(mode)
+            )
+        
+        if state["groups"]:
+            menu.add_separator()
+        for group, info in sorted(state["groups"].items()):
+            submenu = self.clash_group_menus.get(group)
+            if submenu is None:
+                submenu = tk.Menu(menu, tearoff=0, font=self.DEFAULT_FONT_SMALL)
+                self.clash_group_menus[group] = submenu
+            submenu.delete(0, "end")
+            for proxy in info["all"]:
+                marker = "● " if proxy == info["now"] else "   "
+                submenu.add_command(
+                    label=marker + proxy,
+                    command=lambda group=group, proxy=proxy: clash_client.select_proxy(group, proxy)
+                )
+            menu.add_cascade(label=group, menu=submenu)
+        
+        menu.post(event.x_root, event.y_root)
     
     def exit_program(self):
         """Exit program through app reference"""
@@ -158,59 +357,3 @@ class TaskbarUI:
     def open_control_panel(self):
         # os.startfile('::{26EE0668-A00A-44D7-9371-BEB064C98683}')
         pass
-    
-    def open_folder_d6(self, event=None):
-        folder_path = "D:\\Web\\学习\\第六学期"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-    
-    def open_folder_list(self, event=None):
-        folder_path = "D:\\Tic_Programs\\# List"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-    
-    def open_folder_terminal(self, event=None):
-        folder_path = "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-    
-    def open_folder_music(self, event=None):
-        folder_path = "D:\\Tic_Programs\\CloudMusic\\cloudmusic.exe"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-    
-    def open_folder_onenote(self, event=None):
-        folder_path = "C:\\Program Files\\Microsoft Office\\root\\Office16\\ONENOTE.EXE"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-    
-    def open_folder_todo(self, event=None):
-        folder_path = "D:\\Tic_Programs\\# List\\Microsoft To Do.lnk"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-
-    def open_folder_edge(self, event=None):
-        folder_path = "C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
-    
-    def open_folder_vscode(self, event=None):
-        folder_path = "D:\\Tic_Programs\\Microsoft VS Code\\Code.exe"
-        if os.path.exists(folder_path):
-            os.startfile(folder_path)
-        else:
-            print(f"路径不存在: {folder_path}")
\ No newline at end of file
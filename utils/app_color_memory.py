@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# utils/app_color_memory.py - Last sampled bar colors per foreground application
+import time
+from collections import OrderedDict
+
+
+class AppColorMemory:
+    def __init__(self, max_entries=64, max_age=3600.0, clock=time.monotonic):
+        """Bounded LRU of colors keyed by (window class, process name)
+
+        Args:
+            max_entries: Number of applications remembered
+            max_age: Seconds after which an entry is dropped as stale
+            clock: Monotonic time source, replaceable for testing
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (stored_at, colors)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Look up remembered colors
+
+        Args:
+            key: (class_name, process_name) of the foreground window
+
+        Returns:
+            list or None: (r, g, b) per bar
+        """
+        entry = self.entries.get(key)
+        if entry is not None and self.clock() - entry[0] > self.max_age:
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, colors):
+        """Remember the colors sampled while an application was in front"""
+        self.entries[key] = (self.clock(), list(colors))
+        self.entries.move_to_end(key)
+        self.evict()
+
+    def evict(self):
+        """Drop aged entries and trim to max_entries, least recently used first"""
+        now = self.clock()
+        for key in [k for k, (stored_at, _) in self.entries.items() if now - stored_at > self.max_age]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_hit_rate(self):
+        """Fraction of lookups answered from memory, 0.0 before any lookup"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
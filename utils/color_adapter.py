@@ -1,82 +1,263 @@
 #!/usr/bin/env python3
 # utils/color_adapter.py - Adapts UI colors based on screen sampling
 import tkinter as tk
-from PIL import ImageGrab
 import numpy as np
 import colorsys
 
+from system.backend import get_backend
+from system.window_probe import WindowProbe
+from utils.wallpaper_cache import WallpaperColorCache
+from utils.app_color_memory import AppColorMemory
+from utils.color_fade import ColorFader
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_COLOR = (248, 248, 248)  # #F8F8F8
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+
+class ColorBar:
+    def __init__(self, window, monitor=None):
+        """Color state of one bar window
+        
+        Args:
+            window: Tkinter window of the bar
+            monitor: MonitorInfo the bar sits on, None for the primary screen
+        """
+        self.window = window
+        self.monitor = monitor
+        self.ui_elements = []  # List to store UI elements for color updating
+        self.special_elements = {}  # Dictionary to store elements with special color handling
+        self.bg_color = None  # Hex colors on screen now, None before the first sample
+        self.fg_color = None
+        self.is_dark = False  # Contrast of the background on screen now, for special elements
+
+
 class ColorAdapter:
-    def __init__(self, root, taskbar_height=22, sample_count=10):
+    def __init__(self, root, taskbar_height=22, sample_count=10, monitor=None, window_probe=None, backend=None,
+                 fade_duration=200, fade_fps=60):
         """Initialize color adapter
         
         Args:
             root: Tkinter root window
             taskbar_height: Height of the taskbar in pixels
             sample_count: Number of points to sample for color detection
+            monitor: MonitorInfo of the root bar, None for the primary screen
+            window_probe: WindowProbe telling whether only the wallpaper is under a bar
+            backend: Platform Backend capturing the screen, defaults to get_backend()
+            fade_duration: Milliseconds a color change fades over, 0 to switch instantly
+            fade_fps: Frame rate cap while a fade runs
         """
         self.root = root
         self.taskbar_height = taskbar_height
         self.sample_count = sample_count
         self.sample_y = self.taskbar_height + 2  # Sample a few pixels below the taskbar
-        self.ui_elements = []  # List to store UI elements for color updating
-        self.special_elements = {}  # Dictionary to store elements with special color handling
+        self.bars = [ColorBar(root, monitor)]
+        # Reused every tick instead of reallocated
+        self.sample_points = {}  # row width -> sample column indices
+        self.sample_buffer = np.empty((sample_count, 3), dtype=np.uint8)
+        self.window_probe = window_probe or WindowProbe()
+        self.backend = backend or get_backend()
+        self.wallpaper_cache = WallpaperColorCache(self.dominant_color)
+        self.app_memory = AppColorMemory()
+        self.last_foreground = None
+        self.lazy_after_id = None
+        self.lazy_capture_delay = 250  # Milliseconds for the new window to finish painting
+        # Frames run only while a color change is fading, never at idle
+        self.fader = ColorFader(root, self.paint_bar, fade_duration, fade_fps)
+    
+    def add_bar(self, window, monitor):
+        """Add another bar window, sampled in the same capture pass
         
-    def add_ui_element(self, element):
+        Args:
+            window: Tkinter window of the bar
+            monitor: MonitorInfo the bar sits on
+            
+        Returns:
+            int: Index of the bar for add_ui_elements/register_special_element
+        """
+        self.bars.append(ColorBar(window, monitor))
+        return len(self.bars) - 1
+        
+    def add_ui_element(self, element, bar=0):
         """Add a UI element to be color-updated
         
         Args:
             element: Tkinter widget to update colors for
+            bar: Index of the bar the element belongs to
         """
-        self.ui_elements.append(element)
+        self.bars[bar].ui_elements.append(element)
+        self.paint_element(self.bars[bar], element)
         
-    def add_ui_elements(self, elements):
+    def add_ui_elements(self, elements, bar=0):
         """Add multiple UI elements to be color-updated
         
         Args:
             elements: List of Tkinter widgets to update colors for
+            bar: Index of the bar the elements belong to
         """
-        self.ui_elements.extend(elements)
+        self.bars[bar].ui_elements.extend(elements)
+        for element in elements:
+            self.paint_element(self.bars[bar], element)
     
-    def register_special_element(self, element, color_handler):
+    def remove_ui_element(self, element, bar=0):
+        """Stop color-updating a UI element
+        
+        Args:
+            element: Tkinter widget previously added
+            bar: Index of the bar the element belongs to
+        """
+        if element in self.bars[bar].ui_elements:
+            self.bars[bar].ui_elements.remove(element)
+        self.bars[bar].special_elements.pop(element, None)
+    
+    def register_special_element(self, element, color_handler, bar=0):
         """Register an element with special color handling
         
         Args:
             element: Tkinter widget with special color handling
             color_handler: Function that takes (element, bg_color, is_dark) and returns None
+            bar: Index of the bar the element belongs to
         """
-        self.special_elements[element] = color_handler
+        self.bars[bar].special_elements[element] = color_handler
+        if self.bars[bar].bg_color is not None:
+            color_handler(element, self.bars[bar].bg_color, self.bars[bar].is_dark)
+    
+    def get_bar_bounds(self, bar):
+        """Get the screen area a bar sits on
         
-    def sample_screen_color(self):
-        """Sample colors from screen below the taskbar
+        Returns:
+            tuple: (left, top, width, height) in virtual-desktop pixels
+        """
+        if bar.monitor is None:
+            return (0, 0, self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        m = bar.monitor
+        return (m.left, m.top, m.right - m.left, m.bottom - m.top)
+    
+    def get_sample_row(self, bar):
+        """Get the screen row sampled for a bar
         
+        Returns:
+            tuple: (left, right, y) in virtual-desktop pixels
+        """
+        left, top, width, _ = self.get_bar_bounds(bar)
+        return (left, left + width, top + self.sample_y)
+    
+    def get_sample_points(self, bar):
+        """Get the screen points sampled for a bar
+        
+        Returns:
+            list: (x, y) virtual-desktop coordinates
+        """
+        left, right, y = self.get_sample_row(bar)
+        return [(int(x), y) for x in np.linspace(left, right - 1, self.sample_count)]
+    
+    def dominant_color(self, row):
+        """Pick the representative color of a row of pixels
+        
+        Args:
+            row: (width, 3) array of RGB pixels
+            
         Returns:
             tuple: (r, g, b) color values
         """
-        try:
-            screen_width = self.root.winfo_screenwidth()
-            sample_points = np.linspace(0, screen_width-1, self.sample_count, dtype=int)
+        sample_points = self.sample_points.get(len(row))
+        if sample_points is None:
+            sample_points = np.linspace(0, len(row) - 1, self.sample_count, dtype=int)
+            self.sample_points[len(row)] = sample_points
+        
+        # Extract colors from sample points into the reused buffer
+        colors = np.take(row[:, :3], sample_points, axis=0, out=self.sample_buffer)
+        
+        # Try to find most common color
+        unique_colors, counts = np.unique(colors, axis=0, return_counts=True)
+        if len(unique_colors) > 0 and np.max(counts) > 1:
+            # If we have a dominant color, use it
+            most_common_idx = np.argmax(counts)
+            dominant_color = unique_colors[most_common_idx]
+        else:
+            # If no dominant color, use average
+            dominant_color = np.mean(colors, axis=0).astype(int)
             
-            # Capture a small strip below the taskbar
-            img = ImageGrab.grab(bbox=(0, self.sample_y, screen_width, self.sample_y+1))
-            img_array = np.array(img)
+        return tuple(int(c) for c in dominant_color)
+        
+    def get_wallpaper_colors(self):
+        """Get the cached wallpaper color under each bar
+        
+        Returns:
+            list or None: (r, g, b) per bar, None when the wallpaper cannot be used
+        """
+        geometries = [self.get_bar_bounds(bar)[2:] + (self.sample_y,) for bar in self.bars]
+        return self.wallpaper_cache.get_colors(
+            self.window_probe.get_wallpaper_path(),
+            self.window_probe.get_wallpaper_style(),
+            geometries
+        )
+    
+    def sample_screen_colors(self):
+        """Sample colors from screen below every bar
+        
+        Bars with only the desktop underneath take their color from the
+        wallpaper cache. The rest are served by one single-row capture per
+        distinct sample row, so monitors side by side cost one screen grab
+        per tick and a bare desktop costs none.
+        
+        Returns:
+            list: (r, g, b) color values, one per bar
+        """
+        colors = [None] * len(self.bars)
+        desktop_bars = [
+            index for index, bar in enumerate(self.bars)
+            if self.window_probe.is_desktop_at(self.get_sample_points(bar))
+        ]
+        if desktop_bars:
+            wallpaper_colors = self.get_wallpaper_colors()
+            if wallpaper_colors is not None:
+                for index in desktop_bars:
+                    colors[index] = wallpaper_colors[index]
+        
+        live_bars = [index for index, color in enumerate(colors) if color is None]
+        if live_bars:
+            for index, color in zip(live_bars, self.capture_colors([self.bars[i] for i in live_bars])):
+                colors[index] = color
+        return colors
+    
+    def capture_colors(self, bars):
+        """Sample colors below the given bars, one capture per distinct row
+        
+        Bars whose sample rows share a y are served by one strip spanning
+        them. Monitors at different tops get a strip each instead of one
+        box covering every row in between.
+        
+        Args:
+            bars: ColorBar entries to sample
             
-            # Extract colors from sample points
-            colors = [img_array[0, x] for x in sample_points]
+        Returns:
+            list: (r, g, b) color values, one per bar
+        """
+        try:
+            rows = [self.get_sample_row(bar) for bar in bars]
+            spans = {}  # y -> (left, right)
+            for row_left, row_right, y in rows:
+                left, right = spans.get(y, (row_left, row_right))
+                spans[y] = (min(left, row_left), max(right, row_right))
             
-            # Try to find most common color
-            unique_colors, counts = np.unique(colors, axis=0, return_counts=True)
-            if len(unique_colors) > 0 and np.max(counts) > 1:
-                # If we have a dominant color, use it
-                most_common_idx = np.argmax(counts)
-                dominant_color = unique_colors[most_common_idx]
-            else:
-                # If no dominant color, use average
-                dominant_color = np.mean(colors, axis=0).astype(int)
-                
-            return tuple(dominant_color)
+            # One pixel tall strip per row, across the monitors it touches
+            strips = {
+                y: (left, self.backend.capture_rect(left, y, right, y + 1)[0])
+                for y, (left, right) in spans.items()
+            }
+            
+            colors = []
+            for row_left, row_right, y in rows:
+                left, strip = strips[y]
+                colors.append(self.dominant_color(strip[row_left - left:row_right - left]))
+            return colors
         except Exception as e:
-            print(f"Error sampling screen color: {e}")
-            return (248, 248, 248)  # Default to #F8F8F8
+            logger.error("Error sampling screen color: %s", e)
+            return [DEFAULT_COLOR] * len(bars)
     
     def rgb_to_hex(self, rgb):
         """Convert RGB tuple to hex color string
@@ -115,31 +296,98 @@ class ColorAdapter:
         """
         return "white" if self.is_dark_color(rgb) else "black"
         
+    def apply_colors(self, bar, rgb_color):
+        """Fade one bar to a background color and its contrast color
+        
+        An unchanged color costs no widget updates, only the special
+        elements are refreshed since their state can change on its own.
+        
+        Args:
+            bar: ColorBar to update
+            rgb_color: (r, g, b) background color
+        """
+        rgb_color = tuple(int(c) for c in rgb_color)
+        
+        # Determine appropriate text color
+        fg_color = WHITE if self.is_dark_color(rgb_color) else BLACK
+        
+        if not self.fader.set_target(bar, rgb_color, fg_color):
+            self.paint_special_elements(bar)
+    
+    def paint_bar(self, bar, bg_color, fg_color, bg_rgb):
+        """Show one fade frame on a bar, called by the fader
+        
+        Args:
+            bar: ColorBar to paint
+            bg_color: Background hex color
+            fg_color: Text hex color
+            bg_rgb: Background as (r, g, b), special elements get its contrast
+        """
+        bar.bg_color = bg_color
+        bar.fg_color = fg_color
+        # Follows the frame, not the target, so special elements stay readable mid-fade
+        bar.is_dark = self.is_dark_color(bg_rgb)
+        
+        # Update bar window background
+        bar.window.configure(bg=bg_color)
+        
+        # Update all standard UI elements
+        for element in bar.ui_elements:
+            if element not in bar.special_elements:
+                element.configure(bg=bg_color, fg=fg_color)
+        
+        self.paint_special_elements(bar)
+    
+    def paint_special_elements(self, bar):
+        """Update special elements with their custom handlers"""
+        if bar.bg_color is None:
+            return
+        for element, handler in bar.special_elements.items():
+            handler(element, bar.bg_color, bar.is_dark)
+    
+    def paint_element(self, bar, element):
+        """Give a newly added element the bar's current colors"""
+        if bar.bg_color is not None and element not in bar.special_elements:
+            element.configure(bg=bar.bg_color, fg=bar.fg_color)
+        
     def update_colors(self):
-        """Update UI colors based on sampled screen color"""
+        """Update UI colors based on sampled screen color
+        
+        Runs once per call, the ActivityGovernor schedules the next tick.
+        """
         try:
-            # Sample color
-            rgb_color = self.sample_screen_color()
-            bg_color = self.rgb_to_hex(rgb_color)
-            
-            # Determine appropriate text color
-            is_dark = self.is_dark_color(rgb_color)
-            fg_color = "white" if is_dark else "black"
-            
-            # Update root window background
-            self.root.configure(bg=bg_color)
+            colors = self.sample_screen_colors()
+            for bar, rgb_color in zip(self.bars, colors):
+                self.apply_colors(bar, rgb_color)
             
-            # Update all standard UI elements
-            for element in self.ui_elements:
-                if element not in self.special_elements:
-                    element.configure(bg=bg_color, fg=fg_color)
-            
-            # Update special elements with their custom handlers
-            for element, handler in self.special_elements.items():
-                handler(element, bg_color, is_dark)
-                
-            # Schedule next update
-            self.root.after(1000, self.update_colors)
+            # Remember what this application looks like for the next switch to it
+            foreground = self.window_probe.get_foreground()
+            if foreground is not None and foreground == self.last_foreground:
+                self.app_memory.put(foreground, colors)
         except Exception as e:
-            print(f"Error updating colors: {e}")
-            self.root.after(1000, self.update_colors)  # Retry on next interval
\ No newline at end of file
+            logger.error("Error updating colors: %s", e)
+    
+    def check_foreground(self):
+        """Apply remembered colors as soon as the foreground application changes
+        
+        Cheap enough to run several times per second: it only identifies the
+        foreground window. A remembered color is applied immediately and one
+        lazy capture confirms it once the new window has painted.
+        """
+        foreground = self.window_probe.get_foreground()
+        if foreground is None or foreground == self.last_foreground:
+            return
+        self.last_foreground = foreground
+        
+        colors = self.app_memory.get(foreground)
+        if colors is not None and len(colors) == len(self.bars):
+            for bar, rgb_color in zip(self.bars, colors):
+                self.apply_colors(bar, rgb_color)
+        
+        if self.lazy_after_id is not None:
+            self.root.after_cancel(self.lazy_after_id)
+        self.lazy_after_id = self.root.after(self.lazy_capture_delay, self._lazy_capture)
+    
+    def _lazy_capture(self):
+        self.lazy_after_id = None
+        self.update_colors()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# utils/color_fade.py - Background/foreground fades from precomputed linear-light gradients
+#
+# Benchmark: python -m utils.color_fade [widget_count]
+import sys
+import time
+
+# sRGB byte -> linear light, and a fine linear -> sRGB byte table for the way back
+SRGB_TO_LINEAR = [
+    c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    for c in (i / 255.0 for i in range(256))
+]
+LINEAR_STEPS = 4096
+LINEAR_TO_SRGB = [
+    round(255 * (v * 12.92 if v <= 0.0031308 else 1.055 * v ** (1 / 2.4) - 0.055))
+    for v in (i / (LINEAR_STEPS - 1) for i in range(LINEAR_STEPS))
+]
+
+
+def to_hex(rgb):
+    return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+
+
+def build_gradient(start, end, steps):
+    """Colors from just after `start` to exactly `end`, mixed in linear light
+
+    Mixing gamma-encoded values makes a fade between complementary colors
+    dip through a dark, muddy midpoint; linear light keeps it even. The
+    steps follow a smoothstep curve so the fade eases in and out.
+
+    Args:
+        start: (r, g, b) color shown now
+        end: (r, g, b) target color
+        steps: Number of colors returned
+
+    Returns:
+        list: (r, g, b) tuples, the last one equal to `end`
+    """
+    start_linear = [SRGB_TO_LINEAR[c] for c in start]
+    end_linear = [SRGB_TO_LINEAR[c] for c in end]
+    colors = []
+    for i in range(1, steps):
+        t = i / steps
+        t = t * t * (3 - 2 * t)
+        colors.append(tuple(
+            LINEAR_TO_SRGB[round((a + (b - a) * t) * (LINEAR_STEPS - 1))]
+            for a, b in zip(start_linear, end_linear)
+        ))
+    colors.append(tuple(end))
+    return colors
+
+
+class Fade:
+    __slots__ = ("frames", "start", "index")
+
+    def __init__(self, frames, start):
+        """One running transition
+
+        Args:
+            frames: List of (bg_rgb, fg_rgb, bg_hex, fg_hex), the lookup table
+            start: Clock reading when the fade began
+        """
+        self.frames = frames
+        self.start = start
+        self.index = -1
+
+
+class ColorFader:
+    def __init__(self, root, paint, duration=200, fps=60, cache_size=32, clock=time.monotonic):
+        """Fade keyed targets from the colors shown now to new ones
+
+        Each fade gets its frames from a lookup table built once per
+        (from, to) pair, so a frame only indexes the table and paints.
+        Frames are scheduled only while a fade runs, at most `fps` per
+        second; when nothing fades no timer is pending at all. The frame
+        index follows elapsed time, so a late frame skips ahead instead
+        of stretching the fade.
+
+        Args:
+            root: Tkinter root window, or anything with after/after_cancel
+            paint: Called as paint(key, bg_hex, fg_hex, bg_rgb) for each shown frame
+            duration: Fade length in milliseconds, 0 switches instantly
+            fps: Frame rate cap
+            cache_size: Number of gradients kept
+            clock: Monotonic time source, replaceable for testing
+        """
+        self.root = root
+        self.paint = paint
+        self.duration = duration / 1000.0
+        self.frame_interval = max(1, round(1000 / fps))
+        self.steps = max(1, round(duration * fps / 1000))
+        self.cache_size = cache_size
+        self.clock = clock
+        self.shown = {}  # key -> (bg_rgb, fg_rgb) on screen now
+        self.targets = {}  # key -> (bg_rgb, fg_rgb) being faded to
+        self.fades = {}  # key -> Fade
+        self.gradients = {}  # ((bg, fg) from, (bg, fg) to) -> frames
+        self.after_id = None
+
+    def get_frames(self, start, end):
+        key = (start, end)
+        frames = self.gradients.get(key)
+        if frames is None:
+            backgrounds = build_gradient(start[0], end[0], self.steps)
+            foregrounds = build_gradient(start[1], end[1], self.steps)
+            frames = [(bg, fg, to_hex(bg), to_hex(fg)) for bg, fg in zip(backgrounds, foregrounds)]
+            if len(self.gradients) >= self.cache_size:
+                self.gradients.clear()
+            self.gradients[key] = frames
+        return frames
+
+    def set_target(self, key, bg, fg):
+        """Start, retarget or cancel the fade of one key
+
+        A new target mid-fade starts a fresh fade from the color on screen,
+        so there is no jump back. A target equal to what is shown cancels
+        the fade where it is.
+
+        Args:
+            key: Hashable owner of the colors, e.g. a bar
+            bg: (r, g, b) background target
+            fg: (r, g, b) foreground target
+
+        Returns:
+            bool: False if this target was already set
+        """
+        target = (tuple(bg), tuple(fg))
+        if self.targets.get(key) == target:
+            return False
+        self.targets[key] = target
+
+        start = self.shown.get(key)
+        if start == target:
+            self.fades.pop(key, None)
+            return True
+        if start is None or self.steps == 1:
+            # Nothing to fade from yet, or fading disabled
+            self.fades.pop(key, None)
+            self.show(key, self.get_frames(target, target)[-1])
+            return True
+
+        self.fades[key] = Fade(self.get_frames(start, target), self.clock())
+        if self.after_id is None:
+            self.after_id = self.root.after(self.frame_interval, self._frame)
+        return True
+
+    def show(self, key, frame):
+        bg, fg, bg_hex, fg_hex = frame
+        self.shown[key] = (bg, fg)
+        self.paint(key, bg_hex, fg_hex, bg)
+
+    def is_fading(self):
+        return bool(self.fades)
+
+    def stop(self):
+        """Cancel every fade, leaving the current frames on screen"""
+        self.fades.clear()
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _frame(self):
+        self.after_id = None
+        now = self.clock()
+        for key, fade in list(self.fades.items()):
+            last = len(fade.frames) - 1
+            # Frame i is the color at (i + 1) / len(frames) of the fade, the first falls due after one step
+            index = min(last, int((now - fade.start) / self.duration * len(fade.frames)) - 1)
+            if index >= 0 and index != fade.index:
+                fade.index = index
+                self.show(key, fade.frames[index])
+            if index == last:
+                del self.fades[key]
+        if self.fades:
+            self.after_id = self.root.after(self.frame_interval, self._frame)
+
+
+def run_benchmark(widget_count=20, rounds=200):
+    """Time gradient building, and painted frames through ColorAdapter for `widget_count` labels"""
+    fader = ColorFader(None, lambda key, bg, fg, bg_rgb: None)
+    start = time.perf_counter()
+    for i in range(rounds):
+        fader.gradients.clear()
+        fader.get_frames(((i % 256, 40, 200), (0, 0, 0)), ((250, 250, 250), (255, 255, 255)))
+    build = (time.perf_counter() - start) / rounds
+    print(f"gradient table ({fader.steps} frames): {build * 1e6:8.1f} us")
+
+    import tkinter as tk
+    from system.backend import Backend
+    from utils.color_adapter import ColorAdapter
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"per-frame paint skipped, no display: {e}")
+        return
+    # Registered the way TaskbarApp registers a bar's items, one of them with a special handler
+    adapter = ColorAdapter(root, backend=Backend())
+    labels = [tk.Label(root, text=f"项目{i}") for i in range(widget_count)]
+    for label in labels:
+        label.pack(side="left")
+    adapter.add_ui_elements(labels[1:])
+    adapter.register_special_element(
+        labels[0], lambda element, bg, is_dark: element.configure(bg=bg, fg="white" if is_dark else "black")
+    )
+    root.update()
+
+    bar = adapter.bars[0]
+    frames = adapter.fader.get_frames(((30, 30, 30), (255, 255, 255)), ((248, 248, 248), (0, 0, 0)))
+    start = time.perf_counter()
+    for i in range(rounds):
+        adapter.fader.show(bar, frames[i % len(frames)])
+        root.update_idletasks()
+    frame = (time.perf_counter() - start) / rounds
+    root.destroy()
+    print(f"frame, {widget_count} widgets:     {frame * 1e3:8.3f} ms  (budget {adapter.fader.frame_interval} ms)")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
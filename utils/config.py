@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# utils/config.py - Declarative bar configuration, cached by mtime and diffed on reload
+#
+# Benchmark: python -m utils.config [item_count]
+import os
+import sys
+import json
+import time
+import tempfile
+from collections import namedtuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".concise_taskbar", "config.json")
+
+ITEM_TYPES = ("status", "launcher")
+STATUS_SOURCES = ("time", "date", "power", "volume", "input", "clash")
+MENUS = (None, "system")
+SIDES = ("left", "right")
+
+# Items are packed in list order on their side, so right-side items read right to left
+DEFAULT_ITEMS = [
+    {"id": "time", "type": "status", "source": "time", "side": "right", "padx": 16},
+    {"id": "date", "type": "status", "source": "date", "side": "right"},
+    {"id": "power", "type": "status", "source": "power", "side": "right"},
+    {"id": "volume", "type": "status", "source": "volume", "side": "right"},
+    {"id": "input", "type": "status", "source": "input", "side": "right"},
+    {"id": "clash", "type": "status", "source": "clash", "side": "right"},
+    {"id": "tic", "type": "launcher", "text": "江麦里   |", "path": "::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
+     "menu": "system", "side": "left", "padx": 16},
+    {"id": "files", "type": "launcher", "text": "文件", "path": "D:\\Web\\学习\\第六学期"},
+    {"id": "apps", "type": "launcher", "text": "应用", "path": "D:\\Tic_Programs\\# List"},
+    {"id": "terminal", "type": "launcher", "text": "终端",
+     "path": "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe"},
+    {"id": "music", "type": "launcher", "text": "音乐", "path": "D:\\Tic_Programs\\CloudMusic\\cloudmusic.exe"},
+    {"id": "draft", "type": "launcher", "text": "草稿",
+     "path": "C:\\Program Files\\Microsoft Office\\root\\Office16\\ONENOTE.EXE"},
+    {"id": "plan", "type": "launcher", "text": "计划", "path": "D:\\Tic_Programs\\# List\\Microsoft To Do.lnk"},
+    {"id": "edge", "type": "launcher", "text": "互联",
+     "path": "C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"},
+    {"id": "vscode", "type": "launcher", "text": "VSCode", "path": "D:\\Tic_Programs\\Microsoft VS Code\\Code.exe"},
+]
+
+DEFAULT_CONFIG = {
+    "font": ["Microsoft YaHei", 14, "bold"],
+    "font_small": ["Microsoft YaHei", 13, "bold"],
+    "foreground": "black",
+    "background": "#F8F8F8",
+    "padx": 8,
+    # Job name -> milliseconds, see TaskbarApp.start_update_routines
+    "intervals": {
+        "colors": 1000,
+        "status": 1000,
+        "foreground": 150,
+        "calendar": 60000,
+        "memory": 300000,
+        "ipc": 50,
+        "hotkeys": 50,
+        "fullscreen": 1000,
+        "workarea": 1000,
+        "config": 2000
+    },
+    "countdown_minutes": 15,
+    # Read at start-up only
+    "clash": {"host": "127.0.0.1", "port": 9090, "secret": None},
+    # tracemalloc in the memory health samples, costs CPU and memory while on
+    "memory_trace": False,
+    "items": DEFAULT_ITEMS
+}
+
+# One validated bar item, compared as a whole to decide whether it changed
+ItemConfig = namedtuple("ItemConfig", ["id", "type", "source", "text", "path", "menu", "side", "padx", "font"])
+
+
+class ConfigError(ValueError):
+    """Raised when a config file does not validate"""
+
+
+class TaskbarConfig:
+    def __init__(self, font, font_small, foreground, background, intervals, countdown_minutes, clash, items,
+                 memory_trace=False):
+        """Validated configuration, see DEFAULT_CONFIG for the file layout"""
+        self.font = font
+        self.font_small = font_small
+        self.foreground = foreground
+        self.background = background
+        self.intervals = intervals
+        self.countdown_minutes = countdown_minutes
+        self.clash = clash
+        self.items = items
+        self.memory_trace = memory_trace
+
+    def style(self):
+        """The settings every widget depends on, a change rebuilds all items"""
+        return (self.font, self.font_small, self.foreground, self.background)
+
+
+def is_integer(value):
+    """JSON integers only, true and false load as bool, a subclass of int"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_font(value, name):
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, list) and value and all(isinstance(v, (str, int)) for v in value):
+        return tuple(value)
+    raise ConfigError(f"{name}: expected a font name or [family, size, style...]")
+
+
+def parse_item(data, default_padx, seen_ids):
+    if not isinstance(data, dict):
+        raise ConfigError("items: every item must be an object")
+    item_id = data.get("id")
+    if not isinstance(item_id, str) or not item_id:
+        raise ConfigError("items: every item needs a string id")
+    if item_id in seen_ids:
+        raise ConfigError(f"items: duplicate id {item_id!r}")
+    seen_ids.add(item_id)
+
+    item_type = data.get("type", "launcher")
+    if item_type not in ITEM_TYPES:
+        raise ConfigError(f"{item_id}: type must be one of {', '.join(ITEM_TYPES)}")
+    source = data.get("source")
+    if item_type == "status" and source not in STATUS_SOURCES:
+        raise ConfigError(f"{item_id}: source must be one of {', '.join(STATUS_SOURCES)}")
+    if item_type == "launcher" and not isinstance(data.get("text"), str):
+        raise ConfigError(f"{item_id}: launchers need a text")
+    menu = data.get("menu")
+    if menu not in MENUS:
+        raise ConfigError(f"{item_id}: menu must be \"system\" or omitted")
+    side = data.get("side", "left" if item_type == "launcher" else "right")
+    if side not in SIDES:
+        raise ConfigError(f"{item_id}: side must be left or right")
+    padx = data.get("padx", default_padx)
+    if not is_integer(padx) or padx < 0:
+        raise ConfigError(f"{item_id}: padx must be a non-negative integer")
+    font = parse_font(data["font"], f"{item_id}.font") if "font" in data else None
+
+    return ItemConfig(
+        item_id, item_type, source if item_type == "status" else None,
+        data.get("text"), data.get("path"), menu, side, padx, font
+    )
+
+
+def parse_config(data):
+    """Validate a decoded config object, filling in defaults
+
+    Args:
+        data: Dict decoded from the config file
+
+    Returns:
+        TaskbarConfig
+
+    Raises:
+        ConfigError: If a value has the wrong type or is unknown
+    """
+    if not isinstance(data, dict):
+        raise ConfigError("the config file must contain a JSON object")
+    merged = dict(DEFAULT_CONFIG)
+    merged.update(data)
+
+    intervals = dict(DEFAULT_CONFIG["intervals"])
+    intervals.update(merged["intervals"] if isinstance(merged["intervals"], dict) else {})
+    for name, interval in intervals.items():
+        if not is_integer(interval) or interval <= 0:
+            raise ConfigError(f"intervals.{name}: expected a positive number of milliseconds")
+
+    countdown = merged["countdown_minutes"]
+    if not is_integer(countdown) or countdown < 0:
+        raise ConfigError("countdown_minutes: expected a non-negative integer")
+
+    clash = dict(DEFAULT_CONFIG["clash"])
+    clash.update(merged["clash"] if isinstance(merged["clash"], dict) else {})
+
+    memory_trace = merged["memory_trace"]
+    if not isinstance(memory_trace, bool):
+        raise ConfigError("memory_trace: expected true or false")
+
+    if not isinstance(merged["items"], list):
+        raise ConfigError("items: expected a list")
+    padx = merged["padx"]
+    seen_ids = set()
+    items = [parse_item(item, padx, seen_ids) for item in merged["items"]]
+
+    return TaskbarConfig(
+        parse_font(merged["font"], "font"),
+        parse_font(merged["font_small"], "font_small"),
+        str(merged["foreground"]),
+        str(merged["background"]),
+        intervals,
+        countdown,
+        clash,
+        items,
+        memory_trace
+    )
+
+
+def diff_items(old_items, new_items):
+    """Compare two item lists by id
+
+    Returns:
+        tuple: (added ids, removed ids, changed ids, order_changed)
+    """
+    old = {item.id: item for item in old_items}
+    new = {item.id: item for item in new_items}
+    added = [item_id for item_id in new if item_id not in old]
+    removed = [item_id for item_id in old if item_id not in new]
+    changed = [item_id for item_id in new if item_id in old and old[item_id] != new[item_id]]
+    kept_old = [item.id for item in old_items if item.id in new]
+    kept_new = [item.id for item in new_items if item.id in old]
+    return added, removed, changed, kept_old != kept_new
+
+
+class ConfigLoader:
+    def __init__(self, path=DEFAULT_CONFIG_PATH):
+        """Load the config file, re-parsing only when its mtime or size changes
+
+        Args:
+            path: JSON config file, built-in defaults are used if it is missing
+        """
+        self.path = path
+        self.signature = None
+        self.config = parse_config({})
+
+    def load(self):
+        """Return the current config
+
+        A file that fails to parse or validate is logged and the previous
+        config is kept.
+
+        Returns:
+            tuple: (TaskbarConfig, changed)
+        """
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self.signature:
+            return self.config, False
+        self.signature = signature
+
+        if signature is None:
+            config = parse_config({})
+        else:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    config = parse_config(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error("Error loading config %s: %s", self.path, e)
+                return self.config, False
+
+        self.config = config
+        return config, True
+
+
+def run_benchmark(item_count=40):
+    """Time an unchanged check, and a reload with one changed item: parse, diff and widget patch"""
+    items = [dict(item) for item in DEFAULT_ITEMS]
+    while len(items) < item_count:
+        items.append({"id": f"extra{len(items)}", "type": "launcher", "text": f"项目{len(items)}", "path": "C:\\"})
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"items": items}, f, ensure_ascii=False)
+        loader = ConfigLoader(path)
+        old, _ = loader.load()
+
+        rounds = 1000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            loader.load()
+        unchanged = (time.perf_counter() - start) / rounds
+
+        items[3] = dict(items[3], padx=12)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"items": items}, f, ensure_ascii=False, indent=1)
+        start = time.perf_counter()
+        new, changed = loader.load()
+        result = diff_items(old.items, new.items)
+        reload_time = time.perf_counter() - start
+
+    print(f"{len(items)} items")
+    print(f"unchanged check:        {unchanged * 1e6:8.1f} us")
+    print(f"reload + diff (1 item): {reload_time * 1e3:8.3f} ms  changed={changed} diff={result}")
+
+    import tkinter as tk
+    from ui.taskbar import TaskbarUI
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"widget patch skipped, no display: {e}")
+        return
+    ui = TaskbarUI(root, None, config=old)
+    root.update()
+    # The padx change repacks the bar, the worst case for a single item
+    start = time.perf_counter()
+    ui.apply_config(new)
+    root.update_idletasks()
+    patch = time.perf_counter() - start
+    root.destroy()
+    print(f"widget patch (1 item):  {patch * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
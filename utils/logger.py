@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# utils/logger.py - Rate-limited, buffered logging for the periodic update loops
+import os
+import sys
+import time
+import queue
+import threading
+import logging
+import logging.handlers
+from collections import deque
+
+LOGGER_NAME = "taskbar"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+DEFAULT_LOG_DIR = os.path.join(os.path.expanduser("~"), ".concise_taskbar")
+
+_listener = None
+_queue_handler = None
+_rate_filter = None
+_ring_handler = None
+_setup_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self, interval=60.0, max_keys=512, clock=time.monotonic):
+        """Drop repeats of the same message within an interval
+
+        The first record for a key always passes. Later records with the same
+        key are counted and dropped until `interval` seconds have elapsed, then
+        the next one passes annotated with how many were suppressed. Counts
+        still held back when logging stops are released by flush().
+
+        Args:
+            interval: Seconds between two emitted records with the same key
+            max_keys: Upper bound on tracked keys, oldest are forgotten first
+            clock: Monotonic time source, replaceable for testing
+        """
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self.clock = clock
+        self._state = {}  # key -> [last_emit_time, suppressed_count, last_suppressed_record]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def record_key(record):
+        """Key used for deduplication, `extra={"key": ...}` overrides the default"""
+        key = getattr(record, "key", None)
+        if key is not None:
+            return key
+        # The unformatted template, so "Error: %s" with changing args is one key
+        return (record.name, record.levelno, str(record.msg))
+
+    def filter(self, record):
+        key = self.record_key(record)
+        now = self.clock()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                if len(self._state) >= self.max_keys:
+                    # Dicts keep insertion order, so this forgets the oldest key
+                    self._state.pop(next(iter(self._state)))
+                self._state[key] = [now, 0, None]
+                return True
+
+            if now - state[0] < self.interval:
+                # Kept until flush, without the traceback or argument objects pinning frames
+                record.msg = record.getMessage()
+                record.args = None
+                record.exc_info = record.exc_text = record.stack_info = None
+                state[1] += 1
+                state[2] = record
+                return False
+
+            suppressed = state[1]
+            state[0] = now
+            state[1] = 0
+            state[2] = None
+
+        if suppressed:
+            record.msg = f"{record.msg} (repeated {suppressed:,} times)"
+        return True
+
+    def flush(self):
+        """Release the repeats that were dropped since their key last passed
+
+        Returns:
+            list: The latest dropped record of each key, annotated with how
+                many were suppressed, oldest key first
+        """
+        records = []
+        with self._lock:
+            for state in self._state.values():
+                suppressed, record = state[1], state[2]
+                if not suppressed:
+                    continue
+                state[1] = 0
+                state[2] = None
+                record.msg = f"{record.msg} (repeated {suppressed:,} times)"
+                records.append(record)
+        return records
+
+
+class RingBufferHandler(logging.Handler):
+    def __init__(self, capacity=500):
+        """Keep the most recent formatted log lines in memory
+
+        Args:
+            capacity: Number of lines to keep
+        """
+        super().__init__()
+        self.buffer = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def get_lines(self):
+        """Return a snapshot of the buffered lines, oldest first"""
+        return list(self.buffer)
+
+
+def setup_logging(log_dir=None, level=logging.INFO, interval=60.0,
+                  max_bytes=512 * 1024, backup_count=3, ring_capacity=500):
+    """Configure the "taskbar" logger hierarchy
+
+    The calling thread only runs the rate-limit filter and enqueues the record.
+    Formatting, file writes and rotation happen on a background listener
+    thread. Calling this more than once is a no-op.
+
+    Args:
+        log_dir: Directory for the rotating log file
+        level: Minimum level to record
+        interval: Rate-limit interval in seconds per message key
+        max_bytes: Size at which the log file is rotated
+        backup_count: Number of rotated files to keep
+        ring_capacity: Number of lines kept in the in-memory ring buffer
+
+    Returns:
+        logging.Logger: The configured top-level logger
+    """
+    global _listener, _queue_handler, _rate_filter, _ring_handler
+
+    logger = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = []
+
+        _ring_handler = RingBufferHandler(ring_capacity)
+        _ring_handler.setFormatter(formatter)
+        handlers.append(_ring_handler)
+
+        try:
+            log_dir = log_dir or DEFAULT_LOG_DIR
+            os.makedirs(log_dir, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, "taskbar.log"),
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding="utf-8",
+                delay=True
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except OSError:
+            pass  # Keep the in-memory buffer even without a writable log dir
+
+        # Under pythonw there is no console, sys.stderr is None
+        if sys.stderr is not None:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _rate_filter = RateLimitFilter(interval)
+        _queue_handler.addFilter(_rate_filter)
+
+        logger.setLevel(level)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers)
+        _listener.start()
+    return logger
+
+
+def shutdown_logging():
+    """Flush pending records and repeat counts, then stop the background listener"""
+    global _listener, _queue_handler, _rate_filter
+    with _setup_lock:
+        if _listener is not None:
+            logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+            # Repeats that stopped within the interval would otherwise never be counted
+            for record in _rate_filter.flush():
+                _queue_handler.emit(record)
+            _listener.stop()
+            _listener = None
+            _queue_handler = None
+            _rate_filter = None
+
+
+def get_logger(name):
+    """Get a child of the "taskbar" logger
+
+    Args:
+        name: Module name, usually __name__
+
+    Returns:
+        logging.Logger
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def get_recent_logs():
+    """Return the lines held in the in-memory ring buffer, oldest first"""
+    if _ring_handler is None:
+        return []
+    return _ring_handler.get_lines()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# utils/wallpaper_cache.py - Per-bar colors computed once from the wallpaper file
+import os
+from collections import OrderedDict
+
+from PIL import Image
+import numpy as np
+
+from system.window_probe import STYLE_FILL, STYLE_STRETCH, STYLE_CENTER
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_STYLES = (STYLE_FILL, STYLE_STRETCH, STYLE_CENTER)
+
+
+def get_source_row(style, img_width, img_height, width, height, sample_y):
+    """Part of the wallpaper image shown on one monitor row, as Windows places it
+
+    Args:
+        style: STYLE_FILL, STYLE_STRETCH or STYLE_CENTER
+        img_width: Wallpaper image width in pixels
+        img_height: Wallpaper image height in pixels
+        width: Monitor width in pixels
+        height: Monitor height in pixels
+        sample_y: Row relative to the monitor top
+
+    Returns:
+        tuple or None: (left, source_y, right) in image pixels, left/right
+            fractional; None when part of the row shows the background color
+    """
+    if style == STYLE_STRETCH:
+        scale_x = img_width / width
+        scale_y = img_height / height
+        offset_x = offset_y = 0.0
+    elif style == STYLE_FILL:
+        # Scale to cover the monitor, centered, overflow cropped
+        scale = max(width / img_width, height / img_height)
+        scale_x = scale_y = 1.0 / scale
+        offset_x = (img_width * scale - width) / 2
+        offset_y = (img_height * scale - height) / 2
+    else:
+        # Center: unscaled, centered, a smaller image leaves a solid border
+        scale_x = scale_y = 1.0
+        offset_x = (img_width - width) / 2
+        offset_y = (img_height - height) / 2
+        if offset_x < 0 or not 0 <= sample_y + offset_y < img_height:
+            return None
+
+    source_y = min(int((sample_y + offset_y) * scale_y), img_height - 1)
+    return (offset_x * scale_x, source_y, (offset_x + width) * scale_x)
+
+
+class WallpaperColorCache:
+    def __init__(self, pick_color, max_entries=4):
+        """Cache the colors under each bar when only the wallpaper shows there
+
+        Entries are keyed by wallpaper path, mtime, placement style and the
+        sampled geometry, so changing any of them recomputes the colors.
+        A bar whose row is not fully covered by the image gets None and is
+        captured live instead.
+
+        Args:
+            pick_color: Function mapping a (width, 3) pixel row to (r, g, b)
+            max_entries: Number of wallpaper/geometry combinations to keep
+        """
+        self.pick_color = pick_color
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_colors(self, path, style, geometries):
+        """Get the wallpaper color under each bar
+
+        Args:
+            path: Wallpaper image path
+            style: Wallpaper placement style from the window probe
+            geometries: (width, height, sample_y) per bar, sample_y relative
+                to the monitor top
+
+        Returns:
+            list or None: (r, g, b) or None per bar, None when the wallpaper cannot be used
+        """
+        if not path or style not in SUPPORTED_STYLES:
+            return None
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        key = (path, mtime, style, tuple(geometries))
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        try:
+            with Image.open(path) as img:
+                img = img.convert("RGB")
+                colors = [self.compute_color(img, style, *geometry) for geometry in geometries]
+        except Exception as e:
+            logger.error("Error reading wallpaper %s: %s", path, e)
+            # Remembered as well, an unreadable file is not decoded again every tick
+            colors = None
+
+        self.entries[key] = colors
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return colors
+
+    def compute_color(self, img, style, width, height, sample_y):
+        """Color of one monitor's sample row as Windows would place the image
+
+        Args:
+            img: RGB wallpaper image
+            style: One of SUPPORTED_STYLES
+            width: Monitor width in pixels
+            height: Monitor height in pixels
+            sample_y: Sampled row relative to the monitor top
+
+        Returns:
+            tuple or None: (r, g, b), None if the image does not cover the row
+        """
+        source = get_source_row(style, *img.size, width, height, sample_y)
+        if source is None:
+            return None
+        left, source_y, right = source
+        # Resample the visible part of the source row to monitor width
+        row = img.resize((width, 1), Image.BILINEAR, box=(left, source_y, right, source_y + 1))
+        return self.pick_color(np.array(row)[0])